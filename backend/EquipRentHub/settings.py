@@ -62,6 +62,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'rest_framework',
     'rest_framework.authtoken',
@@ -80,7 +81,9 @@ if not DOCKER_BUILD:
 
 from celery import Celery
 
-CELERY_BROKER_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+
+CELERY_BROKER_URL = REDIS_URL
 
 # Ensure Redis SSL handling is correct
 if CELERY_BROKER_URL.startswith("rediss://"):
@@ -98,6 +101,53 @@ CELERY_BROKER_TRANSPORT_OPTIONS = {
     'max_connections': 5
 }
 
+# How long (in seconds) a cart item holds its equipment before the hold is released
+CART_HOLD_TTL = int(os.getenv('CART_HOLD_TTL', 15 * 60))
+
+# Cache (Redis, same instance as Celery unless REDIS_CACHE_URL is set)
+REDIS_CACHE_URL = os.environ.get('REDIS_CACHE_URL', REDIS_URL)
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_CACHE_URL,
+        'KEY_PREFIX': 'usenlease',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'socket_timeout': 1,
+            'socket_connect_timeout': 1,
+            **({'ssl_cert_reqs': ssl.CERT_NONE} if REDIS_CACHE_URL.startswith("rediss://") else {}),
+        },
+    }
+}
+
+# How long (in seconds) cached booking figures of an equipment item are kept
+AVAILABILITY_CACHE_TTL = int(os.getenv('AVAILABILITY_CACHE_TTL', 10 * 60))
+
+# How long (in seconds) the cached category tree and its ad counts are kept
+CATEGORY_TREE_CACHE_TTL = int(os.getenv('CATEGORY_TREE_CACHE_TTL', 60 * 60))
+
+# How long (in seconds) the facet counts of a filter query are cached
+FACETS_CACHE_TTL = int(os.getenv('FACETS_CACHE_TTL', 5 * 60))
+
+# How long (in seconds) the item count of a paginated catalogue query is cached
+PAGINATION_COUNT_CACHE_TTL = int(os.getenv('PAGINATION_COUNT_CACHE_TTL', 60))
+
+# How long (in seconds) anonymous catalogue responses are served fresh, then stale while one request regenerates them
+RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 60))
+RESPONSE_CACHE_STALE_TTL = int(os.getenv('RESPONSE_CACHE_STALE_TTL', 5 * 60))
+
+# How long (in seconds) the trending and featured lists are cached; longer than their recompute interval
+RANKINGS_CACHE_TTL = int(os.getenv('RANKINGS_CACHE_TTL', 2 * 60 * 60))
+
+# Answer catalogue searches from the in-process equipment search index instead of the
+# database (PostgreSQL full-text and trigram search); for deployments without PostgreSQL
+SEARCH_INDEX_ENABLED = os.getenv('SEARCH_INDEX_ENABLED', 'False').lower() in ['true', '1', 'yes']
+
+# Geocoder for address coordinates: 'nominatim' (OpenStreetMap) or 'stub' (offline, for tests)
+GEOCODER = os.getenv('GEOCODER', 'nominatim')
+GEOCODER_USER_AGENT = os.getenv('GEOCODER_USER_AGENT', 'usenlease')
+
 
 RECIPIENT_LIST = os.getenv('RECIPIENT_LIST')
 
@@ -135,6 +185,12 @@ SIMPLE_JWT = {
     "AUTH_COOKIE_REFRESH": "refresh",
 }
 
+# How long (in seconds) the user of an access token is cached between requests
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', 60))
+
+# Build the authenticated user from the access token's claims instead of looking it up
+JWT_TRUSTED_CLAIMS = os.getenv('JWT_TRUSTED_CLAIMS', 'False').lower() in ['true', '1', 'yes']
+
 # Email Settings
 EMAIL_HOST = os.getenv('EMAIL_HOST')
 EMAIL_PORT = os.getenv('EMAIL_PORT')
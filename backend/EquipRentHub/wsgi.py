@@ -14,3 +14,17 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'EquipRentHub.settings')
 
 application = get_wsgi_application()
+
+# Build this worker's equipment search index before it takes requests
+from django.conf import settings  # noqa: E402
+
+if settings.SEARCH_INDEX_ENABLED:
+    from equipment_management.search_index import equipment_index  # noqa: E402
+
+    equipment_index.warm()
+
+# Load the search suggestions published by the rebuild task
+from equipment_management.suggest import suggest_index  # noqa: E402
+
+suggest_index.warm()
+
@@ -2,13 +2,20 @@ from django.apps import AppConfig
 from django.db.models.signals import post_migrate
 
 def setup_periodic_tasks(sender, **kwargs):
-    from .tasks import setup_periodic_task, setup_periodic_task_reduce_equipment
+    from .tasks import (
+        setup_periodic_task, setup_periodic_task_reduce_equipment, setup_periodic_task_release_cart_holds,
+        setup_periodic_task_rebuild_suggestions, setup_periodic_task_compute_rankings,
+    )
     setup_periodic_task()
     setup_periodic_task_reduce_equipment()
+    setup_periodic_task_release_cart_holds()
+    setup_periodic_task_rebuild_suggestions()
+    setup_periodic_task_compute_rankings()
 
 class EquipmentManagementConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "equipment_management"
 
     def ready(self):
+        from . import signals  # noqa: F401  Registers the model signal handlers
         post_migrate.connect(setup_periodic_tasks, sender=self)
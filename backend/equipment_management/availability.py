@@ -0,0 +1,466 @@
+# Standard Library Imports
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Iterable, NamedTuple, Optional, Tuple
+
+# Django Imports
+from django.db import transaction
+from django.db.models import F, IntegerField, Max, OuterRef, Prefetch, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils.timezone import now
+
+# Local Imports
+from .models import Equipment, OrderItem, BookingLedger
+from .holds import held_levels
+
+
+# OrderItem fields that determine how much stock a booking holds
+BOOKING_FIELDS = ('item_id', 'start_date', 'end_date', 'quantity', 'status')
+
+
+class AvailabilityResult(NamedTuple):
+    """
+    Outcome of an availability check for one equipment item and date range.
+
+    Attributes:
+        capacity (int): The total quantity of the equipment that can be rented.
+        peak_booked (int): The highest quantity booked on any single day of the range.
+        available (int): The quantity that is free on every day of the range.
+        first_conflict (date): The first day that cannot fit the requested quantity, or None.
+    """
+    capacity: int
+    peak_booked: int
+    available: int
+    first_conflict: Optional[date]
+
+    @property
+    def is_available(self) -> bool:
+        """
+        Returns True if the requested quantity fits on every day of the range.
+        """
+        return self.first_conflict is None
+
+
+def to_date(value) -> date:
+    """
+    Normalizes a date, datetime or ISO formatted string into a date.
+
+    Args:
+        value (date | datetime | str): The value to normalize.
+
+    Returns:
+        date: The normalized date.
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def booking_window(start_date, end_date) -> Tuple[date, date]:
+    """
+    Returns the days a booking occupies as a half-open range [start, end).
+
+    The end date is exclusive, matching how rental days are charged. A booking that
+    starts and ends on the same day still occupies that day.
+
+    Args:
+        start_date (date | str): The start date of the rental period.
+        end_date (date | str): The end date of the rental period.
+
+    Returns:
+        tuple: The first occupied day and the first free day after the booking.
+    """
+    start = to_date(start_date)
+    end = to_date(end_date)
+    return start, max(end, start + timedelta(days=1))
+
+
+def booking_events(bookings: Iterable, window_start: date = None, window_end: date = None) -> dict:
+    """
+    Turns bookings into sweep-line events, clipped to an optional window.
+
+    Each booking contributes +quantity on its first day and -quantity on the first day
+    after it ends, so the booked level only changes on event days.
+
+    Args:
+        bookings (iterable): (start_date, end_date, quantity) tuples.
+        window_start (date): The first day of the window (optional).
+        window_end (date): The first day after the window (optional).
+
+    Returns:
+        dict: A mapping of day to the change in booked quantity on that day.
+    """
+    events = defaultdict(int)
+    for start_date, end_date, quantity in bookings:
+        start, end = booking_window(start_date, end_date)
+        if window_start:
+            start = max(start, window_start)
+        if window_end:
+            end = min(end, window_end)
+        if start < end and quantity:
+            events[start] += quantity
+            events[end] -= quantity
+    return events
+
+
+def daily_booked_levels(bookings: Iterable):
+    """
+    Expands bookings into the booked quantity of every occupied day.
+
+    Args:
+        bookings (iterable): (start_date, end_date, quantity) tuples.
+
+    Yields:
+        tuple: (day, booked_quantity) for each day with a non-zero booked quantity.
+    """
+    events = booking_events(bookings)
+    booked = 0
+    days = sorted(events)
+    for day, next_day in zip(days, days[1:]):
+        booked += events[day]
+        while booked and day < next_day:
+            yield day, booked
+            day += timedelta(days=1)
+
+
+def booking_state(order_item) -> dict:
+    """
+    Returns the fields of an order item that determine the stock it holds.
+
+    Args:
+        order_item (OrderItem): The order item instance.
+
+    Returns:
+        dict: The values of `BOOKING_FIELDS` for the order item.
+    """
+    return {field: getattr(order_item, field) for field in BOOKING_FIELDS}
+
+
+def _ledger_contribution(state: Optional[dict]):
+    """
+    Returns the (equipment_id, start, end, quantity) held by a booking state, or None.
+    """
+    if not state or not state['quantity'] or state['status'] in OrderItem.RELEASED_STATUSES:
+        return None
+    return (state['item_id'], *booking_window(state['start_date'], state['end_date']), state['quantity'])
+
+
+def apply_booking(equipment_id, start: date, end: date, quantity: int) -> None:
+    """
+    Adds a booking's quantity to the ledger rows of [start, end), or removes it when negative.
+
+    Missing rows are inserted first and the whole range is then incremented with a single
+    UPDATE, so concurrent writers never lose each other's changes.
+
+    Args:
+        equipment_id (str): The ID of the booked equipment.
+        start (date): The first booked day.
+        end (date): The first day after the booking.
+        quantity (int): The quantity to add (negative to release).
+    """
+    if quantity > 0:
+        BookingLedger.objects.bulk_create(
+            [
+                BookingLedger(equipment_id=equipment_id, day=start + timedelta(days=offset))
+                for offset in range((end - start).days)
+            ],
+            ignore_conflicts=True,
+        )
+
+    BookingLedger.objects.filter(
+        equipment_id=equipment_id, day__gte=start, day__lt=end
+    ).update(booked_quantity=F('booked_quantity') + quantity)
+
+
+def update_ledger(previous: Optional[dict] = None, current: Optional[dict] = None) -> None:
+    """
+    Moves an order item's contribution in the ledger from its previous to its current state.
+
+    Args:
+        previous (dict): The booking state before the write, or None for a new order item.
+        current (dict): The booking state after the write, or None for a deleted order item.
+    """
+    old = _ledger_contribution(previous)
+    new = _ledger_contribution(current)
+    if old == new:
+        return
+
+    if old:
+        equipment_id, start, end, quantity = old
+        apply_booking(equipment_id, start, end, -quantity)
+    if new:
+        equipment_id, start, end, quantity = new
+        apply_booking(equipment_id, start, end, quantity)
+
+
+def rebuild_booking_ledger(equipment_ids: Iterable = None, batch_size: int = 1000) -> int:
+    """
+    Recomputes the ledger from active order items.
+
+    Safe to run against a live database: the equipment rows are locked in ascending ID
+    order first, as `reserve_cart_items` does, so no checkout commits between reading
+    the order items and replacing the ledger.
+
+    Args:
+        equipment_ids (iterable): Only rebuild these equipment items (optional).
+        batch_size (int): The number of ledger rows inserted per query.
+
+    Returns:
+        int: The number of ledger rows written.
+    """
+    equipments = Equipment.objects.select_for_update().order_by('id')
+    ledger = BookingLedger.objects.all()
+    order_items = OrderItem.objects.exclude(status__in=OrderItem.RELEASED_STATUSES)
+    if equipment_ids is not None:
+        equipments = equipments.filter(id__in=equipment_ids)
+        ledger = ledger.filter(equipment_id__in=equipment_ids)
+        order_items = order_items.filter(item_id__in=equipment_ids)
+
+    with transaction.atomic():
+        list(equipments.values_list('id', flat=True))
+
+        bookings = defaultdict(list)
+        for item_id, start_date, end_date, quantity in order_items.values_list(
+            'item_id', 'start_date', 'end_date', 'quantity'
+        ).iterator():
+            bookings[item_id].append((start_date, end_date, quantity))
+
+        rows = [
+            BookingLedger(equipment_id=item_id, day=day, booked_quantity=booked)
+            for item_id, item_bookings in bookings.items()
+            for day, booked in daily_booked_levels(item_bookings)
+        ]
+
+        ledger.delete()
+        BookingLedger.objects.bulk_create(rows, batch_size=batch_size)
+
+    return len(rows)
+
+
+def _availability_result(capacity: int, quantity: int, window_start: date, levels: dict) -> AvailabilityResult:
+    """
+    Builds an AvailabilityResult from the booked level of each day in one date range.
+    """
+    peak = max(max(levels.values(), default=0), 0)
+    first_conflict = min((day for day, level in levels.items() if level > capacity - quantity), default=None)
+    return AvailabilityResult(
+        capacity=capacity,
+        peak_booked=peak,
+        available=max(capacity - peak, 0),
+        first_conflict=window_start if capacity < quantity else first_conflict,
+    )
+
+
+def _booked_levels(windows: list, exclude_cart_items: Iterable = ()) -> dict:
+    """
+    Returns the booked plus held quantity per day for (equipment_id, start, end) windows.
+
+    Ledger rows for every window are read with one query and cart holds with one
+    Redis round trip.
+    """
+    ranges = Q()
+    for equipment_id, window_start, window_end in windows:
+        ranges |= Q(equipment_id=equipment_id, day__gte=window_start, day__lt=window_end)
+
+    levels = defaultdict(lambda: defaultdict(int))
+    for equipment_id, day, quantity in BookingLedger.objects.filter(
+        ranges, booked_quantity__gt=0
+    ).values_list('equipment_id', 'day', 'booked_quantity'):
+        levels[equipment_id][day] += quantity
+
+    for equipment_id, days in held_levels(windows, exclude_cart_items).items():
+        for day, quantity in days.items():
+            levels[equipment_id][day] += quantity
+
+    return levels
+
+
+def check_availability(equipment, start_date, end_date, quantity: int = 1, exclude_cart_items: Iterable = ()) -> AvailabilityResult:
+    """
+    Checks whether `quantity` units of the equipment are free on every day of a date range.
+
+    Booked quantities come from one indexed range scan of the booking ledger and
+    short-lived cart holds are added on top, so the cost does not grow with the
+    number of bookings.
+
+    Args:
+        equipment (Equipment): The equipment to check.
+        start_date (date | str): The start date of the rental period.
+        end_date (date | str): The end date of the rental period.
+        quantity (int): The quantity requested.
+        exclude_cart_items (iterable): Cart item IDs whose own holds should not count.
+
+    Returns:
+        AvailabilityResult: The capacity, peak booked quantity and first conflicting day.
+    """
+    window_start, window_end = booking_window(start_date, end_date)
+    levels = _booked_levels([(equipment.id, window_start, window_end)], exclude_cart_items)
+    return _availability_result(equipment.available_quantity, int(quantity), window_start, levels[equipment.id])
+
+
+def check_availability_bulk(requests: Iterable, exclude_cart_items: Iterable = ()) -> list:
+    """
+    Checks many (equipment, date range, quantity) requests at once.
+
+    Capacities are fetched with one query and the ledger rows of every requested range
+    with a second one, however many requests there are.
+
+    Args:
+        requests (iterable): (equipment_id, start_date, end_date, quantity) tuples.
+        exclude_cart_items (iterable): Cart item IDs whose own holds should not count.
+
+    Returns:
+        list: An AvailabilityResult per request, in order, or None where the equipment does not exist.
+    """
+    windows = [
+        (equipment_id, *booking_window(start_date, end_date), int(quantity))
+        for equipment_id, start_date, end_date, quantity in requests
+    ]
+    if not windows:
+        return []
+
+    capacities = dict(
+        Equipment.objects.filter(id__in={window[0] for window in windows}).values_list('id', 'available_quantity')
+    )
+    levels = _booked_levels([window[:3] for window in windows], exclude_cart_items)
+
+    results = []
+    for equipment_id, window_start, window_end, quantity in windows:
+        if equipment_id not in capacities:
+            results.append(None)
+            continue
+
+        days = {day: level for day, level in levels[equipment_id].items() if window_start <= day < window_end}
+        results.append(_availability_result(capacities[equipment_id], quantity, window_start, days))
+
+    return results
+
+
+def annotate_free_quantity(queryset, start_date, end_date):
+    """
+    Annotates an Equipment queryset with `free_quantity` for a date range.
+
+    The peak booked quantity comes from a correlated subquery on the booking ledger,
+    so filtering on availability stays inside a single SQL query.
+
+    Args:
+        queryset (QuerySet): The Equipment queryset to annotate.
+        start_date (date | str): The start date of the rental period.
+        end_date (date | str): The end date of the rental period.
+
+    Returns:
+        QuerySet: The queryset with a `free_quantity` annotation.
+    """
+    window_start, window_end = booking_window(start_date, end_date)
+    peak = BookingLedger.objects.filter(
+        equipment=OuterRef('pk'), day__gte=window_start, day__lt=window_end
+    ).values('equipment').annotate(peak=Max('booked_quantity')).values('peak')
+
+    return queryset.annotate(
+        free_quantity=F('available_quantity') - Coalesce(
+            Subquery(peak, output_field=IntegerField()), 0
+        )
+    )
+
+
+def booked_ranges(equipment_id, since: date = None) -> list:
+    """
+    Returns the upcoming booked periods of an equipment item, read from the ledger.
+
+    Consecutive days with the same booked quantity are merged into one period whose
+    `end_date` is the first day after it, like `OrderItem.end_date`.
+
+    Args:
+        equipment_id (str): The ID of the equipment.
+        since (date): The first day to report (defaults to today).
+
+    Returns:
+        list: Dictionaries with `quantity`, `start_date` and `end_date`.
+    """
+    since = since or now().date()
+    rows = BookingLedger.objects.filter(
+        equipment_id=equipment_id, day__gte=since, booked_quantity__gt=0
+    ).order_by('day').values_list('day', 'booked_quantity')
+
+    return ledger_runs(rows)
+
+
+def ledger_runs(rows: Iterable) -> list:
+    """
+    Merges day-ordered ledger rows into booked periods.
+
+    Args:
+        rows (iterable): (day, booked_quantity) pairs in ascending day order.
+
+    Returns:
+        list: Dictionaries with `quantity`, `start_date` and an exclusive `end_date`.
+    """
+    ranges = []
+    for day, booked in rows:
+        current = ranges[-1] if ranges else None
+        if current and current['end_date'] == day and current['quantity'] == booked:
+            current['end_date'] = day + timedelta(days=1)
+        else:
+            ranges.append({'quantity': booked, 'start_date': day, 'end_date': day + timedelta(days=1)})
+
+    return ranges
+
+
+def peak_booked(equipment_id, since: date = None) -> int:
+    """
+    Returns the highest quantity of an equipment item booked on any day from `since` onwards.
+
+    Args:
+        equipment_id (str): The ID of the equipment.
+        since (date): The first day to consider (defaults to today).
+
+    Returns:
+        int: The peak booked quantity.
+    """
+    since = since or now().date()
+    peak = BookingLedger.objects.filter(
+        equipment_id=equipment_id, day__gte=since
+    ).aggregate(peak=Max('booked_quantity'))['peak']
+    return max(peak or 0, 0)
+
+
+def booked_totals(equipment_id, since: date = None) -> dict:
+    """
+    Returns the quantities of an equipment item booked by its order items.
+
+    Args:
+        equipment_id (str): The ID of the equipment.
+        since (date): The first day an order item must still run on to be upcoming (defaults to today).
+
+    Returns:
+        dict: `total` (every order item) and `upcoming` (order items ending on or after `since`).
+    """
+    since = since or now().date()
+    totals = OrderItem.objects.filter(item_id=equipment_id).aggregate(
+        total=Sum('quantity'), upcoming=Sum('quantity', filter=Q(end_date__gte=since))
+    )
+    return {'total': totals['total'] or 0, 'upcoming': totals['upcoming'] or 0}
+
+
+def upcoming_ledger_prefetch(since: date = None, to_attr: str = 'upcoming_ledger') -> Prefetch:
+    """
+    Builds a Prefetch that loads the booked ledger days of many equipment items at once.
+
+    Each equipment item gets its rows from `since` (defaults to today) onwards, in day
+    order, as a list under `to_attr`, ready for `ledger_runs`.
+
+    Args:
+        since (date): The first day to load.
+        to_attr (str): The attribute the rows are stored under.
+
+    Returns:
+        Prefetch: The prefetch for `Equipment.booking_ledger`.
+    """
+    since = since or now().date()
+    return Prefetch(
+        'booking_ledger',
+        queryset=BookingLedger.objects.filter(day__gte=since, booked_quantity__gt=0).order_by('day'),
+        to_attr=to_attr,
+    )
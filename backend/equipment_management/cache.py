@@ -0,0 +1,376 @@
+# Standard Library Imports
+import logging
+import time
+from typing import Any, Iterable, NamedTuple, Optional
+
+# Django Imports
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils.timezone import now
+
+# Local Imports
+from .singleflight import MISSING, single_flight
+
+logger = logging.getLogger(__name__)
+
+# Booking figures of one equipment item, as of one day: availability:figures:<equipment_id>:<YYYY-MM-DD>
+AVAILABILITY_KEY = "availability:figures:{equipment_id}:{day}"
+# Serialized categories without their counts, plus the IDs of the root categories
+CATEGORY_TREE_KEY = "categories:tree"
+# Verified equipment listed directly in one category: categories:count:<category_id>
+CATEGORY_COUNT_KEY = "categories:count:{category_id}"
+# Counter bumped whenever listed equipment changes; part of the keys of catalogue-wide entries
+CATALOGUE_VERSION_KEY = "catalogue:version"
+# Time (in microseconds) of the last change to what an equipment item's responses show: equipment:version:<id>
+EQUIPMENT_VERSION_KEY = "equipment:version:{equipment_id}"
+# Time (in microseconds) of the last change to any equipment item
+ALL_EQUIPMENT_VERSION_KEY = "equipment:version:all"
+# Lifetime of a version stamp; an expired stamp restarts at the current time, which only costs a full response
+EQUIPMENT_VERSION_TTL = 7 * 24 * 60 * 60
+# Seconds an entry of `cache_get_or_set` outlives its timeout, served stale while one process recomputes it
+STALE_TTL = 60
+
+
+class CachedValue(NamedTuple):
+    """
+    Entry stored by `cache_get_or_set`: the value and the time (in seconds since the
+    epoch) until which it is fresh, or None if it never goes stale.
+    """
+    value: Any
+    fresh_until: Optional[float]
+
+    def is_fresh(self) -> bool:
+        return self.fresh_until is None or time.time() < self.fresh_until
+
+
+def cache_get(key, default=None):
+    """
+    Reads a cache entry, treating an unreachable cache as a miss.
+
+    Args:
+        key (str): The cache key.
+        default: The value returned on a miss.
+
+    Returns:
+        The cached value, or `default`.
+    """
+    try:
+        return cache.get(key, default)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not read cache key {key}: {e}")
+        return default
+
+
+def cache_set(key, value, timeout=None) -> None:
+    """
+    Writes a cache entry, ignoring an unreachable cache.
+
+    Args:
+        key (str): The cache key.
+        value: The value to store.
+        timeout (int): Lifetime in seconds; the cache default if omitted.
+    """
+    try:
+        if timeout is None:
+            cache.set(key, value)
+        else:
+            cache.set(key, value, timeout)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not write cache key {key}: {e}")
+
+
+def cache_get_or_set(key, compute, timeout=None):
+    """
+    Reads a cache entry, computing and caching it on a miss in one process at a time.
+
+    An entry past its timeout is kept `STALE_TTL` seconds longer: one process
+    recomputes it while the others are served the stale value (see `single_flight`).
+    Deleted entries and new keys have no stale value, so concurrent misses compute
+    it side by side rather than wait.
+
+    Args:
+        key (str): The cache key.
+        compute (callable): Computes the value.
+        timeout (int): Seconds to keep the value (None for the cache's default).
+
+    Returns:
+        The cached or computed value.
+    """
+    entry = cache_get(key, MISSING)
+    if entry is MISSING:
+        stale = MISSING
+    elif not isinstance(entry, CachedValue):
+        return entry  # Stored before entries carried their freshness
+    elif entry.is_fresh():
+        return entry.value
+    else:
+        stale = entry.value
+
+    def fill():
+        # Another process may have refreshed the entry before we took the lock
+        current = cache_get(key, MISSING)
+        if isinstance(current, CachedValue) and current.is_fresh():
+            return current.value
+        value = compute()
+        if timeout is None:
+            cache_set(key, CachedValue(value, None))
+        else:
+            cache_set(key, CachedValue(value, time.time() + timeout), timeout + STALE_TTL)
+        return value
+
+    return single_flight(key, fill, check=lambda: stale)
+
+
+def cache_delete_many(keys) -> None:
+    """
+    Deletes cache entries, ignoring an unreachable cache.
+
+    Args:
+        keys (iterable): The cache keys to delete.
+    """
+    keys = list(keys)
+    if not keys:
+        return
+    try:
+        cache.delete_many(keys)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not delete cache keys {keys}: {e}")
+
+
+def _availability_key(equipment_id) -> str:
+    # Keyed by day because booked ranges only cover today onward
+    return AVAILABILITY_KEY.format(equipment_id=equipment_id, day=now().date().isoformat())
+
+
+def get_equipment_availability(equipment_id) -> dict:
+    """
+    Returns the booking figures of an equipment item, computing them on a cache miss.
+
+    Args:
+        equipment_id (str): The ID of the equipment.
+
+    Returns:
+        dict: `booked_dates_data` (upcoming booked runs), `total_booked` (quantity of
+        every order item), `upcoming_booked` (quantity of the order items not yet ended),
+        `peak_booked` (highest quantity booked on any upcoming day) and `booked_dates`
+        (start/end of every order item).
+    """
+    def compute():
+        from .models import OrderItem
+        from .availability import booked_ranges, booked_totals, peak_booked
+
+        totals = booked_totals(equipment_id)
+        return {
+            'booked_dates_data': booked_ranges(equipment_id),
+            'total_booked': totals['total'],
+            'upcoming_booked': totals['upcoming'],
+            'peak_booked': peak_booked(equipment_id),
+            'booked_dates': list(
+                OrderItem.objects.filter(item_id=equipment_id).values('start_date', 'end_date')
+            ),
+        }
+
+    return cache_get_or_set(_availability_key(equipment_id), compute, settings.AVAILABILITY_CACHE_TTL)
+
+
+def invalidate_equipment_availability(*equipment_ids) -> None:
+    """
+    Drops the cached booking figures of the given equipment items.
+
+    Args:
+        *equipment_ids: The IDs of the equipment whose bookings changed.
+    """
+    cache_delete_many(_availability_key(equipment_id) for equipment_id in set(equipment_ids) if equipment_id)
+
+
+def _category_structure() -> dict:
+    """
+    Returns the serialized categories (with zero counts) and the root category IDs.
+    """
+    def compute():
+        from .models import Category
+        from .serializers import CategorySerializer
+
+        categories = list(Category.objects.prefetch_related('subcategories'))
+        return {
+            'categories': list(CategorySerializer(categories, many=True, context={'ad_counts': {}}).data),
+            'roots': [category.id for category in categories if category.parent_id is None],
+        }
+
+    return cache_get_or_set(CATEGORY_TREE_KEY, compute, settings.CATEGORY_TREE_CACHE_TTL)
+
+
+def category_counts(category_ids: Iterable) -> dict:
+    """
+    Returns the number of verified equipment items listed directly in each category.
+
+    Counts are read from the cache; if any is missing, all of them are recounted with a
+    single grouped query and cached again.
+
+    Args:
+        category_ids (iterable): The IDs of the categories to count.
+
+    Returns:
+        dict: {category_id: count}
+    """
+    keys = {CATEGORY_COUNT_KEY.format(category_id=category_id): category_id for category_id in category_ids}
+    try:
+        cached = cache.get_many(keys)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not read category counts: {e}")
+        cached = {}
+
+    if len(cached) == len(keys):
+        return {keys[key]: count for key, count in cached.items()}
+
+    from .models import Equipment
+
+    counts = dict(
+        Equipment.objects.filter(is_verified=True).order_by().values('category_id').annotate(
+            count=Count('id')
+        ).values_list('category_id', 'count')
+    )
+    counts = {category_id: counts.get(category_id, 0) for category_id in keys.values()}
+    try:
+        cache.set_many(
+            {key: counts[category_id] for key, category_id in keys.items()},
+            settings.CATEGORY_TREE_CACHE_TTL,
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Could not write category counts: {e}")
+    return counts
+
+
+def get_category_tree(roots_only: bool = False) -> list:
+    """
+    Returns the categories with their subcategories and ad counts, as CategorySerializer would.
+
+    Args:
+        roots_only (bool): Only return categories without a parent.
+
+    Returns:
+        list: The serialized categories.
+    """
+    structure = _category_structure()
+    categories = structure['categories']
+    if roots_only:
+        roots = set(structure['roots'])
+        categories = [category for category in categories if category['id'] in roots]
+
+    counts = category_counts(category['id'] for category in structure['categories'])
+
+    tree = []
+    for category in categories:
+        subcategories = [
+            {**subcategory, 'ad_count': counts.get(subcategory['id'], 0)}
+            for subcategory in category['subcategories']
+        ]
+        tree.append({
+            **category,
+            'subcategories': subcategories,
+            'ad_count': counts.get(category['id'], 0) + sum(sub['ad_count'] for sub in subcategories),
+        })
+    return tree
+
+
+def invalidate_category_tree() -> None:
+    """
+    Drops the cached category structure, e.g. after a category is added, renamed or removed.
+    """
+    cache_delete_many([CATEGORY_TREE_KEY])
+
+
+def adjust_category_counts(deltas: dict) -> None:
+    """
+    Applies changes to the cached ad counts of categories in place.
+
+    Counts that are not cached are left alone; they are recounted on the next read.
+
+    Args:
+        deltas (dict): {category_id: change in verified equipment listed there}.
+    """
+    for category_id, delta in deltas.items():
+        if not delta:
+            continue
+        try:
+            cache.incr(CATEGORY_COUNT_KEY.format(category_id=category_id), delta)
+        except ValueError:
+            pass  # Not cached; recounted on the next read
+        except Exception as e:
+            logger.warning(f"⚠️ Could not adjust the count of category {category_id}: {e}")
+
+
+def catalogue_version() -> int:
+    """
+    Returns the current catalogue version, starting one if none is cached.
+
+    A new version starts at the current time rather than 1, so entries keyed by a
+    version from before the counter was evicted are not read again.
+
+    Returns:
+        int: The version, or 0 if the cache is unreachable.
+    """
+    try:
+        cache.add(CATALOGUE_VERSION_KEY, int(time.time()), None)
+        return cache.get(CATALOGUE_VERSION_KEY, 0)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not read the catalogue version: {e}")
+        return 0
+
+
+def bump_catalogue_version() -> None:
+    """
+    Moves the catalogue to a new version, so entries keyed by the old one are no longer read.
+    """
+    try:
+        try:
+            cache.incr(CATALOGUE_VERSION_KEY)
+        except ValueError:
+            cache.add(CATALOGUE_VERSION_KEY, int(time.time()), None)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not bump the catalogue version: {e}")
+
+
+def _version_stamp() -> int:
+    """
+    Returns the current time in microseconds, used as a version that doubles as a modification time.
+    """
+    return int(time.time() * 1_000_000)
+
+
+def equipment_version(equipment_id=None):
+    """
+    Returns the version stamp of an equipment item, or of all equipment if no ID is given.
+
+    An item without a stamp gets one at the current time, so validators issued before
+    the stamp was evicted no longer match.
+
+    Args:
+        equipment_id (str): The ID of the equipment (optional).
+
+    Returns:
+        int: The time of the last change in microseconds, or None if the cache is unreachable.
+    """
+    key = EQUIPMENT_VERSION_KEY.format(equipment_id=equipment_id) if equipment_id else ALL_EQUIPMENT_VERSION_KEY
+    try:
+        cache.add(key, _version_stamp(), EQUIPMENT_VERSION_TTL)
+        return cache.get(key)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not read the version of {key}: {e}")
+        return None
+
+
+def touch_equipment_versions(*equipment_ids) -> None:
+    """
+    Moves equipment items, and the set of all equipment, to a new version stamp.
+
+    Args:
+        *equipment_ids: The IDs of the changed equipment.
+    """
+    stamp = _version_stamp()
+    keys = [EQUIPMENT_VERSION_KEY.format(equipment_id=equipment_id) for equipment_id in equipment_ids if equipment_id]
+    try:
+        cache.set_many({key: stamp for key in [*keys, ALL_EQUIPMENT_VERSION_KEY]}, EQUIPMENT_VERSION_TTL)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not update equipment versions: {e}")
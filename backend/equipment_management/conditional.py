@@ -0,0 +1,62 @@
+# Standard Library Imports
+import hashlib
+from datetime import datetime, timezone
+
+# Django Imports
+from django.utils.timezone import now
+from django.views.decorators.http import condition
+
+# Local Imports
+from .cache import catalogue_version, equipment_version
+
+
+def _cached_version(request, equipment_id=None):
+    """
+    Reads a version stamp once per request, as the ETag and Last-Modified functions both need it.
+    """
+    versions = request.__dict__.setdefault('_equipment_versions', {})
+    if equipment_id not in versions:
+        versions[equipment_id] = equipment_version(equipment_id)
+    return versions[equipment_id]
+
+
+def equipment_etag(request, pk=None, **kwargs):
+    """
+    Returns the ETag of an equipment item's detail response, or None if its version is unavailable.
+
+    The booking figures in the response are as of today, so the date is part of the tag.
+    """
+    version = _cached_version(request, pk)
+    if version is None:
+        return None
+    return f"{pk}-{version}-{now().date().isoformat()}"
+
+
+def equipment_last_modified(request, pk=None, **kwargs):
+    """
+    Returns the time of the last change to an equipment item, or None if its version is unavailable.
+    """
+    version = _cached_version(request, pk)
+    if version is None:
+        return None
+    return datetime.fromtimestamp(version / 1_000_000, tz=timezone.utc)
+
+
+def catalogue_etag(request, *args, **kwargs):
+    """
+    Returns the ETag of a catalogue query, or None if the equipment version is unavailable.
+
+    The tag covers the catalogue and equipment versions, the date (for booking figures)
+    and the full path with its query string, so every filter and page has its own. Lists
+    get no Last-Modified, as category and ranking changes move only the catalogue version.
+    """
+    version = _cached_version(request)
+    if version is None:
+        return None
+    digest = hashlib.sha1(request.get_full_path().encode('utf-8')).hexdigest()[:16]
+    return f"catalogue-{catalogue_version()}-{version}-{now().date().isoformat()}-{digest}"
+
+
+# Decorators answering conditional GETs with 304 before the view (and its serializers) run
+equipment_condition = condition(etag_func=equipment_etag, last_modified_func=equipment_last_modified)
+catalogue_condition = condition(etag_func=catalogue_etag)
@@ -0,0 +1,133 @@
+# Standard Library Imports
+import csv
+import json
+from typing import Iterable, Iterator
+
+# Django Imports
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+
+# Local Imports
+from .models import Equipment
+from .serializers import average_rating_subquery, review_count_subquery
+
+# Columns of an exported equipment row, in CSV column order
+EXPORT_FIELDS = [
+    'id', 'name', 'slug', 'category', 'hourly_rate', 'available_quantity', 'is_available',
+    'city', 'state', 'country', 'latitude', 'longitude', 'tags', 'image_url',
+    'average_rating', 'review_count', 'is_trending', 'is_featured', 'date_created', 'date_updated',
+]
+
+# Rows fetched (and prefetched for) per database round trip
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def export_queryset():
+    """
+    Builds the query of the exported catalogue: verified equipment with what a row needs.
+
+    Returns:
+        QuerySet: Verified equipment, oldest first so the order is stable while exporting.
+    """
+    return Equipment.objects.filter(is_verified=True).select_related('address', 'category').prefetch_related(
+        'tags', 'images'
+    ).annotate(
+        average_rating=average_rating_subquery(),
+        review_count=Coalesce(review_count_subquery(), Value(0)),
+    ).order_by('date_created', 'id')
+
+
+def export_row(equipment) -> dict:
+    """
+    Flattens an equipment item into an export row.
+
+    Args:
+        equipment (Equipment): An item from `export_queryset`.
+
+    Returns:
+        dict: The row, keyed by `EXPORT_FIELDS`.
+    """
+    address = equipment.address
+    images = equipment.images.all()
+    return {
+        'id': equipment.id,
+        'name': equipment.name,
+        'slug': equipment.slug,
+        'category': equipment.category.name,
+        'hourly_rate': equipment.hourly_rate,
+        'available_quantity': equipment.available_quantity,
+        'is_available': equipment.is_available,
+        'city': address.city,
+        'state': address.state,
+        'country': address.country,
+        'latitude': address.latitude,
+        'longitude': address.longitude,
+        'tags': [tag.name for tag in equipment.tags.all()],
+        'image_url': images[0].image.url if images else None,
+        'average_rating': round(equipment.average_rating, 2) if equipment.average_rating is not None else None,
+        'review_count': equipment.review_count,
+        'is_trending': equipment.is_trending,
+        'is_featured': equipment.is_featured,
+        'date_created': equipment.date_created,
+        'date_updated': equipment.date_updated,
+    }
+
+
+def export_rows(chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Yields the export rows of the catalogue one by one.
+
+    `iterator(chunk_size=...)` streams the rows from the database cursor and runs the
+    prefetches per chunk, so memory stays flat whatever the catalogue size.
+    """
+    for equipment in export_queryset().iterator(chunk_size=chunk_size):
+        yield export_row(equipment)
+
+
+def ndjson_lines(rows: Iterable[dict]) -> Iterator[str]:
+    """
+    Encodes rows as newline-delimited JSON, one object per line.
+    """
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+class _Echo:
+    """
+    File-like object whose `write` returns the written text, for streaming `csv.writer`.
+    """
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows: Iterable[dict]) -> Iterator[str]:
+    """
+    Encodes rows as CSV with a header line. Tags are joined with `|`.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        row['tags'] = '|'.join(row['tags'])
+        yield writer.writerow([row[field] for field in EXPORT_FIELDS])
+
+
+def export_lines(file_format: str, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Streams the catalogue export in one of `EXPORT_FORMATS`.
+
+    Args:
+        file_format (str): `ndjson` or `csv`.
+        chunk_size (int): Rows fetched per database round trip.
+
+    Returns:
+        iterator: The lines of the export.
+    """
+    encode = ndjson_lines if file_format == 'ndjson' else csv_lines
+    return encode(export_rows(chunk_size))
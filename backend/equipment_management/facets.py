@@ -0,0 +1,121 @@
+# Standard Library Imports
+import hashlib
+import json
+
+# Django Imports
+from django.conf import settings
+from django.db.models import Count, Q
+
+# Local Imports
+from .models import Equipment
+from .cache import cache_get_or_set, catalogue_version, equipment_version
+
+# Facets of one filter query in one catalogue version: facets:<version>:<query hash>
+# (date-filtered queries add the all-equipment version stamp, which bookings move)
+FACETS_KEY = "facets:{version}:{digest}"
+
+# Hourly rate buckets of the price facet, as [low, high) bounds; None means unbounded
+PRICE_BUCKETS = [(0, 50), (50, 100), (100, 250), (250, 500), (500, None)]
+
+# Filter parameters that change the facets; paging and representation options do not
+FACET_PARAMS = [
+    'category', 'categories', 'search', 'city', 'cities', 'start_date', 'end_date', 'min_quantity',
+    'lat', 'lng', 'radius_km',
+]
+LIST_PARAMS = ['categories', 'cities']
+# Parameters that filter by free stock, which every booking changes
+DATE_PARAMS = ['start_date', 'end_date']
+# Parameters matched case-insensitively, so their case does not change the results
+CASE_INSENSITIVE_PARAMS = ['category', 'search', 'city']
+
+
+def normalize_filter_query(query_params) -> dict:
+    """
+    Reduces filter query parameters to the ones that affect the results, in canonical form.
+
+    Args:
+        query_params (QueryDict): The request's query parameters.
+
+    Returns:
+        dict: Trimmed values, with list parameters sorted and empty ones dropped.
+    """
+    normalized = {}
+    for name in FACET_PARAMS:
+        value = (query_params.get(name) or '').strip()
+        if not value:
+            continue
+        if name in CASE_INSENSITIVE_PARAMS:
+            value = value.lower()
+        if name in LIST_PARAMS:
+            value = sorted({item.strip() for item in value.split(',') if item.strip()})
+        elif name == 'search':
+            value = ' '.join(value.split())
+        normalized[name] = value
+    return normalized
+
+
+def compute_facets(queryset) -> dict:
+    """
+    Counts the filtered equipment per category, city and price bucket.
+
+    Each facet is one grouped query over the IDs of the filtered queryset, so joins,
+    DISTINCT and ranking annotations in the filtered queryset do not skew the counts.
+
+    Args:
+        queryset (QuerySet): The filtered equipment.
+
+    Returns:
+        dict: `categories`, `cities` and `price_ranges` lists with their counts.
+    """
+    matching = Equipment.objects.filter(pk__in=queryset.order_by().values('pk')).order_by()
+
+    categories = matching.values('category_id', 'category__name', 'category__slug').annotate(
+        count=Count('id')
+    ).order_by('-count', 'category__name')
+
+    cities = matching.values('address__city').annotate(count=Count('id')).order_by('-count', 'address__city')
+
+    price_counts = matching.aggregate(**{
+        f'bucket_{index}': Count('id', filter=Q(hourly_rate__gte=low) & (Q(hourly_rate__lt=high) if high else Q()))
+        for index, (low, high) in enumerate(PRICE_BUCKETS)
+    })
+
+    return {
+        'categories': [
+            {'id': row['category_id'], 'name': row['category__name'], 'slug': row['category__slug'], 'count': row['count']}
+            for row in categories
+        ],
+        'cities': [{'city': row['address__city'], 'count': row['count']} for row in cities],
+        'price_ranges': [
+            {'min': low, 'max': high, 'count': price_counts[f'bucket_{index}']}
+            for index, (low, high) in enumerate(PRICE_BUCKETS)
+        ],
+    }
+
+
+def get_facets(queryset, query_params) -> dict:
+    """
+    Returns the facets of a filter query, from the cache when the same query was seen.
+
+    Entries are keyed by the catalogue version, and date-filtered queries also by the
+    all-equipment version stamp, like the paginated counts, so a booking retires them.
+
+    Args:
+        queryset (QuerySet): The filtered equipment.
+        query_params (QueryDict): The request's query parameters.
+
+    Returns:
+        dict: The facets, as returned by `compute_facets`.
+    """
+    filters = normalize_filter_query(query_params)
+    version = catalogue_version()
+    if any(name in filters for name in DATE_PARAMS):
+        version = f"{version}:{equipment_version()}"
+
+    normalized = json.dumps(filters, sort_keys=True)
+    key = FACETS_KEY.format(
+        version=version,
+        digest=hashlib.sha1(normalized.encode('utf-8')).hexdigest(),
+    )
+
+    return cache_get_or_set(key, lambda: compute_facets(queryset), settings.FACETS_CACHE_TTL)
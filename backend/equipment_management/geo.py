@@ -0,0 +1,87 @@
+# Standard Library Imports
+import math
+from typing import Tuple
+
+# Django Imports
+from django.db.models import ExpressionWrapper, F, FloatField, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+# Mean radius of the Earth in kilometres
+EARTH_RADIUS_KM = 6371.0088
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    Returns a box of coordinates that contains every point within `radius_km` of a centre.
+
+    Args:
+        latitude (float): The latitude of the centre.
+        longitude (float): The longitude of the centre.
+        radius_km (float): The radius in kilometres.
+
+    Returns:
+        tuple: (min_latitude, max_latitude, min_longitude, max_longitude). The longitude
+        bounds are None when the box spans a pole or the antimeridian.
+    """
+    delta_latitude = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_latitude, max_latitude = latitude - delta_latitude, latitude + delta_latitude
+    if min_latitude <= -90 or max_latitude >= 90:
+        return max(min_latitude, -90), min(max_latitude, 90), None, None
+
+    delta_longitude = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(latitude))))
+    min_longitude, max_longitude = longitude - delta_longitude, longitude + delta_longitude
+    if min_longitude < -180 or max_longitude > 180:
+        return min_latitude, max_latitude, None, None
+    return min_latitude, max_latitude, min_longitude, max_longitude
+
+
+def distance_expression(latitude: float, longitude: float, latitude_field: str, longitude_field: str):
+    """
+    Builds the haversine distance in kilometres from a point to a row's coordinates.
+
+    Args:
+        latitude (float): The latitude of the point.
+        longitude (float): The longitude of the point.
+        latitude_field (str): The lookup path of the row's latitude.
+        longitude_field (str): The lookup path of the row's longitude.
+
+    Returns:
+        ExpressionWrapper: The distance, usable in `annotate`.
+    """
+    delta_latitude = Radians(F(latitude_field) - Value(latitude))
+    delta_longitude = Radians(F(longitude_field) - Value(longitude))
+    a = (
+        Power(Sin(delta_latitude / 2), 2)
+        + Cos(Radians(Value(latitude))) * Cos(Radians(F(latitude_field))) * Power(Sin(delta_longitude / 2), 2)
+    )
+    # Rounding can push `a` a hair above 1 for antipodal points, outside ASin's domain
+    return ExpressionWrapper(2 * EARTH_RADIUS_KM * ASin(Sqrt(Least(a, Value(1.0)))), output_field=FloatField())
+
+
+def within_radius(queryset, latitude: float, longitude: float, radius_km: float):
+    """
+    Filters equipment to items located within `radius_km` of a point.
+
+    Candidates are first narrowed with the indexed bounding box on the address
+    coordinates, then refined with the exact haversine distance, which is annotated
+    as `distance_km`. Equipment whose address is not geocoded yet is left out.
+
+    Args:
+        queryset (QuerySet): The equipment to filter.
+        latitude (float): The latitude of the centre.
+        longitude (float): The longitude of the centre.
+        radius_km (float): The radius in kilometres.
+
+    Returns:
+        QuerySet: The equipment in range, annotated with `distance_km`.
+    """
+    min_latitude, max_latitude, min_longitude, max_longitude = bounding_box(latitude, longitude, radius_km)
+    queryset = queryset.filter(address__latitude__range=(min_latitude, max_latitude))
+    if min_longitude is not None:
+        queryset = queryset.filter(address__longitude__range=(min_longitude, max_longitude))
+    else:
+        queryset = queryset.filter(address__longitude__isnull=False)
+
+    return queryset.annotate(
+        distance_km=distance_expression(latitude, longitude, 'address__latitude', 'address__longitude')
+    ).filter(distance_km__lte=radius_km)
@@ -0,0 +1,321 @@
+# Standard Library Imports
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Iterable
+
+# Third-Party Imports
+import redis
+
+# Django Imports
+from django.conf import settings
+from django.db import transaction
+
+# Local Imports
+from .models import BookingLedger, CartItem
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Per-equipment, per-day held quantity: hold:<equipment_id>:<YYYY-MM-DD>
+DAY_KEY = "hold:{equipment_id}:{day}"
+# What a cart item holds, so the hold can be released exactly: hold:cart:<cart_item_id>
+RECORD_KEY = "hold:cart:{cart_item_id}"
+# Sorted set of cart item IDs scored by the time their hold expires
+EXPIRY_KEY = "hold:expiry"
+# Seconds a hold's keys outlive its expiry, so the once-a-minute sweep still finds
+# what to give back when it runs late
+HOLD_KEY_GRACE = 5 * 60
+
+# Per thread, the cart items holding stock in each open `atomic_cart_write` block
+_open_writes = threading.local()
+
+# Atomically removes a hold record and gives its quantity back to every day counter.
+# Running it twice for the same cart item is harmless, so explicit releases and the
+# expiry sweep can race safely.
+RELEASE_SCRIPT = """
+redis.call('ZREM', KEYS[2], ARGV[1])
+local record = redis.call('GET', KEYS[1])
+if not record then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+local hold = cjson.decode(record)
+for _, key in ipairs(hold['keys']) do
+    if redis.call('DECRBY', key, hold['quantity']) <= 0 then
+        redis.call('DEL', key)
+    end
+end
+return 1
+"""
+
+# Atomically checks a cart item's quantity against the free stock of every day and,
+# only if it fits on all of them, moves the cart item's hold there. The cart item's
+# previous hold does not count against it. Returns 0 when placed, otherwise the
+# 1-based position of the first day that cannot fit the quantity.
+#
+# KEYS: hold record, expiry set, then one counter per day
+# ARGV: cart item ID, quantity, counter TTL, expiry time, hold record, then the
+#       stock left free by confirmed bookings on each day
+HOLD_SCRIPT = """
+local quantity = tonumber(ARGV[2])
+local previous = {}
+local record = redis.call('GET', KEYS[1])
+if record then
+    local hold = cjson.decode(record)
+    for _, key in ipairs(hold['keys']) do
+        previous[key] = hold['quantity']
+    end
+end
+for index = 3, #KEYS do
+    local held = tonumber(redis.call('GET', KEYS[index]) or '0') - (previous[KEYS[index]] or 0)
+    if held + quantity > tonumber(ARGV[index + 3]) then
+        return index - 2
+    end
+end
+for key, held in pairs(previous) do
+    if redis.call('DECRBY', key, held) <= 0 then
+        redis.call('DEL', key)
+    end
+end
+for index = 3, #KEYS do
+    redis.call('INCRBY', KEYS[index], quantity)
+    redis.call('EXPIRE', KEYS[index], ARGV[3])
+end
+redis.call('SET', KEYS[1], ARGV[5], 'EX', ARGV[3])
+redis.call('ZADD', KEYS[2], ARGV[4], ARGV[1])
+return 0
+"""
+
+
+class HoldUnavailable(Exception):
+    """
+    Raised when a cart hold cannot be placed because Redis is unreachable.
+
+    The cart write must not go ahead without its hold, or the stock could be oversold.
+    """
+
+
+class HoldError(Exception):
+    """
+    Raised when a cart item's hold would take more stock than is free on some day.
+
+    Attributes:
+        equipment_id (str): The ID of the equipment that ran out.
+        day (date): The first day that cannot fit the requested quantity.
+        available (int): The quantity that was still free on that day.
+        requested (int): The quantity the cart item asked for.
+    """
+
+    def __init__(self, equipment_id, day, available, requested):
+        self.equipment_id = equipment_id
+        self.day = day
+        self.available = available
+        self.requested = requested
+        super().__init__(
+            f"Only {available} units are available on {day}. Requested: {requested}"
+        )
+
+
+def _day_keys(equipment_id, start: date, end: date) -> list:
+    """
+    Returns the day counter keys of an equipment item for [start, end).
+    """
+    return [
+        DAY_KEY.format(equipment_id=equipment_id, day=(start + timedelta(days=offset)).isoformat())
+        for offset in range((end - start).days)
+    ]
+
+
+def _release(client, cart_item_id) -> bool:
+    """
+    Runs the release script for one cart item.
+    """
+    script = client.register_script(RELEASE_SCRIPT)
+    return bool(script(keys=[RECORD_KEY.format(cart_item_id=cart_item_id), EXPIRY_KEY], args=[cart_item_id]))
+
+
+def place_hold(cart_item) -> None:
+    """
+    Holds a cart item's quantity on every day of its period for `CART_HOLD_TTL` seconds.
+
+    The stock left free by confirmed bookings is read from the booking ledger, and
+    the check against other carts' holds and the increment happen in one Redis
+    script, so two carts can never both hold the last unit. Any previous hold of the
+    same cart item is replaced, so updating a cart item moves its hold instead of
+    stacking a second one; a rejected update keeps the previous hold.
+
+    Args:
+        cart_item (CartItem): The cart item to hold stock for.
+
+    Inside `atomic_cart_write`, the hold is put back in line with the database if
+    the write rolls back.
+
+    Raises:
+        HoldError: If the quantity does not fit on some day of the period.
+        HoldUnavailable: If Redis is unreachable.
+    """
+    from .availability import booking_window
+
+    start, end = booking_window(cart_item.start_date, cart_item.end_date)
+    days = [start + timedelta(days=offset) for offset in range((end - start).days)]
+    keys = _day_keys(cart_item.item_id, start, end)
+    ttl = settings.CART_HOLD_TTL
+
+    booked = dict(
+        BookingLedger.objects.filter(equipment_id=cart_item.item_id, day__gte=start, day__lt=end).values_list(
+            'day', 'booked_quantity'
+        )
+    )
+    capacity = cart_item.item.available_quantity
+    free = [max(capacity - booked.get(day, 0), 0) for day in days]
+
+    try:
+        client = get_redis()
+        script = client.register_script(HOLD_SCRIPT)
+        conflict = script(
+            keys=[RECORD_KEY.format(cart_item_id=cart_item.id), EXPIRY_KEY, *keys],
+            args=[
+                cart_item.id, cart_item.quantity, ttl + HOLD_KEY_GRACE, time.time() + ttl,
+                json.dumps({'keys': keys, 'quantity': cart_item.quantity}), *free,
+            ],
+        )
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ Could not place cart hold for {cart_item.id}: {e}")
+        raise HoldUnavailable(f"Could not hold stock for cart item {cart_item.id}.") from e
+
+    writes = getattr(_open_writes, 'stack', None)
+    if writes:
+        writes[-1].add(cart_item.id)
+
+    if conflict:
+        index = conflict - 1
+        held = held_levels([(cart_item.item_id, days[index], days[index] + timedelta(days=1))], [cart_item.id])
+        available = max(free[index] - held.get(cart_item.item_id, {}).get(days[index], 0), 0)
+        raise HoldError(cart_item.item_id, days[index], available, cart_item.quantity)
+
+
+def sync_hold(cart_item_id) -> None:
+    """
+    Puts a cart item's hold back in line with the cart item the database holds now.
+
+    The hold is moved back to the stored quantity and period, or released if the cart
+    item no longer exists or its stored quantity no longer fits.
+
+    Args:
+        cart_item_id (str): The ID of the cart item.
+    """
+    cart_item = CartItem.objects.select_related('item').filter(id=cart_item_id).first()
+    if cart_item is None:
+        release_hold(cart_item_id)
+        return
+    try:
+        place_hold(cart_item)
+    except (HoldError, HoldUnavailable) as e:
+        logger.warning(f"⚠️ Could not restore cart hold for {cart_item_id}: {e}")
+        release_hold(cart_item_id)
+
+
+@contextmanager
+def atomic_cart_write():
+    """
+    `transaction.atomic()` for cart item writes that gives back the holds placed inside it.
+
+    Holds are placed inside the write's transaction (see `signals.hold_cart_item`), so
+    a rollback would otherwise leave them holding stock until they expire. When the
+    block raises, the hold of every cart item saved in it is synced with the database
+    (see `sync_hold`). Nested blocks hand their holds to the enclosing block, which
+    can still roll them back.
+    """
+    writes = _open_writes.__dict__.setdefault('stack', [])
+    placed = set()
+    writes.append(placed)
+    try:
+        with transaction.atomic():
+            yield
+    except Exception:
+        writes.pop()
+        for cart_item_id in placed:
+            sync_hold(cart_item_id)
+        raise
+    else:
+        writes.pop()
+        if writes:
+            writes[-1].update(placed)
+
+
+def release_hold(cart_item_id) -> None:
+    """
+    Releases the hold of a cart item, if it still has one.
+
+    Args:
+        cart_item_id (str): The ID of the cart item.
+    """
+    try:
+        _release(get_redis(), cart_item_id)
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ Could not release cart hold for {cart_item_id}: {e}")
+
+
+def release_expired_holds() -> int:
+    """
+    Releases every hold whose time has run out.
+
+    Returns:
+        int: The number of holds released.
+    """
+    client = get_redis()
+    released = 0
+    for cart_item_id in client.zrangebyscore(EXPIRY_KEY, '-inf', time.time()):
+        released += _release(client, cart_item_id)
+    return released
+
+
+def held_levels(windows: Iterable, exclude_cart_items: Iterable = ()) -> dict:
+    """
+    Returns the quantity held by carts on each day of the given windows.
+
+    Args:
+        windows (iterable): (equipment_id, window_start, window_end) tuples.
+        exclude_cart_items (iterable): Cart item IDs whose own holds should not count.
+
+    Returns:
+        dict: {equipment_id: {day: held_quantity}}, empty if Redis is unavailable.
+    """
+    days = []
+    for equipment_id, window_start, window_end in windows:
+        days.extend(
+            (equipment_id, window_start + timedelta(days=offset))
+            for offset in range((window_end - window_start).days)
+        )
+    exclude_cart_items = list(exclude_cart_items)
+    if not days:
+        return {}
+
+    try:
+        client = get_redis()
+        counters = client.mget([DAY_KEY.format(equipment_id=equipment_id, day=day.isoformat()) for equipment_id, day in days])
+        records = client.mget([RECORD_KEY.format(cart_item_id=cart_item_id) for cart_item_id in exclude_cart_items]) if exclude_cart_items else []
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ Could not read cart holds: {e}")
+        return {}
+
+    # Quantity held by the excluded cart items, keyed like the day counters
+    own = defaultdict(int)
+    for record in records:
+        if record:
+            hold = json.loads(record)
+            for key in hold['keys']:
+                own[key] += hold['quantity']
+
+    levels = defaultdict(dict)
+    for (equipment_id, day), counter in zip(days, counters):
+        key = DAY_KEY.format(equipment_id=equipment_id, day=day.isoformat())
+        held = int(counter or 0) - own[key]
+        if held > 0:
+            levels[equipment_id][day] = held
+    return levels
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from equipment_management.search import create_search_indexes, search_enabled
+
+
+class Command(BaseCommand):
+    help = 'Create the PostgreSQL search extension and indexes, and fill missing search vectors'
+
+    def handle(self, *args, **options):
+        if not search_enabled():
+            self.stdout.write(self.style.WARNING('⚠️ Search indexes are only used on PostgreSQL; nothing to do.'))
+            return
+
+        rows = create_search_indexes()
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Search indexes ready; vectors filled for {rows} equipment items.')
+        )
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from equipment_management.export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    help = 'Export the verified equipment catalogue as NDJSON or CSV, streaming row by row'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            dest='file_format',
+            choices=list(EXPORT_FORMATS),
+            default='ndjson',
+            help='Output format (default: ndjson)',
+        )
+        parser.add_argument(
+            '--output',
+            help='File to write to (default: standard output)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help=f'Rows fetched per database round trip (default: {EXPORT_CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1.')
+
+        lines = export_lines(options['file_format'], chunk_size=options['chunk_size'])
+        if not options.get('output'):
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        rows = -1 if options['file_format'] == 'csv' else 0  # the CSV header is not a row
+        with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+            for line in lines:
+                output.write(line)
+                rows += 1
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Exported {rows} equipment items to {options['output']}."))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from equipment_management.availability import rebuild_booking_ledger
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-day booking ledger from active order items'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--equipment',
+            nargs='+',
+            help='Only rebuild the ledger for these equipment IDs',
+        )
+
+    def handle(self, *args, **options):
+        rows = rebuild_booking_ledger(equipment_ids=options.get('equipment'))
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Booking ledger rebuilt with {rows} rows.')
+        )
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from equipment_management.search import search_enabled, update_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Recompute the full-text search vectors of equipment (PostgreSQL only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--equipment',
+            nargs='+',
+            help='Only recompute the vectors of these equipment IDs',
+        )
+
+    def handle(self, *args, **options):
+        if not search_enabled():
+            self.stdout.write(self.style.WARNING('⚠️ Search vectors are only used on PostgreSQL; nothing to do.'))
+            return
+
+        rows = update_search_vectors(equipment_ids=options.get('equipment'))
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Search vectors recomputed for {rows} equipment items.')
+        )
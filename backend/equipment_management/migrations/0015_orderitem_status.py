@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment_management', '0014_alter_equipment_terms'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('pickup', 'Pickup Initiated'), ('return', 'Return Initiated'), ('rented', 'Rented'), ('rejected', 'Rejected'), ('disputed', 'Disputed'), ('completed', 'Completed'), ('canceled', 'Canceled')], default='pending', max_length=50),
+        ),
+    ]
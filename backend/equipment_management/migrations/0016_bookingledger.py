@@ -0,0 +1,63 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+RELEASED_STATUSES = ('rejected', 'canceled', 'completed')
+
+
+def populate_booking_ledger(apps, schema_editor):
+    """
+    Fills the ledger from the order items that already exist.
+    """
+    OrderItem = apps.get_model('equipment_management', 'OrderItem')
+    BookingLedger = apps.get_model('equipment_management', 'BookingLedger')
+
+    booked = defaultdict(int)
+    order_items = OrderItem.objects.exclude(status__in=RELEASED_STATUSES).values_list(
+        'item_id', 'start_date', 'end_date', 'quantity'
+    )
+    for item_id, start_date, end_date, quantity in order_items.iterator():
+        if not quantity:
+            continue
+        days = max((end_date - start_date).days, 1)
+        for offset in range(days):
+            booked[(item_id, start_date + timedelta(days=offset))] += quantity
+
+    BookingLedger.objects.bulk_create(
+        [
+            BookingLedger(equipment_id=item_id, day=day, booked_quantity=quantity)
+            for (item_id, day), quantity in booked.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment_management', '0015_orderitem_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('booked_quantity', models.IntegerField(default=0)),
+                ('equipment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_ledger', to='equipment_management.equipment')),
+            ],
+            options={
+                'verbose_name_plural': 'booking ledger',
+                'ordering': ('equipment', 'day'),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='bookingledger',
+            constraint=models.UniqueConstraint(fields=('equipment', 'day'), name='unique_booking_ledger_day'),
+        ),
+        migrations.RunPython(populate_booking_ledger, migrations.RunPython.noop),
+    ]
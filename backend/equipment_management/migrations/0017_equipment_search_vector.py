@@ -0,0 +1,72 @@
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# The trigram extension and GIN indexes only exist on PostgreSQL; other databases
+# (SQLite in development) keep the plain column and search with icontains.
+CREATE_SEARCH_INDEXES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS equipment_search_vector_gin "
+    "ON equipment_management_equipment USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS equipment_name_trgm_gin "
+    "ON equipment_management_equipment USING gin (name gin_trgm_ops)",
+]
+
+DROP_SEARCH_INDEXES = [
+    "DROP INDEX IF EXISTS equipment_name_trgm_gin",
+    "DROP INDEX IF EXISTS equipment_search_vector_gin",
+]
+
+POPULATE_SEARCH_VECTORS = """
+    UPDATE equipment_management_equipment AS equipment SET search_vector =
+        setweight(to_tsvector('english', coalesce(equipment.name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce((
+            SELECT string_agg(tag.name, ' ')
+            FROM equipment_management_equipment_tags AS equipment_tag
+            JOIN equipment_management_tag AS tag ON tag.id = equipment_tag.tag_id
+            WHERE equipment_tag.equipment_id = equipment.id
+        ), '')), 'B') ||
+        setweight(to_tsvector('english', coalesce((
+            SELECT category.name
+            FROM equipment_management_category AS category
+            WHERE category.id = equipment.category_id
+        ), '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(equipment.description, '')), 'D')
+"""
+
+
+def create_search_indexes(apps, schema_editor):
+    """
+    Enables pg_trgm, adds the GIN indexes and fills the search vectors on PostgreSQL.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in CREATE_SEARCH_INDEXES:
+        schema_editor.execute(statement)
+    schema_editor.execute(POPULATE_SEARCH_VECTORS)
+
+
+def drop_search_indexes(apps, schema_editor):
+    """
+    Removes the GIN indexes on PostgreSQL; the pg_trgm extension is left installed.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in DROP_SEARCH_INDEXES:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment_management', '0016_bookingledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipment',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
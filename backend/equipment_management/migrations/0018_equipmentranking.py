@@ -0,0 +1,28 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment_management', '0017_equipment_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EquipmentRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('trending', 'Trending'), ('featured', 'Featured')], max_length=20)),
+                ('position', models.PositiveIntegerField()),
+                ('score', models.FloatField()),
+                ('computed_at', models.DateTimeField()),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='equipment_management.category')),
+                ('equipment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='equipment_management.equipment')),
+            ],
+            options={
+                'ordering': ('kind', 'category', 'position'),
+                'indexes': [models.Index(fields=['kind', 'category', 'position'], name='ranking_list_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 4.2 on 2026-10-17 22:49
+
+# Brings the migration state in line with fields the baseline models declared but never
+# migrated. Unrelated to the booking ledger: it shipped in the ledger series only because
+# an empty database could not be migrated to a schema the app can query without it.
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0018_sync_model_state'),
+        ('equipment_management', '0019_equipment_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='equipment',
+            options={'ordering': ('-date_created',), 'verbose_name_plural': 'equipments'},
+        ),
+        migrations.AlterModelOptions(
+            name='image',
+            options={'verbose_name_plural': 'images'},
+        ),
+        migrations.AlterModelOptions(
+            name='review',
+            options={'ordering': ['-date_created'], 'verbose_name_plural': 'reviews'},
+        ),
+        migrations.AddField(
+            model_name='equipment',
+            name='is_verified',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='is_pickup',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='is_return',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='order_item',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='equipment_management.order'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='identity_document_image',
+            field=models.ImageField(blank=True, null=True, upload_to='pickup_identity_documents/'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='identity_document_type',
+            field=models.CharField(choices=[('id', 'ID'), ('dl', 'Driver License'), ('passport', 'Passport')], default='id', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='return_item_condition',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='return_item_condition_custom',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AlterField(
+            model_name='equipment',
+            name='address',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='user_management.address'),
+        ),
+        migrations.AlterField(
+            model_name='equipment',
+            name='tags',
+            field=models.ManyToManyField(blank=True, to='equipment_management.tag'),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='payment_status',
+            field=models.CharField(choices=[('paid', 'Paid'), ('pending', 'Pending'), ('unpaid', 'Unpaid')], default='unpaid', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('partially_approved', 'Partially Approved'), ('approved', 'Approved'), ('pickup', 'Pickup Initiated'), ('partial_pickup', 'Partial Pickup'), ('partially_rented', 'Partially Rented'), ('rented', 'Rented'), ('partially_returned', 'Partially Returned'), ('returned', 'Returned'), ('return', 'Return Initiated'), ('disputed', 'Disputed'), ('completed', 'Completed'), ('canceled', 'Canceled'), ('rejected', 'Rejected')], default='pending', max_length=50),
+        ),
+    ]
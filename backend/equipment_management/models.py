@@ -9,8 +9,8 @@ from decimal import Decimal
 # (None in this case)
 
 # Django Imports
-from django.db import models
-from django.db.models import Sum
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
 from django.conf import settings
 from django.shortcuts import reverse
 from django.utils.text import slugify
@@ -161,6 +161,8 @@ class Equipment(models.Model):
         slug (str): A URL-friendly slug for the equipment (unique).
         is_trending (bool): Indicates whether the equipment is trending.
         is_featured (bool): Indicates whether the equipment is featured.
+        search_vector (SearchVector): Weighted full-text vector of the name, tags, category and
+            description, maintained on PostgreSQL only.
     """
     id = models.CharField(
         primary_key=True,
@@ -199,9 +201,15 @@ class Equipment(models.Model):
     is_trending = models.BooleanField(default=False)
     is_featured = models.BooleanField(default=False)
 
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         ordering = ('-date_created',)
         verbose_name_plural = "equipments"
+        indexes = [
+            # Keyset (cursor) pagination of the catalogue, newest first
+            models.Index(fields=['date_created', 'id'], name='equipment_created_id_idx'),
+        ]
 
     def __str__(self) -> str:
         """
@@ -230,19 +238,11 @@ class Equipment(models.Model):
             end_date (datetime): The end date of the rental period.
 
         Returns:
-            int: The available quantity of the equipment.
+            int: The quantity that is free on every day of the rental period.
         """
-        rented_items = CartItem.objects.filter(
-            item=self,
-            start_date__lt=end_date,
-            end_date__gt=start_date,
-            # Todo: Consider adding a filter for ordered items if needed
-            ordered=True
-        )
+        from .availability import check_availability
 
-        rented_quantity = rented_items.aggregate(Sum('quantity'))['quantity__sum'] or 0
-        available_quantity = self.available_quantity - rented_quantity
-        return max(available_quantity, 0)  # Prevent negative available quantity
+        return check_availability(self, start_date, end_date).available
 
     def is_available_for_dates(self, start_date, end_date) -> bool:
         """
@@ -253,17 +253,11 @@ class Equipment(models.Model):
             end_date (datetime): The end date of the rental period.
 
         Returns:
-            bool: True if the equipment is available, False otherwise.
+            bool: True if at least one unit is free on every day of the period, False otherwise.
         """
-        rented_items = CartItem.objects.filter(
-            item=self,
-            start_date__lt=end_date,
-            end_date__gt=start_date,
-            ordered=True
-        )
+        from .availability import check_availability
 
-        rented_quantity = rented_items.aggregate(Sum('quantity'))['quantity__sum'] or 0
-        return self.available_quantity - rented_quantity > 0
+        return check_availability(self, start_date, end_date).is_available
 
     def get_average_rating(self) -> float:
         """
@@ -915,6 +909,9 @@ class OrderItem(models.Model):
         ('canceled', 'Canceled'),
     ]
 
+    # Statuses whose booked quantity no longer counts against the equipment's stock
+    RELEASED_STATUSES = ('rejected', 'canceled', 'completed')
+
     IDENTITY_DOCUMENT_CHOICES = [
         ('id', 'ID'),
         ('dl', 'Driver License'),
@@ -995,10 +992,115 @@ class OrderItem(models.Model):
     def save(self, *args, **kwargs):
         """
         Saves the order item, ensuring the total is calculated beforehand.
-        Also updates the parent order's total price and item count.
+        Keeps the booking ledger in step within the same transaction and
+        updates the parent order's total price and item count.
         """
+        from .availability import BOOKING_FIELDS, booking_state, update_ledger
+
         self.total = self.get_order_item_total  # Ensures total is calculated before saving
-        super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = OrderItem.objects.select_for_update().filter(pk=self.pk).values(*BOOKING_FIELDS).first()
+
+            super().save(*args, **kwargs)
+            update_ledger(previous, booking_state(self))
 
         if self.order:
-            self.order.save()
\ No newline at end of file
+            self.order.save()
+
+
+class BookingLedger(models.Model):
+    """
+    Materialized per-day booked quantity of an equipment item.
+
+    Rows are maintained by `OrderItem.save` and the `post_delete` signal, and can be
+    rebuilt from scratch with the `rebuild_booking_ledger` management command.
+
+    Attributes:
+        equipment (Equipment): The equipment being booked.
+        day (date): The calendar day.
+        booked_quantity (int): The quantity held by active order items on that day.
+    """
+    equipment = models.ForeignKey(
+        Equipment,
+        on_delete=models.CASCADE,
+        related_name='booking_ledger'
+    )
+    day = models.DateField()
+    booked_quantity = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ('equipment', 'day')
+        verbose_name_plural = "booking ledger"
+        constraints = [
+            models.UniqueConstraint(fields=['equipment', 'day'], name='unique_booking_ledger_day'),
+        ]
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of the ledger row.
+
+        Returns:
+            str: A formatted string indicating the equipment, day and booked quantity.
+        """
+        return f"{self.booked_quantity} x {self.equipment_id} booked on {self.day}"
+
+
+class EquipmentRanking(models.Model):
+    """
+    A precomputed position of an equipment item in a trending or featured list.
+
+    Rows are replaced wholesale by the `compute_rankings` Celery task; the home feeds
+    read them (through the cache) instead of sorting the catalogue per request.
+
+    Attributes:
+        kind (str): The list the row belongs to (trending or featured).
+        category (Category): The category the list is for, or None for the whole catalogue.
+        equipment (Equipment): The ranked equipment.
+        position (int): The 1-based position in the list.
+        score (float): The decayed demand score the list is ordered by.
+        computed_at (datetime): When the list was computed.
+    """
+    TRENDING = 'trending'
+    FEATURED = 'featured'
+    KIND_CHOICES = [
+        (TRENDING, 'Trending'),
+        (FEATURED, 'Featured'),
+    ]
+
+    kind = models.CharField(
+        max_length=20,
+        choices=KIND_CHOICES
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='rankings'
+    )
+    equipment = models.ForeignKey(
+        Equipment,
+        on_delete=models.CASCADE,
+        related_name='rankings'
+    )
+    position = models.PositiveIntegerField()
+    score = models.FloatField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ('kind', 'category', 'position')
+        indexes = [
+            models.Index(fields=['kind', 'category', 'position'], name='ranking_list_idx'),
+        ]
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of the ranking row.
+
+        Returns:
+            str: A formatted string indicating the list, position and equipment.
+        """
+        return f"{self.kind} #{self.position} in {self.category_id or 'all'}: {self.equipment_id}"
@@ -1,22 +1,133 @@
+from rest_framework.exceptions import ParseError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
-from rest_framework.utils.urls import replace_query_param
-import math
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+import base64
+import binascii
+import hashlib
+import json
 from urllib.parse import urlparse, urlunparse
 
+from django.conf import settings
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+from .cache import cache_get_or_set, catalogue_version, equipment_version
+from .facets import normalize_filter_query
+
+# Exact or bounded count of one paginated query: counts:<count version>:<path and filter hash>
+COUNT_KEY = "counts:{version}:{digest}"
+
+# How a response's `count` was obtained
+COUNT_EXACT = "exact"
+COUNT_ESTIMATE = "estimate"  # the planner's row estimate of the whole table
+COUNT_LOWER_BOUND = "lower_bound"  # more than `count` items match
+
+
+def estimated_row_count(model):
+    """
+    Returns PostgreSQL's row estimate for a model's table, or None elsewhere or before
+    the table was first analyzed.
+    """
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [model._meta.db_table])
+        row = cursor.fetchone()
+    return row[0] if row and row[0] >= 0 else None
+
+
+class CountedPage(Page):
+    """
+    Page that knows whether another follows from the row after it, not from the count.
+    """
+
+    def __init__(self, object_list, number, paginator, more):
+        super().__init__(object_list, number, paginator)
+        self.more = more
+
+    def has_next(self):
+        return self.more
+
+
+class CountedPaginator(Paginator):
+    """
+    Django paginator whose item count comes from a callback instead of `COUNT(*)`.
+
+    The count may be an estimate, a lower bound or cached from before the latest
+    writes, so pages are never cut or refused by it: each page fetches one row past
+    its end to tell whether another follows, and only an empty page past the first
+    is out of range.
+    """
+
+    def __init__(self, object_list, per_page, count_function, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_function = count_function
+
+    @cached_property
+    def count(self):
+        return self.count_function()
+
+    def validate_number(self, number):
+        """Validate a 1-based page number without checking it against the count"""
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_("That page number is not an integer"))
+        if number < 1:
+            raise EmptyPage(_("That page number is less than 1"))
+        return number
+
+    def page(self, number):
+        """Return the page of `per_page + 1` rows from its start, keeping the extra row for `has_next`"""
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(_("That page contains no results"))
+        return CountedPage(rows[:self.per_page], number, self, more=len(rows) > self.per_page)
+
+
 class CustomEquipmentPagination(PageNumberPagination):
     """
     Custom pagination that enforces HTTPS for ALL URLs (prev, next, page links)
+
+    Pages are numbered by default. Passing `cursor` (empty for the first page) switches
+    to keyset pagination on (`date_created`, `id`), where every page costs the same
+    and no total count is computed.
+
+    Numbered pages avoid an exact `COUNT(*)` where they can: see `get_count`.
     """
-    page_size = 120  
+    page_size = 120
     page_size_query_param = "page_size"
-    max_page_size = 1000 
+    max_page_size = 1000
+
+    # Counts stop at this many items and are reported as "more than count_limit"
+    count_limit = 10000
+    # Use the table's row estimate for unfiltered lists of large tables
+    estimate_unfiltered_count = True
+
+    # Numbered page links listed on each side of the current page (`page_window`, 0 for none);
+    # None lists every page unless the client asks for a window
+    page_window = None
+    page_window_query_param = "page_window"
+    max_page_window = 50
+
+    cursor_query_param = "cursor"
+    # Orders of the paginated queryset the cursor mode can page through (newest first)
+    cursor_orderings = [(), ("-date_created",), ("-date_created", "-id")]
 
     def enforce_https(self, url):
         """Force HTTPS for any URL if the original request was secure"""
         if not url:
             return url
-            
+
         if self.request and self.request.is_secure():
             parsed = urlparse(url)
             if parsed.scheme == 'http':
@@ -42,27 +153,192 @@ class CustomEquipmentPagination(PageNumberPagination):
         url = super().get_previous_link()
         return self.enforce_https(url)
 
+    def get_page_window(self):
+        """Number of page links on each side of the current page, from `page_window`, or None for all pages"""
+        window = self.request.query_params.get(self.page_window_query_param, self.page_window)
+        if window is None:
+            return None
+        try:
+            window = int(window)
+        except ValueError:
+            raise ParseError(f"{self.page_window_query_param} must be a number.")
+        return min(max(window, 0), self.max_page_window)
+
+    def django_paginator_class(self, queryset, page_size):
+        """Build the Django paginator with a count from `get_count`"""
+        return CountedPaginator(queryset, page_size, lambda: self.get_count(queryset))
+
+    def get_count(self, queryset):
+        """
+        Count the items of the paginated query, as cheaply as the query allows.
+
+        - Unfiltered lists of a table the planner estimates at `count_limit` rows or more
+          use that estimate (PostgreSQL only).
+        - Otherwise the query is counted with a LIMIT of `count_limit + 1`, so a broad
+          filter never counts past `count_limit`, and the result is cached for the
+          request path and normalized filters until `get_count_version` moves or
+          `PAGINATION_COUNT_CACHE_TTL` expires.
+
+        The count only labels the response: pages are fetched past it (see `CountedPaginator`).
+        """
+        if isinstance(queryset, list):
+            # Already in memory, such as search matches in relevance order
+            self.count_accuracy = COUNT_EXACT
+            return len(queryset)
+
+        filters = normalize_filter_query(self.request.query_params)
+        if self.estimate_unfiltered_count and not filters:
+            estimate = estimated_row_count(queryset.model)
+            if estimate is not None and estimate >= self.count_limit:
+                self.count_accuracy = COUNT_ESTIMATE
+                return estimate
+
+        digest = hashlib.sha1(json.dumps([self.request.path, filters], sort_keys=True).encode('utf-8')).hexdigest()
+        key = COUNT_KEY.format(version=self.get_count_version(), digest=digest)
+        count = cache_get_or_set(
+            key, lambda: queryset.order_by()[:self.count_limit + 1].count(), settings.PAGINATION_COUNT_CACHE_TTL
+        )
+
+        if count > self.count_limit:
+            self.count_accuracy = COUNT_LOWER_BOUND
+            return self.count_limit
+        self.count_accuracy = COUNT_EXACT
+        return count
+
+    def get_count_version(self):
+        """
+        Version the cached counts are keyed by, moved by any catalogue or equipment change
+        (bookings and reviews included, which change date-filtered and rated results).
+        """
+        return f"{catalogue_version()}:{equipment_version()}"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.view = view
+        self.count_accuracy = COUNT_EXACT
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if self.cursor_mode:
+            return self.paginate_cursor(queryset, request)
+        return super().paginate_queryset(queryset, request, view)
+
+    def encode_cursor(self, item, reverse):
+        """Encode the keyset position of an item as an opaque cursor"""
+        position = {"d": item.date_created.isoformat(), "i": item.id, "r": int(reverse)}
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        """Decode a cursor into (date_created, id, reverse), or None for the first page"""
+        if not cursor:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            date_created = parse_datetime(position["d"])
+            if date_created is None:
+                raise ValueError(position["d"])
+            return date_created, str(position["i"]), bool(position["r"])
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise ParseError("Invalid cursor.")
+
+    def paginate_cursor(self, queryset, request):
+        """
+        Fetch the page after (or, for a reverse cursor, before) the cursor's position.
+
+        The page is one indexed range scan of `page_size + 1` rows whatever its depth;
+        the extra row tells whether another page follows.
+        """
+        if isinstance(queryset, list) or tuple(queryset.query.order_by) not in self.cursor_orderings:
+            raise ParseError("Cursor pagination is only available in the default (newest first) order.")
+
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request.query_params.get(self.cursor_query_param))
+        reverse = bool(position and position[2])
+
+        if position:
+            date_created, item_id = position[0], position[1]
+            if reverse:
+                queryset = queryset.filter(Q(date_created__gt=date_created) | Q(date_created=date_created, id__gt=item_id))
+            else:
+                queryset = queryset.filter(Q(date_created__lt=date_created) | Q(date_created=date_created, id__lt=item_id))
+        ordering = ("date_created", "id") if reverse else ("-date_created", "-id")
+
+        rows = list(queryset.order_by(*ordering)[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        # Coming from another page means there is one on the side we came from
+        self.has_next = has_more if not reverse else True
+        self.has_previous = has_more if reverse else position is not None
+        self.cursor_page = rows
+        return rows
+
+    def get_cursor_link(self, item, reverse):
+        url = self.enforce_https(self.request.build_absolute_uri())
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(item, reverse))
+
+    def get_cursor_response(self, data):
+        rows = self.cursor_page
+        return Response({
+            "next": self.get_cursor_link(rows[-1], False) if rows and self.has_next else None,
+            "previous": self.get_cursor_link(rows[0], True) if rows and self.has_previous else None,
+            "results": data,
+        })
+
     def get_paginated_response(self, data):
-        total_pages = math.ceil(self.page.paginator.count / self.page_size)
+        if self.cursor_mode:
+            return self.get_cursor_response(data)
+
+        paginator = self.page.paginator
         current_page = self.page.number
-        total_items = self.page.paginator.count
+        has_next = self.page.has_next()
+        total_pages = max(paginator.num_pages, current_page + has_next)
+        total_items = paginator.count
+
+        # Items seen up to this page (and the row after it) outnumber a bounded or stale count
+        seen = (current_page - 1) * paginator.per_page + len(self.page) + has_next
+        if seen > total_items:
+            total_items = seen
+            self.count_accuracy = COUNT_LOWER_BOUND if has_next else COUNT_EXACT
 
-        # Generate numbered page links with HTTPS enforcement
+        # Numbered page links (all of them, or a window around the current page), built from one base URL
+        window = self.get_page_window()
+        if window is None:
+            first_page, last_page = 1, total_pages
+        else:
+            first_page, last_page = max(1, current_page - window), min(total_pages, current_page + window)
+        base_url = self.get_page_link(current_page) if window != 0 else None
         page_links = [
             {
                 "page": i,
-                "label": i * self.page_size,  
-                "url": self.get_page_link(i),  # HTTPS enforced here
+                "label": i * paginator.per_page,
+                "url": replace_query_param(base_url, self.page_query_param, i),  # HTTPS enforced on the base
             }
-            for i in range(1, total_pages + 1)
-        ]
+            for i in range(first_page, last_page + 1)
+        ] if window != 0 else []
 
         return Response({
             "count": total_items,
+            "count_accuracy": self.count_accuracy,  # exact, estimate or lower_bound
             "total_pages": total_pages,
             "current_page": current_page,
             "next": self.get_next_link(),          # HTTPS enforced
             "previous": self.get_previous_link(),  # HTTPS enforced
             "page_links": page_links,             # All HTTPS
             "results": data,
-        })
\ No newline at end of file
+        })
+
+
+class ReviewPagination(CustomEquipmentPagination):
+    """
+    Pagination for the reviews of one equipment item, with the same HTTPS links
+    """
+    page_size = 20
+    max_page_size = 100
+    # The reviews of one item are a small slice of the table; its estimate says nothing
+    estimate_unfiltered_count = False
+
+    def get_count_version(self):
+        """Review counts move with their equipment's version stamp, which review writes touch"""
+        return equipment_version(self.view.kwargs.get("pk"))
@@ -0,0 +1,279 @@
+# Standard Library Imports
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+# Third-Party Imports
+import redis
+
+# Django Imports
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils.timezone import now
+
+# Local Imports
+from .models import Category, Equipment, EquipmentRanking, OrderItem, Review
+from .cache import bump_catalogue_version, cache_get, cache_set
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Detail page views of equipment on one day: a Redis hash of equipment ID -> count
+VIEWS_KEY = "rankings:views:{day}"
+# The IDs of one ranked list: rankings:<kind>:<category_id or "all">
+RANKING_KEY = "rankings:{kind}:{category}"
+
+# Length of each precomputed list
+RANKING_SIZE = 20
+
+# Hand-set flags that stand in for a computed list with no scored equipment
+CURATED_FLAGS = {
+    EquipmentRanking.TRENDING: 'is_trending',
+    EquipmentRanking.FEATURED: 'is_featured',
+}
+
+# How far back each list looks, and the age at which an event counts half as much
+RANKING_WINDOWS = {
+    EquipmentRanking.TRENDING: {'days': 14, 'half_life_days': 3},
+    EquipmentRanking.FEATURED: {'days': 90, 'half_life_days': 30},
+}
+# Longest window, for how long daily view counts are kept
+VIEWS_RETENTION_DAYS = max(window['days'] for window in RANKING_WINDOWS.values()) + 1
+
+# Contribution of one event to the score before decay
+BOOKING_WEIGHT = 5.0  # per booked unit
+REVIEW_WEIGHT = 3.0  # a 5-star review; a 1-star review subtracts as much
+VIEW_WEIGHT = 0.1
+
+# Bookings that were turned down or withdrawn do not show demand
+DECLINED_STATUSES = ('rejected', 'canceled')
+
+
+def record_view(equipment_id) -> None:
+    """
+    Counts a view of an equipment item's detail page towards its rankings.
+
+    Args:
+        equipment_id (str): The ID of the viewed equipment.
+    """
+    key = VIEWS_KEY.format(day=now().date().isoformat())
+    try:
+        pipeline = get_redis().pipeline(transaction=False)
+        pipeline.hincrby(key, equipment_id, 1)
+        pipeline.expire(key, VIEWS_RETENTION_DAYS * 24 * 60 * 60)
+        pipeline.execute()
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ Could not record a view of equipment {equipment_id}: {e}")
+
+
+def daily_view_counts(days: int) -> dict:
+    """
+    Reads the recorded detail page views of the last `days` days.
+
+    Returns:
+        dict: {day: {equipment_id: views}}; empty if Redis is unavailable.
+    """
+    today = now().date()
+    window = [today - timedelta(days=offset) for offset in range(days)]
+    try:
+        pipeline = get_redis().pipeline(transaction=False)
+        for day in window:
+            pipeline.hgetall(VIEWS_KEY.format(day=day.isoformat()))
+        counts = pipeline.execute()
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ Could not read equipment view counts: {e}")
+        return {}
+    return {day: {equipment_id: int(views) for equipment_id, views in day_counts.items()}
+            for day, day_counts in zip(window, counts)}
+
+
+def demand_scores(days: int, half_life_days: float, view_counts: dict) -> dict:
+    """
+    Scores equipment by recent bookings, reviews and views, each decayed by its age.
+
+    An event `age` days old counts `0.5 ** (age / half_life_days)` times its weight,
+    so recent demand outweighs older demand of the same size.
+
+    Args:
+        days (int): How many days of events to count.
+        half_life_days (float): The age at which an event counts half.
+        view_counts (dict): {day: {equipment_id: views}}, as returned by `daily_view_counts`.
+
+    Returns:
+        dict: {equipment_id: score} for equipment with any recent activity.
+    """
+    today = now().date()
+    since = today - timedelta(days=days - 1)
+
+    def decay(day) -> float:
+        return 0.5 ** ((today - day).days / half_life_days)
+
+    scores = defaultdict(float)
+
+    # Order items carry no timestamp of their own; their order's creation time is the booking time
+    bookings = OrderItem.objects.filter(order__date_created__date__gte=since).exclude(
+        status__in=DECLINED_STATUSES
+    ).annotate(day=TruncDate('order__date_created')).values('item_id', 'day').annotate(
+        units=Sum('quantity')
+    ).order_by()
+    for row in bookings:
+        scores[row['item_id']] += BOOKING_WEIGHT * (row['units'] or 0) * decay(row['day'])
+
+    reviews = Review.objects.filter(date_created__date__gte=since).annotate(
+        day=TruncDate('date_created')
+    ).values('equipment_id', 'day', 'rating').annotate(count=Count('id')).order_by()
+    for row in reviews:
+        scores[row['equipment_id']] += REVIEW_WEIGHT * (row['rating'] - 3) / 2 * row['count'] * decay(row['day'])
+
+    for day, counts in view_counts.items():
+        if day < since:
+            continue
+        for equipment_id, views in counts.items():
+            scores[equipment_id] += VIEW_WEIGHT * views * decay(day)
+
+    return scores
+
+
+def rank(scores: dict, categories: dict, ancestors: dict) -> dict:
+    """
+    Splits scored equipment into the top lists of the catalogue and of each category.
+
+    Equipment counts towards its own category and every category above it.
+
+    Args:
+        scores (dict): {equipment_id: score}.
+        categories (dict): {equipment_id: category_id} of the rankable equipment.
+        ancestors (dict): {category_id: [category_id and its ancestors]}.
+
+    Returns:
+        dict: {category_id or None: [(equipment_id, score), ...]}, best first.
+    """
+    ordered = sorted(
+        ((equipment_id, score) for equipment_id, score in scores.items()
+         if score > 0 and equipment_id in categories),
+        key=lambda entry: (-entry[1], entry[0])
+    )
+
+    lists = defaultdict(list)
+    for equipment_id, score in ordered:
+        for category_id in [None, *ancestors.get(categories[equipment_id], [])]:
+            if len(lists[category_id]) < RANKING_SIZE:
+                lists[category_id].append((equipment_id, score))
+    return lists
+
+
+def category_ancestors() -> dict:
+    """
+    Returns {category_id: [category_id, parent_id, ...]} for every category.
+    """
+    parents = dict(Category.objects.values_list('id', 'parent_id'))
+    ancestors = {}
+    for category_id in parents:
+        chain, current = [], category_id
+        while current and current not in chain:
+            chain.append(current)
+            current = parents.get(current)
+        ancestors[category_id] = chain
+    return ancestors
+
+
+def compute_rankings() -> dict:
+    """
+    Recomputes the trending and featured lists, stores them and caches them.
+
+    The lists replace the previous ones in one transaction. The hand-set `is_trending`
+    and `is_featured` flags are left alone; `get_ranking` falls back to them for a list
+    that comes out empty. The catalogue version only moves when a list's order changes.
+
+    Returns:
+        dict: {kind: number of ranked equipment in the catalogue-wide list}.
+    """
+    computed_at = now()
+    categories = dict(Equipment.objects.filter(is_verified=True).values_list('id', 'category_id'))
+    ancestors = category_ancestors()
+    view_counts = daily_view_counts(VIEWS_RETENTION_DAYS)
+
+    rankings = {
+        kind: rank(demand_scores(window['days'], window['half_life_days'], view_counts), categories, ancestors)
+        for kind, window in RANKING_WINDOWS.items()
+    }
+
+    rows = [
+        EquipmentRanking(
+            kind=kind, category_id=category_id, equipment_id=equipment_id,
+            position=position, score=score, computed_at=computed_at
+        )
+        for kind, lists in rankings.items()
+        for category_id, entries in lists.items()
+        for position, (equipment_id, score) in enumerate(entries, start=1)
+    ]
+
+    with transaction.atomic():
+        previous = set(EquipmentRanking.objects.values_list('kind', 'category_id', 'equipment_id', 'position'))
+        EquipmentRanking.objects.all().delete()
+        EquipmentRanking.objects.bulk_create(rows, batch_size=1000)
+
+        # The ranked responses' ETags carry the catalogue version; scores alone do not show
+        if previous != {(row.kind, row.category_id, row.equipment_id, row.position) for row in rows}:
+            transaction.on_commit(bump_catalogue_version)
+
+    for kind, lists in rankings.items():
+        # Categories that dropped out of the lists get an empty entry instead of a stale one
+        for category_id in [None, *ancestors]:
+            cache_ranking(kind, category_id, [equipment_id for equipment_id, _ in lists.get(category_id, [])])
+
+    return {kind: len(lists.get(None, [])) for kind, lists in rankings.items()}
+
+
+def cache_ranking(kind: str, category_id, equipment_ids: list) -> None:
+    """
+    Caches the equipment IDs of one ranked list.
+    """
+    key = RANKING_KEY.format(kind=kind, category=category_id or 'all')
+    cache_set(key, equipment_ids, settings.RANKINGS_CACHE_TTL)
+
+
+def get_ranking(kind: str, category_id=None) -> list:
+    """
+    Returns the equipment IDs of a ranked list, best first.
+
+    Served from the cache, falling back to the precomputed table, and to the hand-set
+    flags (see `curated_ranking`) while the list is empty.
+
+    Args:
+        kind (str): `trending` or `featured`.
+        category_id (str): The category of the list, or None for the whole catalogue.
+
+    Returns:
+        list: The equipment IDs.
+    """
+    key = RANKING_KEY.format(kind=kind, category=category_id or 'all')
+    equipment_ids = cache_get(key)
+    if equipment_ids is None:
+        equipment_ids = list(
+            EquipmentRanking.objects.filter(kind=kind, category_id=category_id).order_by('position').values_list(
+                'equipment_id', flat=True
+            )
+        )
+        cache_ranking(kind, category_id, equipment_ids)
+    return equipment_ids or curated_ranking(kind, category_id)
+
+
+def curated_ranking(kind: str, category_id=None) -> list:
+    """
+    Returns the verified equipment flagged by hand for a list kind, newest first.
+
+    Args:
+        kind (str): `trending` or `featured`.
+        category_id (str): The category of the list, including its subcategories, or None.
+
+    Returns:
+        list: The equipment IDs, at most `RANKING_SIZE`.
+    """
+    queryset = Equipment.objects.filter(is_verified=True, **{CURATED_FLAGS[kind]: True})
+    if category_id:
+        categories = [category for category, chain in category_ancestors().items() if category_id in chain]
+        queryset = queryset.filter(category_id__in=categories)
+    return list(queryset.order_by('-date_created').values_list('id', flat=True)[:RANKING_SIZE])
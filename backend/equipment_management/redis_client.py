@@ -0,0 +1,29 @@
+import ssl
+
+import redis
+from django.conf import settings
+
+_client = None
+
+
+def get_redis() -> redis.Redis:
+    """
+    Returns a process-wide Redis client for the instance Celery already uses.
+
+    Short socket timeouts keep request handling responsive if Redis is unreachable;
+    callers are expected to treat `redis.RedisError` as "no data".
+    """
+    global _client
+    if _client is None:
+        options = {}
+        if settings.REDIS_URL.startswith("rediss://"):
+            options['ssl_cert_reqs'] = ssl.CERT_NONE
+
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_timeout=1,
+            socket_connect_timeout=1,
+            **options
+        )
+    return _client
@@ -0,0 +1,133 @@
+# Standard Library Imports
+from collections import defaultdict
+
+# Django Imports
+from django.db import transaction
+
+# Local Imports
+from .models import Equipment, OrderItem, BookingLedger
+from .availability import booking_state, booking_window, daily_booked_levels, update_ledger
+from .holds import held_levels, release_hold
+from .cache import invalidate_equipment_availability, touch_equipment_versions
+from .response_cache import equipment_tag, purge_response_tags
+
+
+class ReservationError(Exception):
+    """
+    Raised when a cart cannot be reserved because an item is fully booked.
+
+    Attributes:
+        equipment (Equipment): The equipment that ran out.
+        day (date): The first day that cannot fit the requested quantity.
+        available (int): The quantity that was still free on that day.
+        requested (int): The quantity the cart asked for on that day.
+    """
+
+    def __init__(self, equipment, day, available, requested):
+        self.equipment = equipment
+        self.day = day
+        self.available = available
+        self.requested = requested
+        super().__init__(
+            f"Not enough inventory for {equipment.name} on {day}. "
+            f"Available: {available}, Requested: {requested}"
+        )
+
+
+def reserve_cart_items(order, cart_items) -> list:
+    """
+    Turns cart items into order items without ever overbooking the equipment.
+
+    The affected Equipment rows are locked with `select_for_update` in ascending ID
+    order, so concurrent checkouts queue up per item instead of deadlocking. Capacity
+    is re-checked day by day against the booking ledger and other carts' holds while
+    the locks are held, and the order items are then inserted in bulk.
+
+    Args:
+        order (Order): The order the new items belong to.
+        cart_items (iterable): The CartItem instances to reserve.
+
+    Returns:
+        list: The created OrderItem instances.
+
+    Raises:
+        ReservationError: If any item no longer fits on some day of its period.
+    """
+    cart_items = list(cart_items)
+    if not cart_items:
+        return []
+
+    with transaction.atomic():
+        equipments = {
+            equipment.id: equipment
+            for equipment in Equipment.objects.select_for_update().filter(
+                id__in={cart_item.item_id for cart_item in cart_items}
+            ).order_by('id')
+        }
+
+        windows = [booking_window(cart_item.start_date, cart_item.end_date) for cart_item in cart_items]
+        booked = defaultdict(dict)
+        for equipment_id, day, quantity in BookingLedger.objects.filter(
+            equipment_id__in=equipments,
+            day__gte=min(start for start, _ in windows),
+            day__lt=max(end for _, end in windows),
+        ).values_list('equipment_id', 'day', 'booked_quantity'):
+            booked[equipment_id][day] = quantity
+
+        # Other carts' unexpired holds count as booked; this cart's own holds do not
+        held = held_levels(
+            [(cart_item.item_id, *window) for cart_item, window in zip(cart_items, windows)],
+            exclude_cart_items=[cart_item.id for cart_item in cart_items],
+        )
+        for equipment_id, days in held.items():
+            for day, quantity in days.items():
+                booked[equipment_id][day] = booked[equipment_id].get(day, 0) + quantity
+
+        requested = defaultdict(list)
+        for cart_item in cart_items:
+            requested[cart_item.item_id].append((cart_item.start_date, cart_item.end_date, cart_item.quantity))
+
+        # Re-check every day of every period, counting items of the same equipment together
+        for equipment_id in sorted(requested):
+            equipment = equipments[equipment_id]
+            for day, quantity in daily_booked_levels(requested[equipment_id]):
+                already_booked = max(booked[equipment_id].get(day, 0), 0)
+                if already_booked + quantity > equipment.available_quantity:
+                    raise ReservationError(
+                        equipment, day, max(equipment.available_quantity - already_booked, 0), quantity
+                    )
+
+        order_items = []
+        for cart_item in cart_items:
+            order_item = OrderItem(
+                order=order,
+                item=equipments[cart_item.item_id],
+                quantity=cart_item.quantity,
+                start_date=cart_item.start_date,
+                end_date=cart_item.end_date,
+            )
+            order_item.total = order_item.get_order_item_total
+            order_items.append(order_item)
+
+        # bulk_create skips OrderItem.save, so the ledger and order totals are updated here
+        OrderItem.objects.bulk_create(order_items)
+        for order_item in order_items:
+            update_ledger(current=booking_state(order_item))
+        order.save()
+
+        # The order items now hold the stock, so the cart holds can go
+        def release_cart_holds():
+            for cart_item in cart_items:
+                release_hold(cart_item.id)
+
+        transaction.on_commit(release_cart_holds)
+        # bulk_create sends no post_save either, so the cached booking figures are dropped,
+        # the version stamps behind ETags and cached counts moved and the cached responses purged here
+        def refresh_booked_equipment():
+            invalidate_equipment_availability(*equipments)
+            touch_equipment_versions(*equipments)
+            purge_response_tags(*[equipment_tag(equipment_id) for equipment_id in equipments])
+
+        transaction.on_commit(refresh_booked_equipment)
+
+    return order_items
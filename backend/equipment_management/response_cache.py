@@ -0,0 +1,199 @@
+# Standard Library Imports
+import hashlib
+import logging
+from functools import wraps
+from typing import Callable, Iterable
+
+# Third-Party Imports
+import redis
+from rest_framework.response import Response
+
+# Django Imports
+from django.conf import settings
+from django.core.cache import cache
+
+# Local Imports
+from .cache import cache_delete_many, cache_get
+from .redis_client import get_redis
+from .singleflight import MISSING, single_flight
+
+logger = logging.getLogger(__name__)
+
+# Cached response data of one normalized URL: responses:<digest>
+RESPONSE_KEY = "responses:{digest}"
+# Present while the cached response is fresh; purging a tag deletes it, leaving the data to serve stale
+RESPONSE_FRESH_KEY = "responses:fresh:{digest}"
+# Held by the one request regenerating a stale response
+RESPONSE_REFRESH_KEY = "responses:refresh:{digest}"
+# Redis set of the digests of the responses carrying one tag: responses:tag:<tag>
+RESPONSE_TAG_KEY = "responses:tag:{tag}"
+
+# Seconds a request may spend regenerating a stale response before another may try
+REFRESH_LOCK_TIMEOUT = 30
+
+# Tag of every response listing categories
+CATEGORIES_TAG = "categories"
+
+
+def equipment_tag(equipment_id) -> str:
+    return f"equipment:{equipment_id}"
+
+
+def category_tag(category_id) -> str:
+    return f"category:{category_id}"
+
+
+def request_digest(request) -> str:
+    """
+    Hashes the path and query string of a request, with parameters sorted and blank values dropped.
+    """
+    params = sorted(
+        (name, sorted(value.strip() for value in values if value.strip()))
+        for name, values in request.query_params.lists()
+    )
+    normalized = request.path + '?' + '&'.join(
+        f"{name}={value}" for name, values in params for value in values
+    )
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+def _items(data) -> list:
+    """
+    Returns the items of a list response, paginated or not.
+    """
+    if isinstance(data, dict):
+        data = data.get('results', [])
+    return [item for item in data if isinstance(item, dict)] if isinstance(data, list) else []
+
+
+def equipment_response_tags(data) -> set:
+    """
+    Tags a response listing equipment with each item and its category.
+    """
+    tags = set()
+    for item in _items(data):
+        if item.get('id'):
+            tags.add(equipment_tag(item['id']))
+        if item.get('category'):
+            tags.add(category_tag(item['category']))
+    return tags
+
+
+def category_response_tags(data) -> set:
+    """
+    Tags a response listing categories with each category and subcategory.
+    """
+    tags = {CATEGORIES_TAG}
+    for item in _items(data):
+        tags.add(category_tag(item['id']))
+        tags.update(category_tag(subcategory['id']) for subcategory in item.get('subcategories', []))
+    return tags
+
+
+def store_response(digest: str, data, tags: Iterable[str]) -> None:
+    """
+    Caches response data as fresh for `RESPONSE_CACHE_TTL` seconds, then stale for
+    `RESPONSE_CACHE_STALE_TTL` more, and files it under its tags.
+    """
+    lifetime = settings.RESPONSE_CACHE_TTL + settings.RESPONSE_CACHE_STALE_TTL
+    try:
+        cache.set(RESPONSE_KEY.format(digest=digest), data, lifetime)
+        cache.set(RESPONSE_FRESH_KEY.format(digest=digest), True, settings.RESPONSE_CACHE_TTL)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not cache response {digest}: {e}")
+        return
+
+    try:
+        pipeline = get_redis().pipeline(transaction=False)
+        for tag in tags:
+            key = RESPONSE_TAG_KEY.format(tag=tag)
+            pipeline.sadd(key, digest)
+            pipeline.expire(key, lifetime)
+        pipeline.execute()
+    except redis.RedisError as e:
+        # Untagged, the entry could outlive a purge; drop its freshness so it is only served stale
+        logger.warning(f"⚠️ Could not tag cached response {digest}: {e}")
+        cache_delete_many([RESPONSE_FRESH_KEY.format(digest=digest)])
+
+
+def purge_response_tags(*tags) -> None:
+    """
+    Marks every cached response carrying one of the tags as stale.
+
+    The data stays cached for the stale window: the next request regenerates it while
+    concurrent requests keep being served the stale copy, so a purge never sends every
+    request to the database at once.
+
+    Args:
+        *tags: The tags to purge, such as `equipment_tag(id)` or `CATEGORIES_TAG`.
+    """
+    keys = [RESPONSE_TAG_KEY.format(tag=tag) for tag in set(tags)]
+    if not keys:
+        return
+    try:
+        client = get_redis()
+        pipeline = client.pipeline(transaction=False)
+        for key in keys:
+            pipeline.smembers(key)
+        pipeline.delete(*keys)
+        digests = set().union(*pipeline.execute()[:-1])
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ Could not purge cached responses: {e}")
+        return
+    cache_delete_many([RESPONSE_FRESH_KEY.format(digest=digest) for digest in digests])
+
+
+def cache_response(get_tags: Callable[[object], set]):
+    """
+    Caches the successful responses of a read-only view method for anonymous users.
+
+    Responses are keyed by the normalized URL and tagged by `get_tags(response.data)`
+    for purging. A stale response is regenerated by one request at a time; the others
+    are served the stale copy meanwhile.
+
+    Args:
+        get_tags (callable): Returns the tags of a response from its data.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view_method(self, request, *args, **kwargs)
+
+            digest = request_digest(request)
+            data_key, fresh_key = RESPONSE_KEY.format(digest=digest), RESPONSE_FRESH_KEY.format(digest=digest)
+            refresh_key = RESPONSE_REFRESH_KEY.format(digest=digest)
+            refreshing = False
+            try:
+                cached = cache.get_many([data_key, fresh_key])
+                if data_key in cached:
+                    if fresh_key in cached:
+                        return Response(cached[data_key], headers={'X-Cache': 'HIT'})
+                    refreshing = cache.add(refresh_key, True, REFRESH_LOCK_TIMEOUT)
+                    if not refreshing:
+                        # Another request is regenerating it
+                        return Response(cached[data_key], headers={'X-Cache': 'STALE'})
+            except Exception as e:
+                logger.warning(f"⚠️ Could not read cached response {digest}: {e}")
+
+            def regenerate():
+                response = view_method(self, request, *args, **kwargs)
+                if isinstance(response, Response) and response.status_code == 200:
+                    store_response(digest, response.data, get_tags(response.data))
+                    response['X-Cache'] = 'MISS'
+                return response
+
+            if refreshing:
+                try:
+                    return regenerate()
+                finally:
+                    cache_delete_many([refresh_key])
+
+            def check():
+                data = cache_get(data_key, MISSING)
+                return MISSING if data is MISSING else Response(data, headers={'X-Cache': 'HIT'})
+
+            # Nothing cached at all: serve a copy stored meanwhile, or build the response without waiting
+            return single_flight(data_key, regenerate, check=check)
+        return wrapper
+    return decorator
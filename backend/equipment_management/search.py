@@ -0,0 +1,178 @@
+# Standard Library Imports
+from typing import Iterable
+
+# Django Imports
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db import connection
+from django.db.models import F, OuterRef, Q, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+# Local Imports
+from .models import Category, Equipment
+from .search_index import equipment_index
+
+# Text search configuration used for both the stored vectors and the queries
+SEARCH_CONFIG = 'english'
+# Most matches of one search paged through in relevance order, counted after filtering
+SEARCH_INDEX_LIMIT = 1000
+# Best index matches intersected with the filters, bounding the IN list of the query;
+# a narrow filter whose matches all rank below this finds nothing
+SEARCH_CANDIDATE_LIMIT = 5 * SEARCH_INDEX_LIMIT
+
+# The trigram extension and GIN indexes of the PostgreSQL search backend. Migration 0017
+# creates them too, but deploys regenerate the migrations (see start.sh), so
+# `create_search_indexes` runs these on every boot.
+SEARCH_INDEX_STATEMENTS = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS equipment_search_vector_gin "
+    "ON equipment_management_equipment USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS equipment_name_trgm_gin "
+    "ON equipment_management_equipment USING gin (name gin_trgm_ops)",
+]
+
+
+def search_enabled() -> bool:
+    """
+    Returns whether the database supports the full-text and trigram search backend.
+    """
+    return connection.vendor == 'postgresql'
+
+
+def search_vector_expression():
+    """
+    Builds the weighted search vector of an equipment row.
+
+    The name weighs most, then the tag names, the category name and the description.
+
+    Returns:
+        CombinedExpression: The expression to store in `Equipment.search_vector`.
+    """
+    tag_names = Equipment.tags.through.objects.filter(
+        equipment_id=OuterRef('pk')
+    ).order_by().values('equipment_id').annotate(names=StringAgg('tag__name', delimiter=' ')).values('names')[:1]
+    category_name = Category.objects.filter(pk=OuterRef('category_id')).values('name')[:1]
+
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector(Coalesce(Subquery(tag_names), Value('', output_field=TextField())), weight='B', config=SEARCH_CONFIG)
+        + SearchVector(Coalesce(Subquery(category_name), Value('')), weight='C', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='D', config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(equipment_ids: Iterable = None, missing_only: bool = False) -> int:
+    """
+    Recomputes the stored search vector of equipment items.
+
+    Does nothing on databases other than PostgreSQL, where search falls back to
+    `icontains` and the vectors are not used.
+
+    Args:
+        equipment_ids (iterable): The IDs of the equipment to update (all if omitted).
+        missing_only (bool): Only fill the rows that have no vector yet.
+
+    Returns:
+        int: The number of rows updated.
+    """
+    if not search_enabled():
+        return 0
+
+    queryset = Equipment.objects.all()
+    if equipment_ids is not None:
+        queryset = queryset.filter(pk__in=list(equipment_ids))
+    if missing_only:
+        queryset = queryset.filter(search_vector__isnull=True)
+    return queryset.update(search_vector=search_vector_expression())
+
+
+def create_search_indexes() -> int:
+    """
+    Enables pg_trgm, creates the GIN indexes and fills the missing search vectors.
+
+    Idempotent, and does nothing on databases other than PostgreSQL.
+
+    Returns:
+        int: The number of search vectors filled.
+    """
+    if not search_enabled():
+        return 0
+
+    with connection.cursor() as cursor:
+        for statement in SEARCH_INDEX_STATEMENTS:
+            cursor.execute(statement)
+    return update_search_vectors(missing_only=True)
+
+
+def search_equipment(queryset, query: str):
+    """
+    Filters equipment by a search query.
+
+    When `SEARCH_INDEX_ENABLED` is set, the matching IDs come from the in-process
+    index and the queryset is narrowed to the best `SEARCH_CANDIDATE_LIMIT` of them
+    in SQL, so the other filters apply to every candidate. The relevance order is returned separately for `ranked_matches`.
+    Otherwise, or if the index is unavailable, the database is searched. On
+    PostgreSQL, rows match on the weighted search vector or on a trigram match of the
+    name (so typos still find results), and are ordered by text rank and name
+    similarity. Elsewhere the name and tag names are matched with `icontains`.
+
+    Args:
+        queryset (QuerySet): The equipment to search in.
+        query (str): The user's search text.
+
+    Returns:
+        tuple: The matching equipment, and the index's matching IDs best first (None
+        when the database search did the ordering).
+    """
+    if settings.SEARCH_INDEX_ENABLED:
+        equipment_ids = equipment_index.search(query, limit=SEARCH_CANDIDATE_LIMIT)
+        if equipment_ids is not None:
+            return queryset.filter(pk__in=equipment_ids), equipment_ids
+
+    if not search_enabled():
+        return queryset.filter(
+            Q(name__icontains=query) |
+            Q(tags__name__icontains=query)
+        ).distinct(), None
+
+    search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+    return queryset.filter(
+        Q(search_vector=search_query) | Q(name__trigram_similar=query)
+    ).annotate(
+        search_rank=SearchRank(F('search_vector'), search_query),
+        name_similarity=TrigramSimilarity('name', query),
+    ).order_by('-search_rank', '-name_similarity', '-date_created'), None
+
+
+def ranked_matches(queryset, equipment_ids: list) -> list:
+    """
+    Keeps the IDs that are in a filtered queryset, in their relevance order.
+
+    The limit applies after filtering, so a filtered search still finds its best
+    `SEARCH_INDEX_LIMIT` matches among the `SEARCH_CANDIDATE_LIMIT` candidates.
+
+    Args:
+        queryset (QuerySet): The filtered equipment, already limited to the candidates.
+        equipment_ids (list): The matching IDs, best first.
+
+    Returns:
+        list: The IDs in the queryset, best first.
+    """
+    matched = set(queryset.order_by().values_list('pk', flat=True))
+    return [equipment_id for equipment_id in equipment_ids if equipment_id in matched][:SEARCH_INDEX_LIMIT]
+
+
+def order_by_ids(equipments, equipment_ids: list) -> list:
+    """
+    Sorts fetched equipment like the given IDs, in Python.
+
+    Args:
+        equipments (iterable): The equipment to sort, such as one page.
+        equipment_ids (list): The IDs in the wanted order.
+
+    Returns:
+        list: The equipment, ordered like `equipment_ids`.
+    """
+    position = {equipment_id: index for index, equipment_id in enumerate(equipment_ids)}
+    return sorted(equipments, key=lambda equipment: position.get(equipment.pk, len(position)))
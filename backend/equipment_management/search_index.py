@@ -0,0 +1,355 @@
+# Standard Library Imports
+import bisect
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Iterable, Optional
+
+# Third-Party Imports
+import redis
+
+# Local Imports
+from .models import Equipment
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Redis stream of changed equipment IDs, read by every worker to keep its index current
+CHANGES_STREAM = "search_index:changes"
+# Approximate number of changes kept in the stream
+CHANGES_STREAM_LENGTH = 10000
+# A worker this many changes behind rebuilds its index instead of replaying them
+MAX_CATCH_UP = 1000
+# Minimum number of seconds between two reads of the changes stream by one worker
+SYNC_INTERVAL = 1.0
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Score of a query token matching a document token exactly, by prefix or within one edit
+EXACT_SCORE = 3
+PREFIX_SCORE = 2
+FUZZY_SCORE = 1
+# Shortest query tokens matched by prefix and fuzzily
+MIN_PREFIX_LENGTH = 2
+MIN_FUZZY_LENGTH = 4
+
+
+def tokenize(text) -> list:
+    """
+    Splits text into lowercase alphanumeric tokens.
+    """
+    return TOKEN_PATTERN.findall((text or '').lower())
+
+
+def _deletions(token: str) -> set:
+    """
+    Returns every variant of a token with one character removed.
+    """
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """
+    Returns whether two tokens differ by at most one insertion, deletion, substitution
+    or swap of adjacent characters.
+    """
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+
+    if len(a) == len(b):
+        diffs = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diffs) == 1:
+            return True
+        return (
+            len(diffs) == 2 and diffs[1] == diffs[0] + 1
+            and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]]
+        )
+
+    shorter, longer = (a, b) if len(a) < len(b) else (b, a)
+    i = 0
+    while i < len(shorter) and shorter[i] == longer[i]:
+        i += 1
+    return shorter[i:] == longer[i + 1:]
+
+
+def document_tokens(equipment) -> set:
+    """
+    Returns the searchable tokens of an equipment item: its name, tags, specifications and city.
+
+    Args:
+        equipment (Equipment): The equipment, ideally with its tags, specifications and address loaded.
+
+    Returns:
+        set: The tokens.
+    """
+    texts = [equipment.name, equipment.address.city]
+    texts.extend(tag.name for tag in equipment.tags.all())
+    for specification in equipment.specifications.all():
+        texts.extend([specification.name, specification.value])
+    return {token for text in texts for token in tokenize(text)}
+
+
+def load_documents(equipment_ids: Iterable = None) -> dict:
+    """
+    Loads the tokens of verified equipment from the database.
+
+    Args:
+        equipment_ids (iterable): Only load these equipment IDs (all if omitted).
+
+    Returns:
+        dict: {equipment_id: tokens}
+    """
+    queryset = Equipment.objects.filter(is_verified=True).select_related('address').prefetch_related(
+        'tags', 'specifications'
+    ).order_by()
+    if equipment_ids is not None:
+        queryset = queryset.filter(pk__in=list(equipment_ids))
+    return {equipment.pk: document_tokens(equipment) for equipment in queryset.iterator(chunk_size=2000)}
+
+
+class _IndexState:
+    """
+    The postings and lookup tables of one version of the index.
+    """
+
+    def __init__(self):
+        self.postings = defaultdict(set)  # token -> equipment IDs
+        self.documents = {}  # equipment ID -> tokens
+        self.vocabulary = []  # sorted tokens, for prefix lookups
+        self.deletions = defaultdict(set)  # one-deletion variant -> tokens, for fuzzy lookups
+
+    @classmethod
+    def from_documents(cls, documents: dict) -> '_IndexState':
+        state = cls()
+        for equipment_id, tokens in documents.items():
+            state.add(equipment_id, tokens, sort=False)
+        state.vocabulary = sorted(state.postings)
+        return state
+
+    def _add_token(self, token: str, sort: bool) -> None:
+        if sort:
+            bisect.insort(self.vocabulary, token)
+        if len(token) >= MIN_FUZZY_LENGTH:
+            for variant in _deletions(token):
+                self.deletions[variant].add(token)
+
+    def _remove_token(self, token: str) -> None:
+        del self.postings[token]
+        position = bisect.bisect_left(self.vocabulary, token)
+        if position < len(self.vocabulary) and self.vocabulary[position] == token:
+            self.vocabulary.pop(position)
+        if len(token) >= MIN_FUZZY_LENGTH:
+            for variant in _deletions(token):
+                self.deletions[variant].discard(token)
+                if not self.deletions[variant]:
+                    del self.deletions[variant]
+
+    def add(self, equipment_id, tokens, sort: bool = True) -> None:
+        self.remove(equipment_id)
+        self.documents[equipment_id] = tokens
+        for token in tokens:
+            if token not in self.postings:
+                self._add_token(token, sort)
+            self.postings[token].add(equipment_id)
+
+    def remove(self, equipment_id) -> None:
+        for token in self.documents.pop(equipment_id, ()):
+            equipment_ids = self.postings[token]
+            equipment_ids.discard(equipment_id)
+            if not equipment_ids:
+                self._remove_token(token)
+
+    def match(self, token: str) -> dict:
+        """
+        Returns {equipment_id: score} for the documents matching one query token.
+        """
+        scores = {}
+
+        def score(tokens, value):
+            for matched in tokens:
+                for equipment_id in self.postings.get(matched, ()):
+                    if scores.get(equipment_id, 0) < value:
+                        scores[equipment_id] = value
+
+        score([token], EXACT_SCORE)
+
+        if len(token) >= MIN_PREFIX_LENGTH:
+            position = bisect.bisect_left(self.vocabulary, token)
+            prefixed = []
+            while position < len(self.vocabulary) and self.vocabulary[position].startswith(token):
+                prefixed.append(self.vocabulary[position])
+                position += 1
+            score(prefixed, PREFIX_SCORE)
+
+        if len(token) >= MIN_FUZZY_LENGTH:
+            variants = _deletions(token)
+            candidates = set(self.deletions.get(token, ()))
+            candidates.update(variant for variant in variants if variant in self.postings)
+            for variant in variants:
+                candidates.update(self.deletions.get(variant, ()))
+            score([candidate for candidate in candidates if _within_one_edit(token, candidate)], FUZZY_SCORE)
+
+        return scores
+
+
+class EquipmentSearchIndex:
+    """
+    In-memory inverted index over verified equipment, with prefix and fuzzy matching.
+
+    Each worker process holds its own copy. It is built on first use (or by `warm`
+    at worker start), and kept current by replaying the equipment IDs published to a
+    Redis stream by `publish_changes`, which every writer calls after commit.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._state = None
+        self._stream_position = None
+        self._synced_at = 0.0
+
+    def _stream_tail(self) -> Optional[str]:
+        """
+        Returns the ID of the newest change in the stream, or None if Redis is unavailable.
+        """
+        try:
+            entries = get_redis().xrevrange(CHANGES_STREAM, count=1)
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Could not read the search index changes: {e}")
+            return None
+        return entries[0][0] if entries else '0-0'
+
+    def build(self) -> int:
+        """
+        Rebuilds the whole index from the database.
+
+        Returns:
+            int: The number of indexed equipment items.
+        """
+        # Read the stream position first, so changes made during the load are replayed
+        position = self._stream_tail()
+        state = _IndexState.from_documents(load_documents())
+        with self._lock:
+            self._state = state
+            self._stream_position = position
+            self._synced_at = time.monotonic()
+        return len(state.documents)
+
+    def warm(self) -> None:
+        """
+        Builds the index if it is not built yet, logging instead of failing.
+        """
+        try:
+            if self._state is None:
+                count = self.build()
+                logger.info(f"✅ Equipment search index built with {count} items")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not build the equipment search index: {e}")
+
+    def refresh(self, equipment_ids: Iterable) -> None:
+        """
+        Re-indexes equipment items from the database, dropping those no longer verified.
+
+        Args:
+            equipment_ids (iterable): The IDs of the changed equipment.
+        """
+        equipment_ids = set(equipment_ids)
+        if self._state is None or not equipment_ids:
+            return
+        documents = load_documents(equipment_ids)
+        with self._lock:
+            for equipment_id in equipment_ids:
+                if equipment_id in documents:
+                    self._state.add(equipment_id, documents[equipment_id])
+                else:
+                    self._state.remove(equipment_id)
+
+    def _catch_up(self) -> None:
+        """
+        Applies the changes other workers published since this index was last synced.
+        """
+        if time.monotonic() - self._synced_at < SYNC_INTERVAL:
+            return
+        if self._stream_position is None:
+            # Redis was unavailable when the index was built; changes may have been missed
+            self._synced_at = time.monotonic()
+            if self._stream_tail() is not None:
+                self.build()
+            return
+        try:
+            entries = get_redis().xrange(CHANGES_STREAM, min=f"({self._stream_position}", count=MAX_CATCH_UP + 1)
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Could not read the search index changes: {e}")
+            return
+
+        self._synced_at = time.monotonic()
+        if len(entries) > MAX_CATCH_UP:
+            # Too far behind; the stream may also have been trimmed past our position
+            self.build()
+        elif entries:
+            self.refresh(fields['equipment_id'] for _, fields in entries)
+            self._stream_position = entries[-1][0]
+
+    def search(self, query: str, limit: int = None) -> Optional[list]:
+        """
+        Finds verified equipment matching every token of a query.
+
+        Args:
+            query (str): The user's search text.
+            limit (int): The maximum number of IDs to return.
+
+        Returns:
+            list: Equipment IDs, best match first, or None if the index is unavailable.
+        """
+        if self._state is None:
+            self.warm()
+            if self._state is None:
+                return None
+        self._catch_up()
+
+        results = None
+        with self._lock:
+            for token in dict.fromkeys(tokenize(query)):
+                scores = self._state.match(token)
+                if results is None:
+                    results = scores
+                else:
+                    results = {
+                        equipment_id: results[equipment_id] + score
+                        for equipment_id, score in scores.items() if equipment_id in results
+                    }
+                if not results:
+                    return []
+
+        ranked = sorted(results or {}, key=lambda equipment_id: (-results[equipment_id], equipment_id))
+        return ranked[:limit] if limit else ranked
+
+
+equipment_index = EquipmentSearchIndex()
+
+
+def publish_changes(equipment_ids: Iterable) -> None:
+    """
+    Re-indexes changed equipment in this worker and announces the change to the others.
+
+    Args:
+        equipment_ids (iterable): The IDs of the equipment that changed.
+    """
+    equipment_ids = [equipment_id for equipment_id in set(equipment_ids) if equipment_id]
+    if not equipment_ids:
+        return
+
+    equipment_index.refresh(equipment_ids)
+    try:
+        pipeline = get_redis().pipeline(transaction=False)
+        for equipment_id in equipment_ids:
+            pipeline.xadd(
+                CHANGES_STREAM, {'equipment_id': equipment_id},
+                maxlen=CHANGES_STREAM_LENGTH, approximate=True
+            )
+        pipeline.execute()
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ Could not publish search index changes: {e}")
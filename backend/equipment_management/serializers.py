@@ -1,10 +1,9 @@
 # Standard Library Imports
 import json
-from collections import defaultdict
 
 # Django Imports
 from django.shortcuts import get_object_or_404
-from django.db.models import Sum
+from django.db.models import Avg, Count, FloatField, IntegerField, OuterRef, Prefetch, Subquery, Sum
 
 # Django REST Framework Imports
 from rest_framework import serializers
@@ -12,10 +11,29 @@ from rest_framework.exceptions import PermissionDenied
 
 # Local Imports
 from .models import Category, Tag, Equipment, Image, Specification, Review, Cart, CartItem, Order, OrderItem
+from .availability import check_availability, ledger_runs, upcoming_ledger_prefetch
+from .cache import get_equipment_availability
 from user_management.serializers import AddressSerializer
 from user_management.models import Address, User
 
 
+class DynamicFieldsMixin:
+    """
+    Lets a serializer be limited to a subset of its fields.
+
+    Pass `fields` (an iterable of field names) when creating the serializer; fields not
+    listed are dropped, and unknown names are ignored.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
 class SubcategorySerializer(serializers.ModelSerializer):
     """
     Serializer for subcategories, including the count of associated equipment.
@@ -33,12 +51,17 @@ class SubcategorySerializer(serializers.ModelSerializer):
         """
         Returns the count of equipment items associated with the subcategory.
 
+        Counts passed in the `ad_counts` context ({category_id: count}) are used instead
+        of querying, so a whole tree can be serialized from one grouped query.
+
         Args:
             obj (Category): The subcategory instance.
 
         Returns:
             int: The count of equipment items.
         """
+        if 'ad_counts' in self.context:
+            return self.context['ad_counts'].get(obj.id, 0)
         return obj.equipments.count()
 
 
@@ -61,12 +84,19 @@ class CategorySerializer(serializers.ModelSerializer):
         """
         Returns the total count of equipment items in this category and its subcategories.
 
+        Counts passed in the `ad_counts` context ({category_id: count}) are used instead
+        of querying, so a whole tree can be serialized from one grouped query.
+
         Args:
             obj (Category): The category instance.
 
         Returns:
             int: The total count of equipment items.
         """
+        if 'ad_counts' in self.context:
+            ad_counts = self.context['ad_counts']
+            return ad_counts.get(obj.id, 0) + sum(ad_counts.get(sub.id, 0) for sub in obj.subcategories.all())
+
         direct_count = obj.equipments.count()  # Count equipment directly in the category
 
         # Sum equipment counts from subcategories if they exist
@@ -158,45 +188,67 @@ class EquipmentSerializer(serializers.ModelSerializer):
         address (dict): The address of the equipment.
         hourly_rate (float): The hourly rental rate of the equipment.
         specifications (list): A list of specifications for the equipment.
-        equipment_reviews (list): A list of reviews for the equipment.
+        equipment_reviews (list): The most recent reviews with text, at most `REVIEW_LIMIT`.
+        review_count (int): The number of reviews with text.
         rating (float): The average rating of the equipment.
         booked_dates_data (list): A list of booked dates and quantities for the equipment.
         total_booked (int): The total quantity of the equipment booked.
+        peak_booked (int): The highest quantity of the equipment booked on any upcoming day.
     """
     tags = TagSerializer(many=True, required=False)
     images = ImageSerializer(many=True, read_only=True)
     address = AddressSerializer()
     hourly_rate = serializers.FloatField()
     specifications = SpecificationSerializer(many=True, required=False)
-    equipment_reviews = ReviewSerializer(many=True, read_only=True)
+    equipment_reviews = serializers.SerializerMethodField()
+    review_count = serializers.SerializerMethodField()
     rating = serializers.SerializerMethodField()
     booked_dates_data = serializers.SerializerMethodField()
     total_booked = serializers.SerializerMethodField()
+    peak_booked = serializers.SerializerMethodField()
 
     class Meta:
         model = Equipment
         fields = [
             'owner', 'id', 'category', 'tags', 'name', 'description', 'images', 'hourly_rate', 'address',
-            'available_quantity', 'is_available', 'specifications', 'equipment_reviews', 'rating', 'terms',
-            'is_trending', 'is_featured', 'booked_dates_data', 'total_booked'
+            'available_quantity', 'is_available', 'specifications', 'equipment_reviews', 'review_count', 'rating', 'terms',
+            'is_trending', 'is_featured', 'booked_dates_data', 'total_booked', 'peak_booked'
         ]
         extra_kwargs = {
             'slug': {'write_only': True},  # Slug is write-only and not exposed
         }
 
-    def to_representation(self, instance):
+    # Reviews embedded per equipment; the rest are served by the paginated reviews endpoint
+    REVIEW_LIMIT = 10
+
+    def get_equipment_reviews(self, obj) -> list:
         """
-        Filters out reviews with no review_text before returning the data.
+        Returns the most recent reviews of the equipment that have review text.
 
         Args:
-            instance (Equipment): The equipment instance.
+            obj (Equipment): The equipment instance.
 
         Returns:
-            dict: The serialized representation of the equipment.
+            list: The serialized reviews, newest first.
         """
-        data = super().to_representation(instance)
-        data['equipment_reviews'] = [review for review in data['equipment_reviews'] if review['review_text']]
-        return data
+        reviews = getattr(obj, 'recent_reviews', None)
+        if reviews is None:
+            reviews = written_reviews().filter(equipment=obj)[:self.REVIEW_LIMIT]
+        return ReviewSerializer(reviews, many=True).data
+
+    def get_review_count(self, obj) -> int:
+        """
+        Returns the number of reviews of the equipment that have review text.
+
+        Args:
+            obj (Equipment): The equipment instance.
+
+        Returns:
+            int: The number of reviews.
+        """
+        if hasattr(obj, 'review_count'):
+            return obj.review_count or 0
+        return written_reviews().filter(equipment=obj).count()
 
     def get_rating(self, obj) -> float:
         """
@@ -218,34 +270,33 @@ class EquipmentSerializer(serializers.ModelSerializer):
             obj (Equipment): The equipment instance.
 
         Returns:
-            int: The total quantity booked.
+            int: The total quantity booked, read from the availability cache.
         """
-        total_booked = OrderItem.objects.filter(item=obj).aggregate(total=Sum('quantity'))['total'] or 0
-        return total_booked
+        return get_equipment_availability(obj.id)['total_booked']
 
-    def get_booked_dates_data(self, obj) -> list:
+    def get_peak_booked(self, obj) -> int:
         """
-        Returns a list of booked dates and quantities for the equipment.
+        Returns the highest quantity of the equipment booked on any upcoming day.
 
         Args:
             obj (Equipment): The equipment instance.
 
         Returns:
-            list: A list of dictionaries containing booked dates and quantities.
+            int: The peak booked quantity, read from the availability cache.
         """
-        order_items = OrderItem.objects.filter(item=obj)
-        grouped_bookings = defaultdict(int)
+        return get_equipment_availability(obj.id)['peak_booked']
 
-        for order_item in order_items:
-            date_range_key = (order_item.start_date, order_item.end_date)
-            grouped_bookings[date_range_key] += order_item.quantity  # Sum up the quantities
+    def get_booked_dates_data(self, obj) -> list:
+        """
+        Returns a list of upcoming booked periods and quantities for the equipment.
 
-        booked_dates_data = [
-            {'quantity': quantity, 'start_date': start, 'end_date': end}
-            for (start, end), quantity in grouped_bookings.items()
-        ]
+        Args:
+            obj (Equipment): The equipment instance.
 
-        return booked_dates_data
+        Returns:
+            list: A list of dictionaries containing booked dates and quantities, read from the availability cache.
+        """
+        return get_equipment_availability(obj.id)['booked_dates_data']
 
     def create(self, validated_data):
         """
@@ -279,6 +330,228 @@ class EquipmentSerializer(serializers.ModelSerializer):
         return equipment
 
 
+
+def written_reviews():
+    """
+    Returns the reviews that have review text, newest first.
+
+    Returns:
+        QuerySet: Reviews with a non-null, non-empty review_text.
+    """
+    return Review.objects.filter(review_text__isnull=False).exclude(review_text='')
+
+
+def recent_reviews_prefetch(limit: int = EquipmentSerializer.REVIEW_LIMIT) -> Prefetch:
+    """
+    Builds a Prefetch that loads the `limit` most recent written reviews of each equipment item.
+
+    Django applies the slice per equipment in SQL (with a window function), and the
+    reviews are stored as a list under `recent_reviews`.
+
+    Args:
+        limit (int): The number of reviews to keep per equipment.
+
+    Returns:
+        Prefetch: The prefetch for `Equipment.equipment_reviews`.
+    """
+    return Prefetch('equipment_reviews', queryset=written_reviews()[:limit], to_attr='recent_reviews')
+
+
+def review_count_subquery() -> Subquery:
+    """
+    Builds a subquery for the number of written reviews of the outer equipment row.
+
+    Returns:
+        Subquery: The number of reviews, or NULL if the equipment has none.
+    """
+    review_count = written_reviews().filter(
+        equipment=OuterRef('pk')
+    ).order_by().values('equipment').annotate(count=Count('id')).values('count')[:1]
+    return Subquery(review_count, output_field=IntegerField())
+
+
+def total_booked_subquery() -> Subquery:
+    """
+    Builds a subquery for the total quantity booked by the order items of the outer equipment row.
+
+    Returns:
+        Subquery: The total quantity booked, or NULL if the equipment has no order items.
+    """
+    total = OrderItem.objects.filter(
+        item=OuterRef('pk')
+    ).order_by().values('item').annotate(total=Sum('quantity')).values('total')[:1]
+    return Subquery(total, output_field=IntegerField())
+
+
+def average_rating_subquery() -> Subquery:
+    """
+    Builds a subquery for the average review rating of the outer equipment row.
+
+    A correlated subquery keeps the average correct when the outer query joins other
+    many-valued relations, such as tags in a search.
+
+    Returns:
+        Subquery: The average rating, or NULL if the equipment has no reviews.
+    """
+    average_rating = Review.objects.filter(
+        equipment=OuterRef('pk')
+    ).order_by().values('equipment').annotate(average=Avg('rating')).values('average')[:1]
+    return Subquery(average_rating, output_field=FloatField())
+
+
+class EquipmentListSerializer(DynamicFieldsMixin, EquipmentSerializer):
+    """
+    Read-only variant of EquipmentSerializer for list endpoints.
+
+    Produces the same fields, but reads the rating and booking figures from data
+    loaded by `prepare_queryset` instead of querying once per row, so serializing a
+    page takes a fixed number of queries whatever its size.
+    """
+
+    @staticmethod
+    def prepare_queryset(queryset, since=None):
+        """
+        Loads everything the serializer needs for a queryset of equipment in bulk.
+
+        Args:
+            queryset (QuerySet): The equipment to serialize.
+            since (date): The first day of the booking figures (defaults to today).
+
+        Returns:
+            QuerySet: The queryset with related rows joined, prefetched and annotated.
+        """
+        return queryset.select_related(
+            'address', 'category', 'owner'
+        ).prefetch_related(
+            'tags', 'images', 'specifications', recent_reviews_prefetch(), upcoming_ledger_prefetch(since)
+        ).annotate(
+            average_rating=average_rating_subquery(),
+            review_count=review_count_subquery(),
+            total_booked_quantity=total_booked_subquery()
+        )
+
+    def get_rating(self, obj) -> float:
+        """
+        Returns the annotated average rating, or queries it if the row was not prepared.
+
+        Args:
+            obj (Equipment): The equipment instance.
+
+        Returns:
+            float: The average rating of the equipment, or None if no reviews exist.
+        """
+        if hasattr(obj, 'average_rating'):
+            return obj.average_rating
+        return super().get_rating(obj)
+
+    def get_total_booked(self, obj) -> int:
+        """
+        Returns the annotated total booked quantity, or queries it if the row was not prepared.
+
+        Args:
+            obj (Equipment): The equipment instance.
+
+        Returns:
+            int: The total quantity booked.
+        """
+        if hasattr(obj, 'total_booked_quantity'):
+            return obj.total_booked_quantity or 0
+        return super().get_total_booked(obj)
+
+    def get_peak_booked(self, obj) -> int:
+        """
+        Returns the peak upcoming booked quantity from the prefetched ledger rows.
+
+        Args:
+            obj (Equipment): The equipment instance.
+
+        Returns:
+            int: The peak booked quantity.
+        """
+        if hasattr(obj, 'upcoming_ledger'):
+            return max((row.booked_quantity for row in obj.upcoming_ledger), default=0)
+        return super().get_peak_booked(obj)
+
+    def get_booked_dates_data(self, obj) -> list:
+        """
+        Returns the upcoming booked periods from the prefetched ledger rows.
+
+        Args:
+            obj (Equipment): The equipment instance.
+
+        Returns:
+            list: A list of dictionaries containing booked dates and quantities.
+        """
+        if hasattr(obj, 'upcoming_ledger'):
+            return ledger_runs((row.day, row.booked_quantity) for row in obj.upcoming_ledger)
+        return super().get_booked_dates_data(obj)
+
+
+class EquipmentCardSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """
+    Compact, read-only representation of an equipment item for catalogue grids.
+
+    Attributes:
+        hourly_rate (float): The hourly rental rate of the equipment.
+        image_url (str): The URL of the first image, or None if there are no images.
+        city (str): The city of the equipment's address.
+        rating (float): The average rating of the equipment.
+    """
+    hourly_rate = serializers.FloatField(read_only=True)
+    image_url = serializers.SerializerMethodField()
+    city = serializers.CharField(source='address.city', read_only=True)
+    rating = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Equipment
+        fields = [
+            'id', 'name', 'category', 'hourly_rate', 'image_url', 'city', 'rating',
+            'is_available', 'is_trending', 'is_featured'
+        ]
+        read_only_fields = fields
+
+    @staticmethod
+    def prepare_queryset(queryset):
+        """
+        Loads the address, images and average rating of a queryset of equipment in bulk.
+
+        Args:
+            queryset (QuerySet): The equipment to serialize.
+
+        Returns:
+            QuerySet: The queryset with related rows joined, prefetched and annotated.
+        """
+        return queryset.select_related('address').prefetch_related('images').annotate(
+            average_rating=average_rating_subquery()
+        )
+
+    def get_image_url(self, obj) -> str:
+        """
+        Returns the URL of the equipment's first image.
+
+        Args:
+            obj (Equipment): The equipment instance.
+
+        Returns:
+            str: The URL of the image, or None if the equipment has no images.
+        """
+        image = next(iter(obj.images.all()), None)
+        return image.image.url if image else None
+
+    def get_rating(self, obj) -> float:
+        """
+        Returns the annotated average rating, or queries it if the row was not prepared.
+
+        Args:
+            obj (Equipment): The equipment instance.
+
+        Returns:
+            float: The average rating of the equipment, or None if no reviews exist.
+        """
+        if hasattr(obj, 'average_rating'):
+            return obj.average_rating
+        return obj.get_average_rating()
+
 class CartSerializer(serializers.ModelSerializer):
     """
     Serializer for the Cart model.
@@ -325,22 +598,57 @@ class CartItemSerializer(serializers.ModelSerializer):
         start_date = data.get('start_date')
         end_date = data.get('end_date')
 
-        # Retrieve the equipment and validate its availability
-        equipment = Equipment.objects.get(id=item.id)
+        # Check the requested quantity against every day of the rental period in one pass,
+        # ignoring the hold this cart item already has
+        availability = check_availability(
+            item, start_date, end_date, quantity,
+            exclude_cart_items=[self.instance.id] if self.instance else ()
+        )
 
-        # Check if the item is available during the provided dates
-        if not equipment.is_available_for_dates(start_date, end_date):
-            raise serializers.ValidationError(f"The item '{equipment.name}' is not available for the selected dates.")
+        if availability.available < 1:
+            raise serializers.ValidationError(f"The item '{item.name}' is not available for the selected dates.")
 
-        # Check if the requested quantity exceeds the available quantity
-        if quantity > equipment.get_available_quantity(start_date, end_date):
+        if not availability.is_available:
             raise serializers.ValidationError(
-                f"Only {equipment.get_available_quantity(start_date, end_date)} items are available for the selected dates."
+                f"Only {availability.available} items are available for the selected dates."
             )
 
         return data
 
 
+class AvailabilityRequestSerializer(serializers.Serializer):
+    """
+    Serializer for one entry of a bulk availability request.
+
+    Attributes:
+        equipment_id (str): The ID of the equipment to check.
+        start_date (date): The start date of the rental period.
+        end_date (date): The end date of the rental period.
+        quantity (int): The quantity requested.
+    """
+    equipment_id = serializers.CharField(max_length=16)
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    quantity = serializers.IntegerField(min_value=1, default=1)
+
+    def validate(self, data):
+        """
+        Ensures the end date is not before the start date.
+
+        Args:
+            data (dict): The data to validate.
+
+        Returns:
+            dict: The validated data.
+
+        Raises:
+            serializers.ValidationError: If the end date is before the start date.
+        """
+        if data['end_date'] < data['start_date']:
+            raise serializers.ValidationError("End date must be after the start date.")
+        return data
+
+
 class OrderItemSerializer(serializers.ModelSerializer):
     """
     Serializer for the OrderItem model.
@@ -391,6 +699,98 @@ class OrderItemSerializer(serializers.ModelSerializer):
         return total or 0
 
 
+
+class EquipmentSummarySerializer(serializers.ModelSerializer):
+    """
+    Small, read-only summary of an equipment item for embedding in order history.
+
+    Attributes:
+        hourly_rate (float): The hourly rental rate of the equipment.
+        images (list): The images of the equipment.
+    """
+    hourly_rate = serializers.FloatField(read_only=True)
+    images = ImageSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Equipment
+        fields = ['id', 'name', 'category', 'hourly_rate', 'images']
+        read_only_fields = fields
+
+
+class OrderItemHistorySerializer(serializers.ModelSerializer):
+    """
+    Order item representation for order history, embedding only an equipment summary.
+
+    The `total_booked` and `peak_booked` booking statistics are only included when the
+    serializer context has `include_stats` set.
+
+    Attributes:
+        item (dict): A summary of the equipment item.
+        booked_dates (dict): The booked dates and quantity for the order item.
+        total_booked (int): The total quantity of the related equipment booked (opt-in).
+        peak_booked (int): The peak upcoming booked quantity of the equipment (opt-in).
+    """
+    item = EquipmentSummarySerializer(read_only=True)
+    booked_dates = serializers.SerializerMethodField()
+    total_booked = serializers.SerializerMethodField()
+    peak_booked = serializers.SerializerMethodField()
+
+    class Meta:
+        model = OrderItem
+        fields = [
+            'id', 'ordered', 'item', 'order', 'quantity', 'start_date', 'end_date', 'booked_dates', 'total_booked',
+            'peak_booked', 'status', 'identity_document_type', 'identity_document_image', 'return_item_condition', 'return_item_condition_custom'
+        ]
+        read_only_fields = fields
+
+    def get_fields(self):
+        # Evaluated lazily, once the nested serializer is bound and can see the root context
+        fields = super().get_fields()
+        if not self.context.get('include_stats'):
+            fields.pop('total_booked')
+            fields.pop('peak_booked')
+        return fields
+
+    def get_booked_dates(self, obj) -> dict:
+        """
+        Returns the booked dates and quantity for the order item.
+
+        Args:
+            obj (OrderItem): The order item instance.
+
+        Returns:
+            dict: A dictionary containing the start date, end date, and quantity.
+        """
+        return {
+            "start_date": obj.start_date,
+            "end_date": obj.end_date,
+            "quantity": obj.quantity
+        }
+
+    def get_total_booked(self, obj) -> int:
+        """
+        Returns the total quantity of the related equipment booked.
+
+        Args:
+            obj (OrderItem): The order item instance.
+
+        Returns:
+            int: The total quantity booked, read from the availability cache.
+        """
+        return get_equipment_availability(obj.item_id)['total_booked']
+
+    def get_peak_booked(self, obj) -> int:
+        """
+        Returns the highest quantity of the related equipment booked on any upcoming day.
+
+        Args:
+            obj (OrderItem): The order item instance.
+
+        Returns:
+            int: The peak booked quantity, read from the availability cache.
+        """
+        return get_equipment_availability(obj.item_id)['peak_booked']
+
 class OrderSerializer(serializers.ModelSerializer):
     """
     Serializer for the Order model.
@@ -405,4 +805,31 @@ class OrderSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'payment_token', 'user', 'status', 'shipping_address', 'billing_address', 'payment_status',
             'date_created', 'date_ordered', 'ordered', 'cart', 'order_total_price', 'total_order_items', 'order_items'
-        ]
\ No newline at end of file
+        ]
+
+
+class OrderHistorySerializer(serializers.ModelSerializer):
+    """
+    Compact serializer for a user's order history.
+
+    Attributes:
+        order_items (list): The order items, each with an equipment summary.
+    """
+    order_items = OrderItemHistorySerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = OrderSerializer.Meta.fields
+
+    @staticmethod
+    def prepare_queryset(queryset):
+        """
+        Prefetches the order items, their equipment and its images in one go.
+
+        Args:
+            queryset (QuerySet): The orders to serialize.
+
+        Returns:
+            QuerySet: The queryset with its order items prefetched.
+        """
+        return queryset.prefetch_related('order_items__item__images')
@@ -0,0 +1,266 @@
+from collections import defaultdict
+from typing import Callable, Iterable
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .models import CartItem, Category, Equipment, Image, OrderItem, Review, Specification, Tag
+from .availability import booking_state, update_ledger
+from .cache import (
+    adjust_category_counts, bump_catalogue_version, invalidate_category_tree, invalidate_equipment_availability,
+    touch_equipment_versions,
+)
+from .holds import place_hold, release_hold
+from .response_cache import CATEGORIES_TAG, category_tag, equipment_tag, purge_response_tags
+from .search import update_search_vectors
+from .search_index import publish_changes
+from user_management.models import Address
+
+
+def refresh_equipment(equipment_ids: Iterable, search_vectors: bool = False, search_index: bool = False,
+                      catalogue: bool = False, tags: Iterable = (), also: Iterable[Callable] = ()) -> None:
+    """
+    Refreshes what is derived from changed equipment items, in one callback once the
+    write commits.
+
+    The items always move to new version stamps, and the cached responses showing
+    them are marked stale. Callers work out the affected IDs once and pass them here.
+
+    No change purges every equipment list: lists an item newly matches pick it up
+    when their fresh window (`RESPONSE_CACHE_TTL`) ends, unless a category tag
+    passed here covers them.
+
+    Args:
+        equipment_ids (iterable): The IDs of the changed equipment.
+        search_vectors (bool): Recompute their search vectors now, inside the write's transaction.
+        search_index (bool): Re-index them in the in-process search indexes.
+        catalogue (bool): Move the catalogue to a new version (the listing itself changed).
+        tags (iterable): Further response cache tags to purge.
+        also (iterable): Further callables to run in the same callback.
+    """
+    equipment_ids = [equipment_id for equipment_id in equipment_ids if equipment_id]
+    if search_vectors and equipment_ids:
+        update_search_vectors(equipment_ids)
+
+    tags = [*tags, *(equipment_tag(equipment_id) for equipment_id in equipment_ids)]
+    if not equipment_ids and not tags and not catalogue and not also:
+        return
+
+    def refresh():
+        for callback in also:
+            callback()
+        if search_index:
+            publish_changes(equipment_ids)
+        if equipment_ids:
+            touch_equipment_versions(*equipment_ids)
+        if catalogue:
+            bump_catalogue_version()
+        if tags:
+            purge_response_tags(*tags)
+
+    transaction.on_commit(refresh)
+
+
+@receiver(post_save, sender=OrderItem)
+def refresh_booked_equipment(sender, instance, **kwargs):
+    """
+    Refreshes a booked equipment item's cached booking figures, version stamp and
+    responses once the order item write commits.
+
+    Covers new bookings as well as every status change made through `OrderItem.save`.
+    """
+    equipment_id = instance.item_id
+    refresh_equipment([equipment_id], also=[lambda: invalidate_equipment_availability(equipment_id)])
+
+
+@receiver(post_delete, sender=OrderItem)
+def release_booking_on_delete(sender, instance, **kwargs):
+    """
+    Removes a deleted order item's quantity from the booking ledger, then refreshes
+    its equipment once the delete commits.
+
+    Runs inside the delete's transaction, including cascades from a deleted Order.
+    """
+    update_ledger(previous=booking_state(instance))
+    equipment_id = instance.item_id
+    refresh_equipment([equipment_id], also=[lambda: invalidate_equipment_availability(equipment_id)])
+
+
+@receiver(post_save, sender=CartItem)
+def hold_cart_item(sender, instance, **kwargs):
+    """
+    Places (or moves) the short-lived hold of a saved cart item.
+
+    Runs inside the write's transaction, so a `HoldError` for stock another cart
+    already holds, or `HoldUnavailable` without Redis, rolls the cart item back. Writes
+    wrapped in `atomic_cart_write` give the hold back if they roll back; others leave
+    it to expire.
+    """
+    place_hold(instance)
+
+
+@receiver(post_delete, sender=CartItem)
+def release_cart_item_hold(sender, instance, **kwargs):
+    """
+    Releases the hold of a deleted cart item once the delete commits.
+    """
+    cart_item_id = instance.id
+    transaction.on_commit(lambda: release_hold(cart_item_id))
+
+
+@receiver(pre_save, sender=Equipment)
+def remember_equipment_listing(sender, instance, **kwargs):
+    """
+    Records the stored category and verification status of an equipment item before it changes.
+    """
+    instance._previous_listing = None
+    if not instance._state.adding:
+        instance._previous_listing = Equipment.objects.filter(pk=instance.pk).values(
+            'category_id', 'is_verified'
+        ).first()
+
+
+@receiver(post_save, sender=Equipment)
+def refresh_saved_equipment(sender, instance, **kwargs):
+    """
+    Re-indexes a saved equipment item and, once the write commits, moves it between
+    the cached category counts and refreshes the catalogue.
+
+    Lists showing the item are purged through its own tag. A new listing (created,
+    moved to another category, verified or unverified) also purges the lists of its
+    old and new categories, and the category responses if their ad counts change.
+
+    `update_search_vectors` writes with `QuerySet.update`, so this does not re-trigger itself.
+    """
+    deltas = defaultdict(int)
+    previous = getattr(instance, '_previous_listing', None)
+    if previous and previous['is_verified']:
+        deltas[previous['category_id']] -= 1
+    if instance.is_verified:
+        deltas[instance.category_id] += 1
+
+    tags = []
+    if previous != {'category_id': instance.category_id, 'is_verified': instance.is_verified}:
+        tags.append(category_tag(instance.category_id))
+        if previous:
+            tags.append(category_tag(previous['category_id']))
+    counts_changed = any(deltas.values())
+    if counts_changed:
+        tags.append(CATEGORIES_TAG)
+
+    refresh_equipment(
+        [instance.pk], search_vectors=True, search_index=True, catalogue=True, tags=tags,
+        also=[lambda: adjust_category_counts(deltas)] if counts_changed else [],
+    )
+
+
+@receiver(post_delete, sender=Equipment)
+def refresh_deleted_equipment(sender, instance, **kwargs):
+    """
+    Removes a deleted equipment item from the cached category counts, the search
+    indexes and the catalogue once the delete commits.
+
+    Lists showing the item are purged through its own tag; the category responses
+    only if it was counted in them.
+    """
+    category_id = instance.category_id
+    refresh_equipment(
+        [instance.pk], search_index=True, catalogue=True, tags=[CATEGORIES_TAG] if instance.is_verified else [],
+        also=[lambda: adjust_category_counts({category_id: -1})] if instance.is_verified else [],
+    )
+
+
+@receiver(m2m_changed, sender=Equipment.tags.through)
+def refresh_retagged_equipment(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Re-indexes and refreshes equipment whose tags were added, removed or cleared.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        equipment_ids = [instance.pk]
+    elif pk_set:
+        equipment_ids = list(pk_set)
+    else:
+        equipment_ids = list(Equipment.objects.filter(tags=instance).values_list('pk', flat=True))
+    refresh_equipment(equipment_ids, search_vectors=True, search_index=True)
+
+
+@receiver(post_save, sender=Category)
+def refresh_saved_category(sender, instance, created, **kwargs):
+    """
+    Recomputes the search vectors of a renamed category's equipment and, once the
+    write commits, drops the cached category tree and refreshes the catalogue.
+    """
+    if not created:
+        update_search_vectors(instance.equipments.values_list('pk', flat=True))
+    refresh_equipment(
+        [], catalogue=True, tags=[category_tag(instance.pk), CATEGORIES_TAG], also=[invalidate_category_tree]
+    )
+
+
+@receiver(post_delete, sender=Category)
+def refresh_deleted_category(sender, instance, **kwargs):
+    """
+    Drops the cached category tree and refreshes the catalogue once a category delete commits.
+    """
+    refresh_equipment(
+        [], catalogue=True, tags=[category_tag(instance.pk), CATEGORIES_TAG], also=[invalidate_category_tree]
+    )
+
+
+@receiver(post_save, sender=Tag)
+def refresh_renamed_tag(sender, instance, created, **kwargs):
+    """
+    Re-indexes and refreshes the equipment of a renamed tag.
+    """
+    if not created:
+        equipment_ids = list(Equipment.objects.filter(tags=instance).values_list('pk', flat=True))
+        refresh_equipment(equipment_ids, search_vectors=True, search_index=True)
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_tagged_equipment(sender, instance, **kwargs):
+    """
+    Records the equipment of a tag before its delete removes their links to it.
+    """
+    instance._equipment_ids = list(Equipment.objects.filter(tags=instance).values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def refresh_deleted_tag(sender, instance, **kwargs):
+    """
+    Re-indexes and refreshes the equipment that carried a deleted tag.
+    """
+    refresh_equipment(getattr(instance, '_equipment_ids', []), search_vectors=True, search_index=True)
+
+
+@receiver(post_save, sender=Address)
+def refresh_relocated_equipment(sender, instance, created, **kwargs):
+    """
+    Re-indexes and refreshes the equipment at a changed address, and the catalogue.
+    """
+    if not created:
+        equipment_ids = list(Equipment.objects.filter(address=instance).values_list('pk', flat=True))
+        refresh_equipment(equipment_ids, search_index=True, catalogue=bool(equipment_ids))
+
+
+@receiver(post_save, sender=Specification)
+@receiver(post_delete, sender=Specification)
+def refresh_specified_equipment(sender, instance, **kwargs):
+    """
+    Re-indexes and refreshes an equipment item when its specifications change.
+    """
+    refresh_equipment([instance.equipment_id], search_index=True)
+
+
+@receiver(post_save, sender=Image)
+@receiver(post_delete, sender=Image)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def refresh_related_equipment(sender, instance, **kwargs):
+    """
+    Refreshes an equipment item's version stamp and responses when its images or reviews change.
+    """
+    refresh_equipment([instance.equipment_id])
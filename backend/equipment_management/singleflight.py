@@ -0,0 +1,98 @@
+# Standard Library Imports
+import logging
+import threading
+import uuid
+import weakref
+from typing import Callable
+
+# Third-Party Imports
+import redis
+
+# Local Imports
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Held in Redis by the one process computing a value: singleflight:<name>
+LOCK_KEY = "singleflight:{name}"
+
+# Seconds a computation may hold the lock before another process may take over
+LOCK_TIMEOUT = 30
+
+# Returned by `check` functions when the result is not available yet
+MISSING = object()
+
+# Deletes the lock only if it still holds our token, so an expired lock taken over by
+# another process is not released by the late original holder
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_local_locks = weakref.WeakValueDictionary()
+_local_locks_guard = threading.Lock()
+
+
+def _local_lock(name: str) -> threading.Lock:
+    """
+    Returns the in-process lock of a name, shared by the threads computing it.
+    """
+    with _local_locks_guard:
+        lock = _local_locks.get(name)
+        if lock is None:
+            lock = _local_locks[name] = threading.Lock()
+        return lock
+
+
+def single_flight(name: str, compute: Callable, check: Callable = None, lock_timeout: int = LOCK_TIMEOUT):
+    """
+    Runs `compute` in one process at a time across all workers and pods.
+
+    The process that takes the Redis lock computes (and is expected to store) the
+    result. The others never wait for it, which would tie up a sync worker: they
+    return what `check` finds, typically a stale copy, and compute the result
+    themselves only if there is none. If Redis is unreachable, an in-process lock
+    still coalesces the threads of this process.
+
+    Usable anywhere a cache miss is expensive: views, serializers and Celery tasks.
+
+    Args:
+        name (str): Identifies the computation, usually the cache key it fills.
+        compute (callable): Computes, stores and returns the result.
+        check (callable): Returns the stored result, fresh or stale, or `MISSING`.
+        lock_timeout (int): Seconds after which a held lock expires.
+
+    Returns:
+        The result of `compute` or `check`.
+    """
+    key = LOCK_KEY.format(name=name)
+    token = uuid.uuid4().hex
+    try:
+        client = get_redis()
+        acquired = client.set(key, token, nx=True, ex=lock_timeout)
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ Could not take the lock of {name}, coalescing in this process only: {e}")
+        lock = _local_lock(name)
+        with lock:
+            if check is not None:
+                result = check()
+                if result is not MISSING:
+                    return result
+            return compute()
+
+    if acquired:
+        try:
+            return compute()
+        finally:
+            try:
+                client.eval(RELEASE_SCRIPT, 1, key, token)
+            except redis.RedisError as e:
+                logger.warning(f"⚠️ Could not release the lock of {name}: {e}")
+
+    if check is not None:
+        result = check()
+        if result is not MISSING:
+            return result
+    return compute()
@@ -0,0 +1,197 @@
+# Standard Library Imports
+import bisect
+import json
+import logging
+import threading
+import time
+from typing import Optional
+
+# Third-Party Imports
+import redis
+
+# Local Imports
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Snapshot of the suggestion terms written by the rebuild task, and its build time
+SNAPSHOT_KEY = "suggest:snapshot"
+SNAPSHOT_VERSION_KEY = "suggest:version"
+# Minimum number of seconds between two checks of the snapshot version by one worker
+SYNC_INTERVAL = 30.0
+
+# Suggestion kinds, in the order they are listed for equally good matches
+KINDS = ('tag', 'equipment', 'city')
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+
+
+def normalize(text) -> str:
+    """
+    Lowercases text and collapses its whitespace, for prefix comparisons.
+    """
+    return ' '.join((text or '').lower().split())
+
+
+def load_terms() -> list:
+    """
+    Loads the suggestion terms from the database: tag names, verified equipment names
+    and the cities verified equipment is located in.
+
+    Returns:
+        list: [kind, label] pairs, without duplicates per kind.
+    """
+    from .models import Equipment, Tag
+
+    terms = {}
+    sources = [
+        ('tag', Tag.objects.values_list('name', flat=True)),
+        ('equipment', Equipment.objects.filter(is_verified=True).values_list('name', flat=True)),
+        ('city', Equipment.objects.filter(is_verified=True).values_list('address__city', flat=True)),
+    ]
+    for kind, labels in sources:
+        for label in labels.order_by().distinct().iterator():
+            label = ' '.join((label or '').split())
+            if label:
+                terms.setdefault((kind, normalize(label)), label)
+    return [[kind, label] for (kind, _), label in terms.items()]
+
+
+class _SuggestState:
+    """
+    The sorted prefix keys of one snapshot.
+
+    Every term is keyed by its full text and by the text from each later word on, so
+    "drill" suggests "Bosch Drill". `keys` is sorted; `entries[i]` is the index in
+    `terms` of the term `keys[i]` belongs to.
+    """
+
+    def __init__(self, terms: list):
+        self.terms = [(kind, label) for kind, label in terms]
+        pairs = []
+        for index, (kind, label) in enumerate(self.terms):
+            words = normalize(label).split(' ')
+            for start in range(len(words)):
+                pairs.append((' '.join(words[start:]), index))
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.entries = [index for _, index in pairs]
+
+    def match(self, prefix: str, limit: int) -> list:
+        """
+        Returns the terms with a word run starting with `prefix`, best first.
+
+        Terms whose whole text starts with the prefix rank before those matching on a
+        later word; then shorter labels, then by kind and label.
+        """
+        position = bisect.bisect_left(self.keys, prefix)
+        # Cap the scan so very short prefixes stay cheap
+        end = min(bisect.bisect_right(self.keys, prefix + '\uffff'), position + limit * 50)
+
+        matched = {}
+        for key_position in range(position, end):
+            index = self.entries[key_position]
+            kind, label = self.terms[index]
+            starts_label = normalize(label) == self.keys[key_position]
+            rank = (not starts_label, len(label), KINDS.index(kind), label.lower())
+            if index not in matched or rank < matched[index]:
+                matched[index] = rank
+
+        ranked = sorted(matched, key=matched.get)[:limit]
+        return [{'text': self.terms[index][1], 'type': self.terms[index][0]} for index in ranked]
+
+
+class SuggestIndex:
+    """
+    In-memory prefix index of search suggestions.
+
+    The terms are read from the database only by the `rebuild_suggestions` Celery task,
+    which stores them in Redis. Each worker loads that snapshot into a sorted array and
+    reloads it when the task publishes a newer one, so answering a query is a binary
+    search in memory, with no database access.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def load(self) -> bool:
+        """
+        Loads the latest snapshot from Redis if it is newer than the one in memory.
+
+        Returns:
+            bool: Whether a snapshot is loaded.
+        """
+        self._checked_at = time.monotonic()
+        try:
+            client = get_redis()
+            version = client.get(SNAPSHOT_VERSION_KEY)
+            if version is None or version == self._version:
+                return self._state is not None
+            snapshot = client.get(SNAPSHOT_KEY)
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Could not load the search suggestions: {e}")
+            return self._state is not None
+
+        if snapshot is None:
+            return self._state is not None
+        state = _SuggestState(json.loads(snapshot))
+        with self._lock:
+            self._state = state
+            self._version = version
+        return True
+
+    def warm(self) -> None:
+        """
+        Loads the snapshot, queueing a rebuild if none was published yet.
+        """
+        if self.load():
+            return
+        try:
+            from .tasks import rebuild_suggestions
+
+            rebuild_suggestions.delay()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not queue a rebuild of the search suggestions: {e}")
+
+    def suggest(self, query: str, limit: int = DEFAULT_LIMIT) -> Optional[list]:
+        """
+        Returns suggestions for the text typed so far.
+
+        Args:
+            query (str): The partial search text.
+            limit (int): The maximum number of suggestions.
+
+        Returns:
+            list: {'text', 'type'} dicts, best first, or None if no snapshot is available.
+        """
+        if time.monotonic() - self._checked_at >= SYNC_INTERVAL:
+            self.load()
+        state = self._state
+        if state is None:
+            return None
+
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        return state.match(prefix, limit)
+
+
+suggest_index = SuggestIndex()
+
+
+def rebuild_snapshot() -> int:
+    """
+    Rebuilds the suggestion terms from the database and publishes them to the workers.
+
+    Returns:
+        int: The number of terms.
+    """
+    terms = load_terms()
+    pipeline = get_redis().pipeline()
+    pipeline.set(SNAPSHOT_KEY, json.dumps(terms))
+    pipeline.set(SNAPSHOT_VERSION_KEY, str(time.time()))
+    pipeline.execute()
+    return len(terms)
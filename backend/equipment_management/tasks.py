@@ -3,6 +3,9 @@ from django.utils.timezone import now
 from django_celery_beat.models import PeriodicTask, CrontabSchedule
 import json
 from .models import OrderItem
+from .holds import release_expired_holds
+from .suggest import rebuild_snapshot
+from .rankings import compute_rankings as compute_equipment_rankings
 
 @shared_task
 def reject_expired_orders():
@@ -33,6 +36,30 @@ def reduce_equipment_available():
         count += 1
     return f"Reduced equipment availability for {count} order items."
 
+@shared_task
+def release_expired_cart_holds():
+    """
+    Give the stock held by expired cart holds back to the equipment.
+    """
+    released = release_expired_holds()
+    return f"Released {released} expired cart holds."
+
+@shared_task
+def rebuild_suggestions():
+    """
+    Rebuild the search suggestion terms and publish them to the web workers.
+    """
+    count = rebuild_snapshot()
+    return f"Published {count} search suggestions."
+
+@shared_task
+def compute_rankings():
+    """
+    Recompute the trending and featured equipment lists from recent demand.
+    """
+    counts = compute_equipment_rankings()
+    return f"Ranked {counts['trending']} trending and {counts['featured']} featured equipment items."
+
 # Register the periodic task for rejecting expired orders
 def setup_periodic_task():
     """
@@ -86,3 +113,84 @@ def setup_periodic_task_reduce_equipment():
         print("✅ Periodic Task Created: Reduce equipment available")
     else:
         print("🔄 Periodic Task Updated: Reduce equipment available")
+
+# Register the periodic task for releasing expired cart holds
+def setup_periodic_task_release_cart_holds():
+    """
+    Ensures the periodic task for releasing expired cart holds is created or updated.
+    """
+    schedule, _ = CrontabSchedule.objects.get_or_create(
+        minute="*",    # Every minute
+        hour="*",
+        day_of_week="*",
+        day_of_month="*",
+        month_of_year="*"
+    )
+
+    task, created = PeriodicTask.objects.update_or_create(
+        name="Release expired cart holds",
+        defaults={
+            "crontab": schedule,
+            "task": "equipment_management.tasks.release_expired_cart_holds",
+            "args": json.dumps([]),
+        },
+    )
+
+    if created:
+        print("✅ Periodic Task Created: Release expired cart holds")
+    else:
+        print("🔄 Periodic Task Updated: Release expired cart holds")
+
+# Register the periodic task for rebuilding the search suggestions
+def setup_periodic_task_rebuild_suggestions():
+    """
+    Ensures the periodic task for rebuilding the search suggestions is created or updated.
+    """
+    schedule, _ = CrontabSchedule.objects.get_or_create(
+        minute="*/10",  # Every 10 minutes
+        hour="*",
+        day_of_week="*",
+        day_of_month="*",
+        month_of_year="*"
+    )
+
+    task, created = PeriodicTask.objects.update_or_create(
+        name="Rebuild search suggestions",
+        defaults={
+            "crontab": schedule,
+            "task": "equipment_management.tasks.rebuild_suggestions",
+            "args": json.dumps([]),
+        },
+    )
+
+    if created:
+        print("✅ Periodic Task Created: Rebuild search suggestions")
+    else:
+        print("🔄 Periodic Task Updated: Rebuild search suggestions")
+
+# Register the periodic task for computing the trending and featured rankings
+def setup_periodic_task_compute_rankings():
+    """
+    Ensures the periodic task for computing the trending and featured rankings is created or updated.
+    """
+    schedule, _ = CrontabSchedule.objects.get_or_create(
+        minute="*/30",  # Every 30 minutes
+        hour="*",
+        day_of_week="*",
+        day_of_month="*",
+        month_of_year="*"
+    )
+
+    task, created = PeriodicTask.objects.update_or_create(
+        name="Compute equipment rankings",
+        defaults={
+            "crontab": schedule,
+            "task": "equipment_management.tasks.compute_rankings",
+            "args": json.dumps([]),
+        },
+    )
+
+    if created:
+        print("✅ Periodic Task Created: Compute equipment rankings")
+    else:
+        print("🔄 Periodic Task Updated: Compute equipment rankings")
@@ -17,6 +17,7 @@ from .views import (
     SessionStatusView,
     UserEquipmentView,
     UserEditableEquipmentView,
+    SuggestView,
 )
 from user_management.views import ReportViewSet, ContactViewSet, CompanyInfoView, FAQViewSet
 
@@ -62,6 +63,9 @@ urlpatterns = [
     path('user-editable-equipment/', UserEditableEquipmentView.as_view(), name='user-editable-equipment-list'),
     path('equipments/<str:pk>/related/', EquipmentViewSet.as_view({'get': 'related'}), name='related-items'),
 
+    # Search box suggestions
+    path('suggest/', SuggestView.as_view(), name='suggest'),
+
 
     # Company info
     path('company-info/', CompanyInfoView.as_view(), name='company-info'),
@@ -1,22 +1,20 @@
 # Standard library imports
 import json
-from datetime import datetime, timedelta
+from datetime import datetime
 
 
 # Django imports
 from django.conf import settings
-from django.db.models import Sum
-from django.db.models import Q
 from django.db import transaction
 
 from django.db import transaction
-from django.http import JsonResponse, QueryDict
+from django.http import JsonResponse, QueryDict, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
-from django.utils.timezone import now
 from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.views.decorators.http import require_POST
+from django.utils.decorators import method_decorator
 from django.contrib.auth.decorators import login_required
 
 
@@ -27,7 +25,7 @@ from rest_framework.decorators import action
 from rest_framework import viewsets, permissions, status, generics
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
+from rest_framework.exceptions import AuthenticationFailed, ParseError, PermissionDenied
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
@@ -35,21 +33,42 @@ from rest_framework.pagination import PageNumberPagination
 
 
 # Local application imports
-from .models import Category, Tag, Equipment, Image, Specification, Review, Cart, CartItem, Order, OrderItem
+from .models import (
+    Category, Tag, Equipment, EquipmentRanking, Image, Specification, Review, Cart, CartItem, Order, OrderItem
+)
 from .serializers import (
     CategorySerializer,
     TagSerializer,
     EquipmentSerializer,
+    EquipmentListSerializer,
+    EquipmentCardSerializer,
     ImageSerializer,
     SpecificationSerializer,
     ReviewSerializer,
     CartSerializer,
     CartItemSerializer,
     OrderSerializer,
-    OrderItemSerializer
+    OrderHistorySerializer,
+    OrderItemSerializer,
+    AvailabilityRequestSerializer,
+    written_reviews
 )
 
-from .pagination import CustomEquipmentPagination
+from .pagination import CustomEquipmentPagination, ReviewPagination
+from .reservations import reserve_cart_items, ReservationError
+from .holds import HoldError, HoldUnavailable, atomic_cart_write
+from .cache import get_equipment_availability, get_category_tree
+from .search import search_equipment, ranked_matches, order_by_ids
+from .facets import get_facets
+from .geo import within_radius
+from .suggest import suggest_index, DEFAULT_LIMIT, MAX_LIMIT
+from .rankings import get_ranking, record_view
+from .export import EXPORT_FORMATS, export_lines
+from .conditional import catalogue_condition, equipment_condition
+from .response_cache import cache_response, category_response_tags, equipment_response_tags
+from .availability import (
+    check_availability, check_availability_bulk, annotate_free_quantity, to_date
+)
 
 from user_management.views import JWTAuthenticationFromCookie
 from user_management.utils import send_custom_email
@@ -60,7 +79,7 @@ stripe.api_key = settings.STRIPE_SECRET_KEY
 # Other constants
 DOMAIN = settings.DOMAIN_URL
 
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 
 
 class CreateCheckoutSessionView(APIView):
@@ -80,7 +99,7 @@ class CreateCheckoutSessionView(APIView):
 
             with transaction.atomic():  # Ensures atomicity of the order creation process
                 # Prepare order data
-                cart_items = cart.cart_items.all()
+                cart_items = cart.cart_items.select_related('item__owner')
                 order_total_price = Decimal(cart.get_cart_total)  # Convert to Decimal
                 total_order_items = cart.get_cart_items
 
@@ -93,30 +112,18 @@ class CreateCheckoutSessionView(APIView):
                 order_serializer.is_valid(raise_exception=True)
                 order = order_serializer.save()
 
-                # Create order items and update inventory
-                for cart_item in cart_items:
-                    item = cart_item.item
-                    if item.available_quantity < cart_item.quantity:
-                        return Response(
-                            {"error": f"Not enough inventory for {item.name}. Available: {item.available_quantity}, Requested: {cart_item.quantity}"},
-                            status=status.HTTP_400_BAD_REQUEST,
-                        )
-
-                    # Create order item
-                    OrderItem.objects.create(
-                        order=order,
-                        item=item,
-                        quantity=cart_item.quantity,
-                        start_date=cart_item.start_date,
-                        end_date=cart_item.end_date,
-                    )
+                # Lock the equipment rows, re-check date availability and create the order items
+                reserve_cart_items(order, cart_items)
 
-                # Calculate service fee (6% of the order total price)
-                service_fee = order_total_price * Decimal('0.06')
+            # Calculate service fee (6% of the order total price)
+            service_fee = order_total_price * Decimal('0.06')
 
-                # Convert price to cents (including service fee)
-                amount_in_cents = int((order_total_price + service_fee) * Decimal('100'))
+            # Convert price to cents (including service fee)
+            amount_in_cents = int((order_total_price + service_fee) * Decimal('100'))
 
+            # Stripe is called after the reservation commits so equipment locks are not held
+            # during network calls; the reservation is released again if Stripe fails.
+            try:
                 stripe_price = stripe.Price.create(
                     unit_amount=amount_in_cents,
                     currency="usd",
@@ -135,11 +142,15 @@ class CreateCheckoutSessionView(APIView):
                     success_url=f"{settings.DOMAIN_URL}/payment-successful?session_id={{CHECKOUT_SESSION_ID}}&order_id={order.id}",
                     cancel_url=f"{settings.DOMAIN_URL}/payment-canceled?order_id={order.id}",
                 )
+            except stripe.error.StripeError:
+                with transaction.atomic():
+                    order.terminate_rental()
+                raise
 
-                # Update order with payment details
-                order.payment_token = session.id
-                order.payment_status = 'pending'
-                order.save()
+            # Update order with payment details
+            order.payment_token = session.id
+            order.payment_status = 'pending'
+            order.save()
 
             # --- Prepare Email Contexts with Serializable Data ---
 
@@ -218,6 +229,8 @@ class CreateCheckoutSessionView(APIView):
             )
         except Cart.DoesNotExist:
             return Response({"error": "No cart found for the user"}, status=status.HTTP_404_NOT_FOUND)
+        except ReservationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except stripe.error.StripeError as e:
             return Response({"error": f"Stripe error: {e.user_message}"}, status=status.HTTP_400_BAD_REQUEST)
         except ValidationError as e:
@@ -329,13 +342,12 @@ def convert_querydict_to_dict(querydict):
 
 class CategoryViewSet(viewsets.ViewSet):
 
+    @cache_response(category_response_tags)
     def list(self, request):
         """
-        List all categories.
+        List all categories, with ad counts, from the cached category tree.
         """
-        queryset = Category.objects.all()
-        serializer = CategorySerializer(queryset, many=True)
-        return Response(serializer.data)
+        return Response(get_category_tree())
 
     def create(self, request):
         """
@@ -399,6 +411,13 @@ class RootCategoryListView(generics.ListAPIView):
         """
         return Category.objects.filter(parent__isnull=True)
 
+    @cache_response(category_response_tags)
+    def list(self, request, *args, **kwargs):
+        """
+        List root categories, with ad counts, from the cached category tree.
+        """
+        return Response(get_category_tree(roots_only=True))
+
 
 class TagViewSet(viewsets.ViewSet):
     authentication_classes = [JWTAuthenticationFromCookie]
@@ -475,21 +494,66 @@ class EquipmentViewSet(viewsets.ModelViewSet):
     authentication_classes = [JWTAuthenticationFromCookie]
     pagination_class = CustomEquipmentPagination  # Use custom pagination
 
+    # Upper bound on the entries accepted by the bulk availability check
+    MAX_AVAILABILITY_ITEMS = 100
+
+    # Radius searches in the filter action, in kilometres
+    DEFAULT_RADIUS_KM = 25
+    MAX_RADIUS_KM = 500
+
+    # Representations selectable with `?view=` on the list actions
+    LIST_ACTIONS = ["list", "filter", "related", "trending", "featured"]
+    LIST_SERIALIZERS = {
+        "full": EquipmentListSerializer,
+        "card": EquipmentCardSerializer,
+    }
+
 
     def get_permissions(self):
         """
         Override permissions to allow unauthenticated access to list and retrieve,
         but require authentication for create, update, and delete.
         """
-        if self.action in ["list", "retrieve", "filter", "related"]:
+        if self.action in ["list", "retrieve", "filter", "related", "availability", "reviews", "trending", "featured"]:
             return [AllowAny()]  # No authentication required for viewing equipment
         return [IsAuthenticated()]  # Authentication required for create, update, delete
 
+    def get_serializer_class(self):
+        """
+        Use a batch-loading list serializer for actions that return many items.
+        `?view=card` selects the compact card representation (default `full`).
+        """
+        if self.action in self.LIST_ACTIONS:
+            view = self.request.query_params.get("view", "full")
+            if view not in self.LIST_SERIALIZERS:
+                raise ParseError(f"view must be one of: {', '.join(self.LIST_SERIALIZERS)}.")
+            return self.LIST_SERIALIZERS[view]
+        return super().get_serializer_class()
+
+    def get_serializer(self, *args, **kwargs):
+        """
+        Limit list representations to the comma-separated `?fields=` when given.
+        """
+        fields = self.request.query_params.get("fields")
+        if fields and self.action in self.LIST_ACTIONS:
+            kwargs["fields"] = [field.strip() for field in fields.split(",") if field.strip()]
+        return super().get_serializer(*args, **kwargs)
+
+    def prepare_list_queryset(self, queryset):
+        """
+        Load what the selected list serializer needs for the queryset in bulk.
+        """
+        return self.get_serializer_class().prepare_queryset(queryset)
+
+    @method_decorator(catalogue_condition)
+    @cache_response(equipment_response_tags)
     def list(self, request):
         """
         List all verified equipment with pagination.
+        Pass `cursor` (empty for the first page) for keyset pagination without a total count.
         """
         queryset = self.filter_queryset(self.get_queryset().filter(is_verified=True))  # Filter only verified items
+        queryset = self.prepare_list_queryset(queryset)
         
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -500,14 +564,23 @@ class EquipmentViewSet(viewsets.ModelViewSet):
 
     
     @action(detail=False, methods=["GET"], url_path="filter")
+    @method_decorator(catalogue_condition)
+    @cache_response(equipment_response_tags)
     def filter(self, request):
         """
         Custom filtering action for searching and filtering by category, tags, and city.
         - `category`: Filter by a single category (ID or name, optional)
         - `categories`: Filter by multiple categories (comma-separated slugs, optional)
-        - `search`: Search in name, description, and tags (optional)
+        - `search`: Search in name, tags, category and description, most relevant first (optional)
         - `city`: Filter by a single city (optional)
         - `cities`: Filter by multiple cities (comma-separated slugs, optional)
+        - `start_date` / `end_date`: Only return equipment free for the whole period (YYYY-MM-DD, optional)
+        - `min_quantity`: The quantity that must be free for the period (defaults to 1)
+        - `lat` / `lng` / `radius_km`: Only return equipment within `radius_km` (default 25) of the point, nearest first (optional)
+        - `view`: `card` for the compact catalogue representation, `full` otherwise (optional)
+        - `fields`: Comma-separated fields to return (optional)
+        - `cursor`: Page by cursor instead of page number, in the default order (optional, empty for the first page)
+        The response includes `facets`: counts per category, city and price range for the filtered results.
         """
         queryset = Equipment.objects.filter(is_verified=True)
 
@@ -538,34 +611,191 @@ class EquipmentViewSet(viewsets.ModelViewSet):
             print("cities", cities)
             queryset = queryset.filter(address__city__in=cities)
 
-        # Apply search if provided
+        # Exclude equipment that is fully booked for the requested period
+        start_date = request.GET.get("start_date")
+        end_date = request.GET.get("end_date") or start_date
+        if start_date:
+            try:
+                start_date, end_date = to_date(start_date), to_date(end_date)
+                min_quantity = int(request.GET.get("min_quantity", 1))
+            except ValueError:
+                return Response(
+                    {"error": "Dates must use the YYYY-MM-DD format and min_quantity must be a number."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            if end_date < start_date:
+                return Response({"error": "End date must be after the start date."}, status=status.HTTP_400_BAD_REQUEST)
+
+            queryset = annotate_free_quantity(
+                queryset.filter(is_available=True), start_date, end_date
+            ).filter(free_quantity__gte=max(min_quantity, 1))
+
+        # Apply search if provided, ranked by relevance (by the search index, or by PostgreSQL)
+        ranked_ids = None
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                # Q(description__icontains=search) |
-                Q(tags__name__icontains=search)
-            ).distinct()
+            queryset, ranked_ids = search_equipment(queryset, search)
+
+        # Limit to equipment near a point, nearest first
+        lat, lng = request.GET.get("lat"), request.GET.get("lng")
+        if lat or lng:
+            try:
+                lat, lng = float(lat), float(lng)
+                radius_km = float(request.GET.get("radius_km", self.DEFAULT_RADIUS_KM))
+            except (TypeError, ValueError):
+                return Response(
+                    {"error": "lat, lng and radius_km must be numbers, and lat and lng must be given together."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
-        # Paginate results
-        page = self.paginate_queryset(queryset)
+            if not (-90 <= lat <= 90 and -180 <= lng <= 180 and 0 < radius_km <= self.MAX_RADIUS_KM):
+                return Response(
+                    {"error": f"lat, lng must be valid coordinates and radius_km between 0 and {self.MAX_RADIUS_KM}."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            queryset = within_radius(queryset, lat, lng, radius_km).order_by("distance_km")
+            ranked_ids = None  # Nearest first replaces relevance
+
+        # Sidebar counts for the filtered results, cached per normalized query
+        facets = get_facets(queryset, request.query_params)
+
+        # Paginate results; index matches are paged in relevance order and only the page's rows are fetched
+        if ranked_ids is not None:
+            page_ids = self.paginate_queryset(ranked_matches(queryset, ranked_ids))
+            page = order_by_ids(self.prepare_list_queryset(queryset.filter(pk__in=page_ids)), page_ids)
+        else:
+            page = self.paginate_queryset(self.prepare_list_queryset(queryset))
         if page is not None:
             if not page:  # Check if the page is empty
-                return Response({"message": "No equipment found for the given filters"}, status=200)
+                return Response({"message": "No equipment found for the given filters", "facets": facets}, status=200)
             serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            response = self.get_paginated_response(serializer.data)
+            response.data["facets"] = facets
+            return response
 
         return Response(serializer.data)
     
+    @action(detail=False, methods=["POST"], url_path="availability")
+    def availability(self, request):
+        """
+        Check availability for many equipment items and date ranges in one call.
+        - Body: a list (or `{"items": [...]}`) of `equipment_id`, `start_date`, `end_date` and `quantity`
+        - Returns the remaining quantity and first conflicting date for each entry, in order
+        """
+        items = request.data.get("items") if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({"error": "A non-empty list of items is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(items) > self.MAX_AVAILABILITY_ITEMS:
+            return Response(
+                {"error": f"At most {self.MAX_AVAILABILITY_ITEMS} items can be checked per request."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = AvailabilityRequestSerializer(data=items, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        # The requester's own cart holds do not count against them
+        own_cart_items = []
+        if request.user.is_authenticated:
+            own_cart_items = CartItem.objects.filter(cart__user=request.user).values_list('id', flat=True)
+
+        entries = serializer.validated_data
+        results = check_availability_bulk(
+            (
+                (entry["equipment_id"], entry["start_date"], entry["end_date"], entry["quantity"])
+                for entry in entries
+            ),
+            exclude_cart_items=own_cart_items
+        )
+
+        response_data = []
+        for entry, result in zip(entries, results):
+            if result is None:
+                response_data.append({"equipment_id": entry["equipment_id"], "error": "Equipment not found."})
+                continue
+
+            response_data.append({
+                "equipment_id": entry["equipment_id"],
+                "start_date": entry["start_date"],
+                "end_date": entry["end_date"],
+                "quantity": entry["quantity"],
+                "is_available": result.is_available,
+                "available_quantity": result.available,
+                "first_conflict": result.first_conflict,
+            })
+
+        return Response(response_data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["GET"], url_path="reviews")
+    def reviews(self, request, pk=None):
+        """
+        List the written reviews of an equipment item, newest first, with pagination.
+        """
+        if not Equipment.objects.filter(pk=pk).exists():
+            return Response({"detail": "Equipment not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        queryset = written_reviews().filter(equipment_id=pk)
+        paginator = ReviewPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(ReviewSerializer(page, many=True).data)
+
+    @action(detail=False, methods=["GET"], url_path="trending")
+    @method_decorator(catalogue_condition)
+    def trending(self, request):
+        """
+        List the equipment with the most recent demand, from the precomputed ranking.
+        - `category`: Rank within a category (ID, optional)
+        """
+        return self.ranked_response(EquipmentRanking.TRENDING)
+
+    @action(detail=False, methods=["GET"], url_path="featured")
+    @method_decorator(catalogue_condition)
+    def featured(self, request):
+        """
+        List the equipment with the most sustained demand, from the precomputed ranking.
+        - `category`: Rank within a category (ID, optional)
+        """
+        return self.ranked_response(EquipmentRanking.FEATURED)
+
+    def ranked_response(self, kind):
+        """
+        Serialize a precomputed ranking in order, without sorting the catalogue.
+        """
+        equipment_ids = get_ranking(kind, self.request.query_params.get("category") or None)
+        queryset = self.prepare_list_queryset(Equipment.objects.filter(is_verified=True, pk__in=equipment_ids))
+        serializer = self.get_serializer(order_by_ids(queryset, equipment_ids), many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["GET"], url_path="export")
+    def export(self, request):
+        """
+        Stream the whole verified catalogue as NDJSON (default) or CSV, without pagination.
+        - `file_format`: `ndjson` or `csv` (optional)
+        """
+        file_format = request.query_params.get("file_format", "ndjson")
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"file_format must be one of: {', '.join(EXPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        response = StreamingHttpResponse(export_lines(file_format), content_type=EXPORT_FORMATS[file_format])
+        response["Content-Disposition"] = f'attachment; filename="equipment.{file_format}"'
+        return response
+
     @action(detail=True, methods=["GET"], url_path="related")
+    @cache_response(equipment_response_tags)
     def related(self, request, pk=None):
         """
         Retrieve related equipment items based on the same category.
         """
         try:
             equipment = self.get_object()
-            related_items = Equipment.objects.filter(
-                category=equipment.category
-            ).exclude(id=equipment.id)[:12]  # Limit to 12 items
+            related_items = self.prepare_list_queryset(
+                Equipment.objects.filter(category=equipment.category).exclude(id=equipment.id)
+            )[:12]  # Limit to 12 items
 
             serializer = self.get_serializer(related_items, many=True)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -652,23 +882,24 @@ class EquipmentViewSet(viewsets.ModelViewSet):
             return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+    @method_decorator(equipment_condition)
     def retrieve(self, request, pk=None):
         """
         Retrieve a specific equipment item by primary key.
         Includes booked dates.
+        Carries ETag and Last-Modified; a matching conditional request gets 304 without loading the item.
         """
         equipment = Equipment.objects.get(pk=pk)
-        
-        # Get booked dates for this equipment
-        booked_dates = OrderItem.objects.filter(item=equipment).values("start_date", "end_date")
 
+        # Count the view towards the trending and featured rankings
+        record_view(equipment.id)
 
         # Serialize the equipment data
         serializer = EquipmentSerializer(equipment)
         
-        # Add booked dates to the response
+        # Add booked dates to the response, served from the availability cache when warm
         response_data = serializer.data
-        response_data["booked_dates"] = list(booked_dates)
+        response_data["booked_dates"] = get_equipment_availability(equipment.id)["booked_dates"]
 
         return Response(response_data)
 
@@ -750,7 +981,7 @@ class UserEquipmentView(APIView):
             return Response(status=status.HTTP_204_NO_CONTENT)  # No Content
 
         # Serialize the queryset and return data
-        serializer = EquipmentSerializer(queryset, many=True)
+        serializer = EquipmentListSerializer(EquipmentListSerializer.prepare_queryset(queryset), many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
 
@@ -796,6 +1027,34 @@ class UserEditableEquipmentView(APIView):
         return Response(equipment_ids, status=status.HTTP_200_OK)
 
 
+class SuggestView(APIView):
+    """
+    Search box suggestions: tags, equipment names and cities starting with the typed text.
+
+    Served from each worker's in-memory suggestion index, without database access.
+    """
+
+    # No authentication, so resolving the user does not query the database either
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Query parameters:
+        - `q`: The text typed so far
+        - `limit`: The maximum number of suggestions (defaults to 8, at most 20)
+        """
+        query = request.query_params.get("q", "")
+        try:
+            limit = min(max(int(request.query_params.get("limit", DEFAULT_LIMIT)), 1), MAX_LIMIT)
+        except ValueError:
+            return Response({"error": "limit must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # An index that is not loaded yet suggests nothing rather than falling back to the database
+        suggestions = suggest_index.suggest(query, limit) or []
+        return Response({"query": query, "suggestions": suggestions}, status=status.HTTP_200_OK)
+
+
 
 
 class ImageViewSet(viewsets.ViewSet):
@@ -940,7 +1199,7 @@ class ReviewViewSet(viewsets.ViewSet):
         """
         List all reviews with non-null, non-empty review_text.
         """
-        queryset = Review.objects.filter(review_text__isnull=False).exclude(review_text="")
+        queryset = written_reviews()
         serializer = ReviewSerializer(queryset, many=True)
         return Response(serializer.data)
 
@@ -1131,12 +1390,12 @@ class CartItemViewSet(viewsets.ModelViewSet):
             raise PermissionDenied("Lessors cannot add items to the cart!")
 
         try:
-            with transaction.atomic():  # Ensures atomicity
+            with atomic_cart_write():  # Ensures atomicity, giving back the cart hold on rollback
                 user_cart, _ = Cart.objects.get_or_create(user=user)
                 
                 item_data = request.data
                 item_id = item_data.get("item")  # Get the item ID
-                item_quantity = item_data.get("quantity", 1)
+                item_quantity = int(item_data.get("quantity", 1))
 
                 # Ensure valid dates
                 new_start_date = datetime.strptime(item_data.get("start_date"), "%Y-%m-%d").date()
@@ -1152,38 +1411,25 @@ class CartItemViewSet(viewsets.ModelViewSet):
                 if equipment.owner == user:
                     raise PermissionDenied("You cannot rent your own Item!")
 
-                # Check **future bookings** for the same equipment in the requested period
-                overlapping_bookings = OrderItem.objects.filter(
-                    item=equipment,
-                    start_date__lt=new_end_date,  # Overlaps requested period
-                    end_date__gt=new_start_date
-                )
-
-                # Calculate the **daily available quantity** by checking existing bookings
-                date_cursor = new_start_date
-                while date_cursor < new_end_date:
-                    # Sum all booked quantities for this specific day
-                    booked_quantity_on_day = overlapping_bookings.filter(
-                        start_date__lte=date_cursor,
-                        end_date__gt=date_cursor
-                    ).aggregate(total_booked=Sum("quantity"))["total_booked"] or 0
-
-                    available_on_day = equipment.available_quantity - booked_quantity_on_day
-
-                    if available_on_day < item_quantity:
-                        return Response(
-                            {
-                                "error": f"Only {available_on_day} units are available on {date_cursor}. "
-                                        "Your booking would exceed the available stock."
-                            },
-                            status=status.HTTP_400_BAD_REQUEST
-                        )
-
-                    date_cursor += timedelta(days=1)  # Move to the next day
-
                 # Check if the item already exists in the cart
                 existing_cart_item = CartItem.objects.filter(cart=user_cart, item_id=item_id).first()
 
+                # Check the requested quantity against every day of the period with a single query,
+                # ignoring the hold the existing cart item already has
+                availability = check_availability(
+                    equipment, new_start_date, new_end_date, item_quantity,
+                    exclude_cart_items=[existing_cart_item.id] if existing_cart_item else ()
+                )
+
+                if not availability.is_available:
+                    return Response(
+                        {
+                            "error": f"Only {availability.available} units are available on {availability.first_conflict}. "
+                                    "Your booking would exceed the available stock."
+                        },
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+
                 if existing_cart_item:
                     existing_start_date = existing_cart_item.start_date
                     existing_end_date = existing_cart_item.end_date
@@ -1206,6 +1452,15 @@ class CartItemViewSet(viewsets.ModelViewSet):
                 serializer.save()
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+        except HoldError as e:
+            # Another cart took the stock since the check above; nothing was saved
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except HoldUnavailable:
+            # Without its hold the item could be oversold, so nothing was saved
+            return Response(
+                {"error": "The cart is temporarily unavailable. Please try again shortly."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -1216,7 +1471,7 @@ class CartItemViewSet(viewsets.ModelViewSet):
         Update an existing cart item by checking the available quantity and date availability.
         """
         try:
-            with transaction.atomic():  # Ensures atomicity
+            with atomic_cart_write():  # Ensures atomicity, giving back the cart hold on rollback
                 cart_item = self.get_cart_item()
                 item_data = request.data
 
@@ -1230,10 +1485,12 @@ class CartItemViewSet(viewsets.ModelViewSet):
                 # Get the equipment object associated with the cart item
                 equipment = cart_item.item
 
-                # Check if available quantity is sufficient for the date range
-                available_quantity = equipment.get_available_quantity(start_date, end_date)
+                # Check if available quantity is sufficient for the date range, ignoring this item's own hold
+                available_quantity = check_availability(
+                    equipment, start_date, end_date, exclude_cart_items=[cart_item.id]
+                ).available
 
-                if available_quantity < item_quantity:
+                if available_quantity < int(item_quantity):
                     return Response(
                         {"error": f"Only {available_quantity} items are available for the selected date range."},
                         status=status.HTTP_400_BAD_REQUEST
@@ -1249,6 +1506,12 @@ class CartItemViewSet(viewsets.ModelViewSet):
                 serializer = self.get_serializer(cart_item)
                 return Response(serializer.data)
 
+        except HoldUnavailable:
+            # Without its hold the item could be oversold, so nothing was saved
+            return Response(
+                {"detail": "The cart is temporarily unavailable. Please try again shortly."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
         except Exception as e:
             return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -1312,9 +1575,14 @@ class OrderViewSet(viewsets.ViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def list(self, request):
+        """
+        List the user's orders with a compact summary of each item.
+        Booking statistics are included with `?stats=true`.
+        """
         self.check_permissions(request)
-        queryset = Order.objects.filter(user=request.user)
-        serializer = OrderSerializer(queryset, many=True)
+        queryset = OrderHistorySerializer.prepare_queryset(Order.objects.filter(user=request.user))
+        include_stats = request.query_params.get("stats", "").lower() in ["1", "true", "yes"]
+        serializer = OrderHistorySerializer(queryset, many=True, context={"include_stats": include_stats})
         return Response(serializer.data)
 
     def create(self, request):
@@ -1323,7 +1591,7 @@ class OrderViewSet(viewsets.ViewSet):
         try:
             with transaction.atomic():  # Ensures atomicity
                 cart = Cart.objects.get(user=request.user)
-                cart_items = cart.cart_items.all()
+                cart_items = cart.cart_items.select_related('item')
 
                 if not cart_items.exists():
                     return Response({"error": "Cart is empty, cannot create an order"}, status=status.HTTP_400_BAD_REQUEST)
@@ -1334,13 +1602,6 @@ class OrderViewSet(viewsets.ViewSet):
                 service_fee = (order_total_price * Decimal('0.06')).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
                 order_total_price_with_fee = (order_total_price + service_fee).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
 
-                # Validate inventory before proceeding
-                for cart_item in cart_items:
-                    if cart_item.item.available_quantity < cart_item.quantity:
-                        return Response({
-                            "error": f"Not enough stock for {cart_item.item.name}. Available: {cart_item.item.available_quantity}, Requested: {cart_item.quantity}"
-                        }, status=status.HTTP_400_BAD_REQUEST)
-
                 # Create order
                 order = Order.objects.create(
                     user=request.user,
@@ -1349,21 +1610,17 @@ class OrderViewSet(viewsets.ViewSet):
                     payment_status='pending'
                 )
 
-                # Create order items
-                for cart_item in cart_items:
-                    OrderItem.objects.create(
-                        order=order,
-                        item=cart_item.item,
-                        quantity=cart_item.quantity,
-                        start_date=cart_item.start_date,
-                        end_date=cart_item.end_date
-                    )
+                # Lock the equipment rows, re-check date availability and create the order items
+                reserve_cart_items(order, cart_items)
 
                 return Response({'order_id': order.id}, status=status.HTTP_201_CREATED)
 
         except Cart.DoesNotExist:
             return Response({"error": "No cart found for the user"}, status=status.HTTP_404_NOT_FOUND)
 
+        except ReservationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         except Exception as e:
             return Response({"error": f"An unexpected error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -1694,41 +1951,13 @@ class OrderItemViewSet(viewsets.ViewSet):
     def list_booked_items(self, request, pk):
         """
         Retrieve the booked items along with their quantities and dates for a specific item.
-        Also, return the total number of items booked.
+        Also, return the total number of items booked and the most booked on any one day.
         """
 
-        try:
-            # Fetch order items for the given item ID (pk), ensuring end_date is not in the past
-            order_items = OrderItem.objects.filter(item_id=pk, end_date__gte=now().date())
-
-            # Compute the total number of booked items for the specific item
-            total_booked_quantity = order_items.aggregate(total=Sum('quantity'))['total'] or 0
-
-            # Dictionary to store grouped bookings by (start_date, end_date)
-            grouped_bookings = {}
-
-            for order_item in order_items:
-                date_range_key = (order_item.start_date, order_item.end_date)
-
-                if date_range_key in grouped_bookings:
-                    # If the date range already exists, add the quantity
-                    grouped_bookings[date_range_key]["quantity"] += order_item.quantity
-                else:
-                    # Otherwise, create a new entry
-                    grouped_bookings[date_range_key] = {
-                        "quantity": order_item.quantity,
-                        "start_date": order_item.start_date,
-                        "end_date": order_item.end_date,
-                    }
-
-            # Convert dictionary values to a list for response
-            booked_items_data = list(grouped_bookings.values())
-
-            # Return both the list of booked items and the total quantity
-            return Response({
-                "total_booked": total_booked_quantity,  # Total items booked for this specific item
-                "booked_dates": booked_items_data      # Booked items with their start and end dates
-            }, status=status.HTTP_200_OK)
-
-        except OrderItem.DoesNotExist:
-            return Response({"error": "Item not found"}, status=status.HTTP_404_NOT_FOUND)
+        # All figures come from the availability cache, backed by the order items and the booking ledger
+        availability = get_equipment_availability(pk)
+        return Response({
+            "total_booked": availability["upcoming_booked"],  # Total items booked in order items not yet ended
+            "peak_booked": availability["peak_booked"],  # Highest quantity booked on any upcoming day
+            "booked_dates": availability["booked_dates_data"]  # Upcoming booked periods with their quantities
+        }, status=status.HTTP_200_OK)
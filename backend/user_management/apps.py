@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class UserManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'user_management'
\ No newline at end of file
+    name = 'user_management'
+
+    def ready(self):
+        from . import signals  # noqa: F401  Registers the model signal handlers
@@ -0,0 +1,138 @@
+# Standard Library Imports
+import logging
+
+# Third-Party Imports
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# Django Imports
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Local Imports
+from .models import User
+
+# Related Apps Imports
+from equipment_management.cache import cache_delete_many, cache_get, cache_set
+
+logger = logging.getLogger(__name__)
+
+# The authentication fields of a user at one token version: auth:fields:<user_id>:<token_version>
+USER_CACHE_KEY = "auth:fields:{user_id}:{version}"
+
+# Claim carrying the user's `token_version` when the token was issued
+TOKEN_VERSION_CLAIM = "ver"
+# User fields copied into the tokens, enough to authorize a request without a lookup
+USER_CLAIMS = ['role', 'is_active', 'is_staff', 'is_superuser', 'is_verified']
+# Losing access or admin rights bumps `token_version`, revoking the tokens issued before;
+# the other claims (role, verification) are renewed with the next access token
+TOKEN_VERSION_FIELDS = ['is_active', 'is_staff', 'is_superuser']
+# User fields kept in the cache; the password hash and profile never leave the database
+CACHED_USER_FIELDS = ['token_version', *USER_CLAIMS]
+
+
+def add_user_claims(token, user) -> None:
+    """
+    Copies the user's token version and authorization fields into a token.
+    """
+    token[TOKEN_VERSION_CLAIM] = user.token_version
+    for field in USER_CLAIMS:
+        token[field] = getattr(user, field)
+
+
+def tokens_for_user(user) -> RefreshToken:
+    """
+    Issues a refresh token carrying the user's claims; its access tokens inherit them.
+
+    Args:
+        user (User): The authenticated user.
+
+    Returns:
+        RefreshToken: The refresh token, with `.access_token` for the access token.
+    """
+    refresh = RefreshToken.for_user(user)
+    add_user_claims(refresh, user)
+    return refresh
+
+
+def token_version(token) -> int:
+    """
+    Returns the token version a token was issued with; 0 for tokens issued before versions.
+    """
+    return token.get(TOKEN_VERSION_CLAIM, 0)
+
+
+def user_cache_key(user_id, version) -> str:
+    return USER_CACHE_KEY.format(user_id=user_id, version=version)
+
+
+def light_user(values: dict):
+    """
+    Builds a user from the given field values, with every other field deferred.
+
+    `from_db` expects the loaded fields in model order and defers the rest, which then
+    load on first access.
+    """
+    field_names = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+    return User.from_db(DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names])
+
+
+def user_from_claims(token):
+    """
+    Builds a lightweight user from a token's claims, without a database query.
+
+    The user holds its ID and `USER_CLAIMS`; its other fields are deferred and load on
+    first access, so views reading only those pay no query at all.
+
+    Args:
+        token (Token): A validated access token.
+
+    Returns:
+        User: The user, or None if the token predates the claims.
+    """
+    claims = {api_settings.USER_ID_FIELD: token.get(api_settings.USER_ID_CLAIM), 'token_version': token_version(token)}
+    claims.update({field: token[field] for field in USER_CLAIMS if field in token})
+    if claims[api_settings.USER_ID_FIELD] is None or len(claims) != len(USER_CLAIMS) + 2:
+        return None
+    return light_user(claims)
+
+
+def get_cached_user(token, load_user):
+    """
+    Returns the user of a token from the cache, loading and caching it on a miss.
+
+    Only the user's ID and `CACHED_USER_FIELDS` are cached, and a hit rebuilds a light
+    user from them (see `light_user`). Entries are keyed by user ID and token version,
+    kept for `AUTH_USER_CACHE_TTL` seconds and deleted whenever the user is saved (see
+    `signals`). A token whose version no longer matches the user's has been revoked.
+
+    Args:
+        token (Token): A validated access token.
+        load_user (callable): Loads the active user of a token from the database.
+
+    Returns:
+        User: The authenticated user.
+
+    Raises:
+        AuthenticationFailed: If the user is missing, inactive or the token was revoked.
+    """
+    version = token_version(token)
+    key = user_cache_key(token.get(api_settings.USER_ID_CLAIM), version)
+    values = cache_get(key)
+    if values is not None:
+        return light_user(values)
+
+    user = load_user(token)
+    if user.token_version != version:
+        raise AuthenticationFailed("Token has been revoked.", code="token_revoked")
+    fields = [api_settings.USER_ID_FIELD, *CACHED_USER_FIELDS]
+    cache_set(key, {field: getattr(user, field) for field in fields}, settings.AUTH_USER_CACHE_TTL)
+    return user
+
+
+def invalidate_cached_user(user_id, *versions) -> None:
+    """
+    Deletes the cached fields of a user at the given token versions.
+    """
+    cache_delete_many([user_cache_key(user_id, version) for version in set(versions)])
@@ -0,0 +1,147 @@
+# Standard Library Imports
+import logging
+import time
+from typing import Optional, Tuple
+
+# Third-Party Imports
+import redis
+from geopy.exc import GeopyError
+from geopy.geocoders import Nominatim
+
+# Django Imports
+from django.conf import settings
+
+# Local Imports
+from .models import GeocodeCache
+
+# Related Apps Imports
+from equipment_management.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Held for one interval by each request to Nominatim, shared by every worker and replica
+THROTTLE_KEY = "geocoding:nominatim:slot"
+# Nominatim's usage policy allows one request per second
+THROTTLE_INTERVAL_MS = 1000
+# Seconds to wait for a free slot before giving up, so the lookup is retried later
+THROTTLE_MAX_WAIT = 30
+
+
+class GeocodingError(Exception):
+    """
+    Raised when the geocoding service cannot be reached or fails; the lookup can be retried.
+    """
+
+
+class StubGeocoder:
+    """
+    Offline geocoder for development and tests.
+
+    Resolves an address to the centre of the first known city named in it, so radius
+    searches behave predictably without network access.
+    """
+    CITY_COORDINATES = {
+        'nairobi': (-1.2921, 36.8219),
+        'mombasa': (-4.0435, 39.6682),
+        'kisumu': (-0.0917, 34.7680),
+        'nakuru': (-0.3031, 36.0800),
+        'eldoret': (0.5143, 35.2698),
+        'thika': (-1.0333, 37.0693),
+        'kampala': (0.3476, 32.5825),
+        'dar es salaam': (-6.7924, 39.2083),
+        'london': (51.5072, -0.1276),
+        'new york': (40.7128, -74.0060),
+    }
+
+    def geocode(self, query: str) -> Optional[Tuple[float, float]]:
+        for city, coordinates in self.CITY_COORDINATES.items():
+            if city in query:
+                return coordinates
+        return None
+
+
+def wait_for_request_slot() -> None:
+    """
+    Blocks until this process may send the next Nominatim request.
+
+    The slot is a Redis key set with NX for `THROTTLE_INTERVAL_MS`, so all workers
+    together send at most one request per interval.
+
+    Raises:
+        GeocodingError: If Redis is unreachable or no slot frees up in `THROTTLE_MAX_WAIT` seconds.
+    """
+    deadline = time.monotonic() + THROTTLE_MAX_WAIT
+    try:
+        client = get_redis()
+        while not client.set(THROTTLE_KEY, 1, nx=True, px=THROTTLE_INTERVAL_MS):
+            if time.monotonic() >= deadline:
+                raise GeocodingError("Timed out waiting for a geocoding request slot.")
+            # Sleep until the current slot expires (PTTL is negative if it just did)
+            time.sleep(max(client.pttl(THROTTLE_KEY), 10) / 1000)
+    except redis.RedisError as e:
+        raise GeocodingError(f"Could not reserve a geocoding request slot: {e}") from e
+
+
+class NominatimGeocoder:
+    """
+    Geocoder backed by OpenStreetMap's Nominatim service, throttled across all workers
+    to its usage policy (see `wait_for_request_slot`).
+    """
+
+    def __init__(self):
+        self.client = Nominatim(user_agent=settings.GEOCODER_USER_AGENT, timeout=10)
+
+    def geocode(self, query: str) -> Optional[Tuple[float, float]]:
+        wait_for_request_slot()
+        try:
+            location = self.client.geocode(query)
+        except GeopyError as e:
+            raise GeocodingError(str(e)) from e
+        return (location.latitude, location.longitude) if location else None
+
+
+GEOCODERS = {
+    'stub': StubGeocoder,
+    'nominatim': NominatimGeocoder,
+}
+
+
+def get_geocoder():
+    """
+    Returns the geocoder selected by the `GEOCODER` setting.
+    """
+    return GEOCODERS[settings.GEOCODER]()
+
+
+def geocode(query: str) -> Optional[Tuple[float, float]]:
+    """
+    Geocodes a normalized address, using the geocode cache before the geocoding service.
+
+    Addresses the service could not resolve are cached too, so they are not looked up
+    again on every save.
+
+    Args:
+        query (str): The normalized address text (see `Address.geocoding_query`).
+
+    Returns:
+        tuple: (latitude, longitude), or None if the address could not be resolved.
+
+    Raises:
+        GeocodingError: If the geocoding service failed.
+    """
+    if not query:
+        return None
+
+    query_hash = GeocodeCache.hash_query(query)
+    cached = GeocodeCache.objects.filter(query_hash=query_hash).first()
+    if cached:
+        if cached.latitude is None:
+            return None
+        return cached.latitude, cached.longitude
+
+    coordinates = get_geocoder().geocode(query)
+    latitude, longitude = coordinates if coordinates else (None, None)
+    GeocodeCache.objects.get_or_create(
+        query_hash=query_hash, defaults={'query': query, 'latitude': latitude, 'longitude': longitude}
+    )
+    return coordinates
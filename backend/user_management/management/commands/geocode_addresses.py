@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from user_management.models import Address
+from user_management.tasks import geocode_address
+
+
+class Command(BaseCommand):
+    help = 'Queue geocoding for addresses that have no coordinates yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--now',
+            action='store_true',
+            help='Geocode in this process instead of queueing Celery tasks',
+        )
+
+    def handle(self, *args, **options):
+        address_ids = list(Address.objects.filter(latitude__isnull=True).values_list('id', flat=True))
+        for address_id in address_ids:
+            if options['now']:
+                geocode_address.apply(args=[address_id])
+            else:
+                geocode_address.delay(address_id)
+
+        action = 'Geocoded' if options['now'] else 'Queued geocoding for'
+        self.stdout.write(self.style.SUCCESS(f'✅ {action} {len(address_ids)} addresses.'))
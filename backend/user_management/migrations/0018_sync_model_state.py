@@ -0,0 +1,113 @@
+# Generated by Django 4.2 on 2026-10-17 22:49
+
+# Brings the migration state in line with fields the baseline models declared but never
+# migrated. Unrelated to the booking ledger: it shipped in the ledger series only because
+# an empty database could not be migrated to a schema the app can query without it.
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import tinymce.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0017_user_token_version'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='address',
+            options={'ordering': ['-is_default', '-created_at'], 'verbose_name_plural': 'addresses'},
+        ),
+        migrations.AlterModelOptions(
+            name='chat',
+            options={'ordering': ['-updated_at'], 'verbose_name_plural': 'chats'},
+        ),
+        migrations.AlterModelOptions(
+            name='companyinfo',
+            options={'ordering': ['-updated_at'], 'verbose_name': 'Company Information', 'verbose_name_plural': 'Company Information'},
+        ),
+        migrations.AlterModelOptions(
+            name='contact',
+            options={'ordering': ['-created_at'], 'verbose_name': 'Contact Message', 'verbose_name_plural': 'Contact Messages'},
+        ),
+        migrations.AlterModelOptions(
+            name='creditcard',
+            options={'ordering': ['-is_default', '-created_at'], 'verbose_name_plural': 'credit cards'},
+        ),
+        migrations.AlterModelOptions(
+            name='message',
+            options={'verbose_name_plural': 'messages'},
+        ),
+        migrations.AlterModelOptions(
+            name='physicaladdress',
+            options={'ordering': ['-is_default', '-created_at'], 'verbose_name_plural': 'physical addresses'},
+        ),
+        migrations.AlterModelOptions(
+            name='user',
+            options={'verbose_name_plural': 'users'},
+        ),
+        migrations.AddField(
+            model_name='chat',
+            name='item_name',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='image_url',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='companyinfo',
+            name='privacy_cookie_notice',
+            field=tinymce.models.HTMLField(verbose_name='Privacy and Cookie Notice'),
+        ),
+        migrations.AlterField(
+            model_name='companyinfo',
+            name='terms_and_conditions',
+            field=tinymce.models.HTMLField(verbose_name='Terms and Conditions'),
+        ),
+        migrations.AlterField(
+            model_name='creditcard',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='credit_cards', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='physicaladdress',
+            name='city',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name='physicaladdress',
+            name='full_name',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name='physicaladdress',
+            name='state',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name='physicaladdress',
+            name='zip_code',
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='document_type',
+            field=models.CharField(blank=True, choices=[('id', 'ID'), ('passport', 'Passport'), ('dl', "Driver's License")], max_length=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='identity_document',
+            field=models.FileField(blank=True, null=True, upload_to='identity_documents/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['pdf', 'jpg', 'jpeg', 'png'])]),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to='user_images/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['jpg', 'jpeg', 'png'])]),
+        ),
+    ]
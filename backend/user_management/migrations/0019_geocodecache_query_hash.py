@@ -0,0 +1,39 @@
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_queries(apps, schema_editor):
+    """
+    Fills in the query hash of the geocode results cached so far.
+    """
+    GeocodeCache = apps.get_model('user_management', 'GeocodeCache')
+    for cached in GeocodeCache.objects.only('id', 'query').iterator():
+        cached.query_hash = hashlib.sha256(cached.query.encode('utf-8')).hexdigest()
+        cached.save(update_fields=['query_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0018_sync_model_state'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='geocodecache',
+            name='query',
+            field=models.TextField(),
+        ),
+        migrations.AddField(
+            model_name='geocodecache',
+            name='query_hash',
+            field=models.CharField(editable=False, max_length=64, null=True),
+        ),
+        migrations.RunPython(hash_queries, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='geocodecache',
+            name='query_hash',
+            field=models.CharField(editable=False, max_length=64, unique=True),
+        ),
+    ]
@@ -1,6 +1,7 @@
 # Standard Library Imports
 import uuid
 import base64
+import hashlib
 from datetime import timedelta
 
 # Django Imports
@@ -189,6 +190,8 @@ class User(AbstractUser):
         proof_of_address (FileField): The user's proof of address file (optional).
         is_verified (bool): Indicates whether the user is verified.
         is_active (bool): Indicates whether the user account is active.
+        token_version (int): Bumped when the user's role or access changes, revoking
+            the tokens issued before.
     """
     ROLE_CHOICES = [
         ('lessor', 'Lessor'),
@@ -252,6 +255,7 @@ class User(AbstractUser):
     )
     is_verified = models.BooleanField(default=False)
     is_active = models.BooleanField(default=False)
+    token_version = models.PositiveIntegerField(default=0, editable=False)
 
     USERNAME_FIELD = 'email'  # Use email for login instead of username
     REQUIRED_FIELDS = []  # Remove 'username' from REQUIRED_FIELDS
@@ -286,6 +290,8 @@ class Address(models.Model):
         address_type (str): The type of address (e.g., Shipping, Billing).
         user (User): The user to whom this address belongs.
         is_default (bool): Indicates whether this is the user's default address.
+        latitude (float): The geocoded latitude of the address (None until geocoded).
+        longitude (float): The geocoded longitude of the address (None until geocoded).
         created_at (datetime): The date and time when the address was created.
         updated_at (datetime): The date and time when the address was last updated.
     """
@@ -321,6 +327,8 @@ class Address(models.Model):
         on_delete=models.PROTECT
     )
     is_default = models.BooleanField(default=False)
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -333,9 +341,75 @@ class Address(models.Model):
         """
         return f"{self.get_address_type_display()}, {self.street_address}, {self.state}, {self.zip_code}"
 
+    @property
+    def geocoding_query(self) -> str:
+        """
+        Returns the normalized text used to geocode the address.
+
+        Returns:
+            str: The street, city, state, zip code and country, lowercased and comma-separated.
+        """
+        parts = [self.street_address, self.city, self.state, self.zip_code, self.country]
+        return ", ".join(" ".join(str(part).split()).lower() for part in parts if part)
+
     class Meta:
         verbose_name_plural = "addresses"
         ordering = ['-is_default', '-created_at']  # Order by default address first, then by creation date
+        indexes = [
+            # Serves the bounding-box prefilter of radius searches
+            models.Index(fields=['latitude', 'longitude'], name='address_lat_lng_idx'),
+        ]
+
+
+class GeocodeCache(models.Model):
+    """
+    Caches geocoding results, so each distinct address is only looked up once.
+
+    Attributes:
+        query (str): The normalized address text that was geocoded.
+        query_hash (str): The SHA-256 hex digest of the query, which keys the cache.
+        latitude (float): The latitude found, or None if the address could not be geocoded.
+        longitude (float): The longitude found, or None if the address could not be geocoded.
+        created_at (datetime): The date and time when the address was geocoded.
+    """
+    query = models.TextField()
+    # Addresses have no length limit, so the unique key is a fixed-length digest of the query
+    query_hash = models.CharField(max_length=64, unique=True, editable=False)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @staticmethod
+    def hash_query(query: str) -> str:
+        """
+        Returns the cache key of a normalized address.
+
+        Args:
+            query (str): The normalized address text (see `Address.geocoding_query`).
+
+        Returns:
+            str: The SHA-256 hex digest of the query.
+        """
+        return hashlib.sha256(query.encode('utf-8')).hexdigest()
+
+    def save(self, *args, **kwargs):
+        """
+        Saves the cached result, keeping its query hash in step with its query.
+        """
+        self.query_hash = self.hash_query(self.query)
+        super().save(*args, **kwargs)
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of the cached result.
+
+        Returns:
+            str: The query and its coordinates.
+        """
+        return f"{self.query} -> ({self.latitude}, {self.longitude})"
+
+    class Meta:
+        verbose_name_plural = "geocode cache"
 
 
 class PhysicalAddress(models.Model):
@@ -0,0 +1,92 @@
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .auth_cache import TOKEN_VERSION_FIELDS, invalidate_cached_user
+from .models import Address, User
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(pre_save, sender=Address)
+def reset_moved_address_coordinates(sender, instance, **kwargs):
+    """
+    Clears the coordinates of an address whose text changed, until it is geocoded again.
+    """
+    previous = None
+    if not instance._state.adding:
+        previous = Address.objects.filter(pk=instance.pk).values(
+            'street_address', 'city', 'state', 'zip_code', 'country'
+        ).first()
+
+    instance._needs_geocoding = (
+        previous is None
+        or Address(**previous).geocoding_query != instance.geocoding_query
+        or instance.latitude is None
+    )
+    if previous is not None and instance._needs_geocoding:
+        instance.latitude = instance.longitude = None
+
+
+@receiver(post_save, sender=Address)
+def queue_address_geocoding(sender, instance, **kwargs):
+    """
+    Queues a geocoding task for a new or moved address once the write commits.
+    """
+    if not getattr(instance, '_needs_geocoding', False):
+        return
+
+    address_id = instance.pk
+
+    def queue():
+        from .tasks import geocode_address
+
+        try:
+            geocode_address.delay(address_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not queue geocoding for address {address_id}: {e}")
+
+    transaction.on_commit(queue)
+
+
+@receiver(pre_save, sender=User)
+def bump_token_version(sender, instance, update_fields=None, **kwargs):
+    """
+    Bumps the token version of a user whose access or admin rights change, revoking their tokens.
+
+    Queryset `update()` calls skip this; they must bump `token_version` themselves.
+    """
+    instance._previous_token_version = instance.token_version
+    fields = [field for field in TOKEN_VERSION_FIELDS if update_fields is None or field in update_fields]
+    if instance._state.adding or not fields:
+        return
+
+    previous = User.objects.filter(pk=instance.pk).values(*fields).first()
+    if previous is not None and any(previous[field] != getattr(instance, field) for field in fields):
+        instance.token_version += 1
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_cache(sender, instance, update_fields=None, **kwargs):
+    """
+    Drops the cached authenticated user once a save commits, and stores a bumped
+    token version that a save of selected fields left out.
+    """
+    previous_version = getattr(instance, '_previous_token_version', instance.token_version)
+    if (instance.token_version != previous_version and update_fields is not None
+            and 'token_version' not in update_fields):
+        User.objects.filter(pk=instance.pk).update(token_version=instance.token_version)
+
+    user_id, versions = instance.pk, (previous_version, instance.token_version)
+    transaction.on_commit(lambda: invalidate_cached_user(user_id, *versions))
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user_cache(sender, instance, **kwargs):
+    """
+    Drops the cached authenticated user of a deleted user once the delete commits.
+    """
+    user_id, version = instance.pk, instance.token_version
+    transaction.on_commit(lambda: invalidate_cached_user(user_id, version))
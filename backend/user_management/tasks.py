@@ -0,0 +1,22 @@
+from celery import shared_task
+
+from .models import Address
+from .geocoding import GeocodingError, geocode
+
+
+@shared_task(bind=True, autoretry_for=(GeocodingError,), retry_backoff=60, max_retries=3)
+def geocode_address(self, address_id):
+    """
+    Looks up the coordinates of an address and stores them on it.
+    """
+    address = Address.objects.filter(id=address_id).first()
+    if address is None:
+        return f"Address {address_id} no longer exists."
+
+    coordinates = geocode(address.geocoding_query)
+    if coordinates is None:
+        return f"Address {address_id} could not be geocoded."
+
+    # update() keeps the address's save signals (and another geocoding round) out of this
+    Address.objects.filter(id=address_id).update(latitude=coordinates[0], longitude=coordinates[1])
+    return f"Geocoded address {address_id}."
@@ -36,6 +36,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 from rest_framework_simplejwt.views import TokenBlacklistView, TokenRefreshView, TokenVerifyView
@@ -44,6 +45,7 @@ from geopy.geocoders import Nominatim
 
 
 # Local App Imports
+from .auth_cache import add_user_claims, get_cached_user, token_version, tokens_for_user, user_from_claims
 from .models import User, Address, PhysicalAddress, CreditCard, Message, Chat, OTP, CompanyInfo, FAQ
 from .serializers import (
     UserSerializer, AddressSerializer, PhysicalAddressSerializer, CreditCardSerializer,
@@ -53,6 +55,8 @@ from .utils import list_files, generate_signed_url, send_custom_email
 
 # Related Apps Imports
 from equipment_management.models import Cart, CartItem, Equipment, Order, OrderItem, Review
+from equipment_management.availability import check_availability_bulk
+from equipment_management.holds import atomic_cart_write
 
 
 class CompanyInfoView(APIView):
@@ -88,6 +92,7 @@ class JWTAuthenticationFromCookie(JWTAuthentication):
 
     Methods:
         authenticate: Authenticates the user using the access token from cookies.
+        get_user: Returns the user of a validated token without a database query when possible.
     """
 
     def authenticate(self, request):
@@ -114,6 +119,39 @@ class JWTAuthenticationFromCookie(JWTAuthentication):
         except InvalidToken as e:
             raise AuthenticationFailed('Invalid or expired access token.')
 
+    def get_user(self, validated_token):
+        """
+        Returns the user of a validated token.
+
+        With `JWT_TRUSTED_CLAIMS` on, the user is built from the token's claims with no
+        lookup at all; role and access changes then apply when the access token is next
+        refreshed. Otherwise the user's authentication fields are served from a short-lived
+        cache keyed by user ID and token version, and loaded from the database on a miss.
+
+        A claims or cached user only holds its ID and authentication fields, and every
+        other field costs one query on first access. Views that check permissions or
+        roles and filter or save by `request.user` (carts, orders, addresses, cards,
+        chats, reviews) stay query-free; views reading the profile, such as
+        `UserViewSet.retrieve`, load it first.
+
+        Args:
+            validated_token (Token): The validated access token.
+
+        Returns:
+            User: The authenticated user.
+
+        Raises:
+            AuthenticationFailed: If the user is missing, inactive or the token was revoked.
+        """
+        if settings.JWT_TRUSTED_CLAIMS:
+            user = user_from_claims(validated_token)
+            if user is not None:
+                if not user.is_active:
+                    raise AuthenticationFailed('User is inactive.', code='user_inactive')
+                return user
+
+        return get_cached_user(validated_token, super().get_user)
+
 
 class PasswordResetViewSet(viewsets.ViewSet):
     """
@@ -753,8 +791,8 @@ class LoginView(APIView):
 
 
 
-        # Generate tokens
-        refresh = RefreshToken.for_user(user)
+        # Generate tokens, carrying the claims that authenticate later requests
+        refresh = tokens_for_user(user)
 
         # Serialize user data
         response_data = {
@@ -838,14 +876,20 @@ class LoginView(APIView):
     def sync_cart_with_db(self, user, cart_data):
         """
         Sync the cart items from the frontend to the database for the user.
+
+        Equipment, existing cart items and date availability are loaded with a
+        fixed number of queries for the whole cart.
         """
         user_cart, created = Cart.objects.get_or_create(user=user)
 
         errors = []  # To store errors for each item
+        entries = []  # (item_data, item_errors, item_id, quantity, start_date, end_date)
 
+        # First pass: validate the submitted data without touching the database
         for item_data in cart_data:
-            
+
             item_errors = {}  # Store individual item errors
+            item_id = item_quantity = start_date = end_date = None
             try:
                 # Validate item information
                 item_info = item_data.get("item")
@@ -853,7 +897,7 @@ class LoginView(APIView):
                     item_errors["item"] = "Item information is missing."
 
                 item_id = item_info.get("id") if item_info else None
-                item_quantity = item_data.get("quantity", 1)
+                item_quantity = int(item_data.get("quantity", 1))
                 start_date = item_data.get("start_date")
                 end_date = item_data.get("end_date")
 
@@ -871,41 +915,69 @@ class LoginView(APIView):
                     if start_date > end_date:
                         item_errors["dates"] = "Start date must be before end date."
 
+            except Exception as e:
+                item_errors["error"] = str(e)
+
+            entries.append((item_data, item_errors, item_id, item_quantity, start_date, end_date))
+
+        # Load every referenced equipment and the user's existing cart items at once
+        equipments = Equipment.objects.in_bulk({entry[2] for entry in entries if entry[2]})
+        cart_items = {cart_item.item_id: cart_item for cart_item in CartItem.objects.filter(cart=user_cart)}
+
+        # Check date availability of every well-formed entry with one bulk lookup
+        checkable = [
+            index for index, (_, item_errors, item_id, _, _, _) in enumerate(entries)
+            if not item_errors and item_id in equipments
+        ]
+        availability = dict(zip(checkable, check_availability_bulk(
+            (
+                (entries[index][2], entries[index][4], entries[index][5], entries[index][3])
+                for index in checkable
+            ),
+            exclude_cart_items=[cart_item.id for cart_item in cart_items.values()]
+        )))
+
+        # Second pass: report availability problems and write the valid items
+        for index, entry in enumerate(entries):
+            item_data, item_errors, item_id, item_quantity, start_date, end_date = entry
+            try:
                 # Validate equipment existence
-                if item_id:
-                    equipment = Equipment.objects.filter(id=item_id).first()
-                    if not equipment:
-                        item_errors["equipment"] = f"Equipment with ID {item_id} not found."
-                    else:
-
-                        # Check availability
-                        if not equipment.is_available:
-                            item_errors["equipment"] = "This equipment is currently unavailable."
-
-                        # Validate quantity and availability for the given dates
-                        is_available = equipment.is_available_for_dates(start_date, end_date) if start_date and end_date else True
-                        if item_quantity > equipment.available_quantity:
-                            item_errors["quantity"] = f"Requested quantity ({item_quantity}) exceeds available quantity ({equipment.available_quantity})."
-
-                # Check for existing cart item
-                if not item_errors:
-                    cart_item = CartItem.objects.filter(cart=user_cart, item=equipment).first()
-                    if cart_item:
-                        # Overwrite dates and update quantity
-                        cart_item.start_date = start_date
-                        cart_item.end_date = end_date
-                        cart_item.quantity = item_quantity
-                        cart_item.save()
-                    else:
-                        # Create a new cart item
-                        cart_item = CartItem.objects.create(
-                            cart=user_cart,
-                            item=equipment,
-                            start_date=start_date,
-                            end_date=end_date,
-                            quantity=item_quantity,
+                equipment = equipments.get(item_id) if item_id else None
+                if item_id and not equipment:
+                    item_errors["equipment"] = f"Equipment with ID {item_id} not found."
+                elif equipment:
+                    # Check availability
+                    if not equipment.is_available:
+                        item_errors["equipment"] = "This equipment is currently unavailable."
+
+                    # Validate quantity and availability for the given dates
+                    result = availability.get(index)
+                    if result is not None and not result.is_available:
+                        item_errors["quantity"] = (
+                            f"Requested quantity ({item_quantity}) exceeds available quantity "
+                            f"({result.available}) for the selected dates."
                         )
 
+                # Check for existing cart item; a rejected cart hold rolls back this item only
+                if not item_errors:
+                    with atomic_cart_write():
+                        cart_item = cart_items.get(equipment.id)
+                        if cart_item:
+                            # Overwrite dates and update quantity
+                            cart_item.start_date = start_date
+                            cart_item.end_date = end_date
+                            cart_item.quantity = item_quantity
+                            cart_item.save()
+                        else:
+                            # Create a new cart item
+                            cart_items[equipment.id] = CartItem.objects.create(
+                                cart=user_cart,
+                                item=equipment,
+                                start_date=start_date,
+                                end_date=end_date,
+                                quantity=item_quantity,
+                            )
+
             except Exception as e:
                 item_errors["error"] = str(e)
 
@@ -948,7 +1020,15 @@ class TokenRefreshView(APIView):
 
         try:
             refresh = RefreshToken(refresh_token)
-            new_access_token = str(refresh.access_token)
+
+            # Refuse tokens revoked by a role or access change, and renew the claims
+            user = User.objects.filter(pk=refresh.get(api_settings.USER_ID_CLAIM), is_active=True).first()
+            if user is None or user.token_version != token_version(refresh):
+                return Response({"error": "Invalid refresh token."}, status=status.HTTP_401_UNAUTHORIZED)
+
+            access = refresh.access_token
+            add_user_claims(access, user)
+            new_access_token = str(access)
 
             response = Response({"message": "Token refreshed successfully."})
             response.set_cookie(
@@ -1100,6 +1180,11 @@ class UserViewSet(viewsets.ViewSet):
         if not user.is_authenticated:
             raise NotAuthenticated("Authentication required.")
 
+        # A user built from token claims defers its profile; load it in one query, not one per field
+        deferred_fields = user.get_deferred_fields()
+        if deferred_fields:
+            user.refresh_from_db(fields=deferred_fields)
+
         serializer = UserSerializer(user)
         return Response(serializer.data)
 
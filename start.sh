@@ -34,6 +34,21 @@ python /app/backend/manage.py migrate django_celery_beat --noinput || {
     echo "⚠️ Celery Beat migration failed, continuing..."
 }
 
+# The migrations above are regenerated on every boot, so their data migrations never
+# run; fill the booking ledger from the existing order items here instead
+echo "📒 Rebuilding the booking ledger..."
+python /app/backend/manage.py rebuild_booking_ledger || {
+    echo "❌ Booking ledger rebuild failed. Exiting."
+    exit 1
+}
+
+# Same for the search backend: the pg_trgm extension, its indexes and the search vectors
+echo "🔎 Creating search indexes..."
+python /app/backend/manage.py create_search_indexes || {
+    echo "❌ Search index creation failed. Exiting."
+    exit 1
+}
+
 echo "✅ Migrations completed successfully!"
 
 # Collect static files